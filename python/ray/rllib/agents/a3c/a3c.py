@@ -31,6 +31,11 @@ DEFAULT_CONFIG = with_common_config({
     # Workers sample async. Note that this increases the effective
     # sample_batch_size by up to 5x due to async buffering of batches.
     "sample_async": True,
+    # If positive, compute gradients in synchronous rounds and sum them up a
+    # tree of actors with this fan-in, applying their average once per round.
+    # This replaces the asynchronous per-worker updates of A3C, so it is
+    # separate from the common aggregation_fan_in used for filter sync.
+    "gradient_aggregation_fan_in": 0,
 })
 # __sphinx_doc_end__
 # yapf: enable
@@ -55,7 +60,10 @@ def validate_config(config):
 
 
 def make_async_optimizer(workers, config):
-    return AsyncGradientsOptimizer(workers, **config["optimizer"])
+    return AsyncGradientsOptimizer(
+        workers,
+        aggregation_fan_in=config["gradient_aggregation_fan_in"],
+        **config["optimizer"])
 
 
 A3CTrainer = build_trainer(
@@ -9,6 +9,7 @@ from __future__ import print_function
 from collections import namedtuple
 import logging
 import numpy as np
+import os
 import time
 
 import ray
@@ -29,6 +30,13 @@ Result = namedtuple("Result", [
     "eval_returns", "eval_lengths"
 ])
 
+
+def merge_results(results):
+    """Concatenates Results, to gather them through an AggregationTree."""
+    return Result(*[[x for r in results for x in getattr(r, field)]
+                    for field in Result._fields])
+
+
 # yapf: disable
 # __sphinx_doc_begin__
 DEFAULT_CONFIG = with_common_config({
@@ -47,14 +55,6 @@ DEFAULT_CONFIG = with_common_config({
 # yapf: enable
 
 
-@ray.remote
-def create_shared_noise(count):
-    """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
-    return noise
-
-
 class SharedNoiseTable(object):
     def __init__(self, noise):
         self.noise = noise
@@ -63,6 +63,14 @@ class SharedNoiseTable(object):
     def get(self, i, dim):
         return self.noise[i:i + dim]
 
+    def get_rows(self, dim):
+        """Returns a strided view whose row i is get(i, dim)."""
+        return np.lib.stride_tricks.as_strided(
+            self.noise,
+            shape=(len(self.noise) - dim + 1, dim),
+            strides=(self.noise.strides[0], self.noise.strides[0]),
+            writeable=False)
+
     def sample_index(self, dim):
         return np.random.randint(0, len(self.noise) - dim + 1)
 
@@ -73,10 +81,11 @@ class SharedNoiseTable(object):
 
 @ray.remote
 class Worker(object):
-    def __init__(self, config, env_creator, noise, min_task_runtime=0.2):
+    def __init__(self, config, env_creator, min_task_runtime=0.2):
         self.min_task_runtime = min_task_runtime
         self.config = config
-        self.noise = SharedNoiseTable(noise)
+        self.noise = SharedNoiseTable(
+            utils.get_shared_noise(config["noise_size"]))
 
         self.env = env_creator(config["env_config"])
         from ray.rllib import models
@@ -87,6 +96,9 @@ class Worker(object):
             self.sess, self.env.action_space, self.env.observation_space,
             self.preprocessor, config["observation_filter"], config["model"])
 
+    def get_host(self):
+        return os.uname()[1]
+
     @property
     def filters(self):
         return {DEFAULT_POLICY_ID: self.policy.get_filter()}
@@ -95,10 +107,11 @@ class Worker(object):
         for k in self.filters:
             self.filters[k].sync(new_filters[k])
 
-    def get_filters(self, flush_after=False):
+    def get_filters(self, flush_after=False, deltas=False):
         return_filters = {}
         for k, f in self.filters.items():
-            return_filters[k] = f.as_serializable()
+            return_filters[k] = f.as_delta() if deltas else \
+                f.as_serializable()
             if flush_after:
                 f.clear_buffer()
         return return_filters
@@ -180,15 +193,15 @@ class ARSTrainer(Trainer):
         self.num_rollouts = config["num_rollouts"]
         self.report_length = config["report_length"]
 
-        # Create the shared noise table.
+        # Create the shared noise table. Each node generates its own copy.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        self.noise = SharedNoiseTable(
+            utils.get_shared_noise(config["noise_size"]))
 
         # Create the actors.
         logger.info("Creating actors.")
         self.workers = [
-            Worker.remote(config, env_creator, noise_id)
+            Worker.remote(config, env_creator)
             for _ in range(config["num_workers"])
         ]
 
@@ -253,9 +266,9 @@ class ARSTrainer(Trainer):
         # Compute and take a step.
         g, count = utils.batched_weighted_sum(
             noisy_returns[:, 0] - noisy_returns[:, 1],
-            (self.noise.get(index, self.policy.num_params)
-             for index in noise_idx),
-            batch_size=min(500, noisy_returns[:, 0].size))
+            self.noise.get_rows(self.policy.num_params),
+            batch_size=min(500, noisy_returns[:, 0].size),
+            indices=noise_idx)
         g /= noise_idx.size
         # scale the returns by their standard deviation
         if not np.isclose(np.std(noisy_returns), 0.0):
@@ -271,9 +284,10 @@ class ARSTrainer(Trainer):
             self.reward_list.append(eval_returns.mean())
 
         # Now sync the filters
-        FilterManager.synchronize({
-            DEFAULT_POLICY_ID: self.policy.get_filter()
-        }, self.workers)
+        FilterManager.synchronize(
+            {DEFAULT_POLICY_ID: self.policy.get_filter()},
+            self.workers,
+            tree=self._get_aggregation_tree(self.workers))
 
         info = {
             "weights_norm": np.square(theta).sum(),
@@ -297,6 +311,7 @@ class ARSTrainer(Trainer):
         # workaround for https://github.com/ray-project/ray/issues/1516
         for w in self.workers:
             w.__ray_terminate__.remote()
+        self._stop_aggregation_tree()
 
     @override(Trainer)
     def compute_action(self, observation):
@@ -309,11 +324,17 @@ class ARSTrainer(Trainer):
             logger.debug(
                 "Collected {} episodes {} timesteps so far this iter".format(
                     num_episodes, num_timesteps))
-            rollout_ids = [
-                worker.do_rollouts.remote(theta_id) for worker in self.workers
-            ]
             # Get the results of the rollouts.
-            for result in ray_get_and_free(rollout_ids):
+            tree = self._get_aggregation_tree(self.workers)
+            if tree is not None:
+                # Gather the results through the tree, as a single Result
+                batch = [tree.reduce("do_rollouts", merge_results, theta_id)]
+            else:
+                batch = ray_get_and_free([
+                    worker.do_rollouts.remote(theta_id)
+                    for worker in self.workers
+                ])
+            for result in batch:
                 results.append(result)
                 # Update the number of episodes and the number of timesteps
                 # keeping in mind that result.noisy_lengths is a list of lists,
@@ -335,6 +356,7 @@ class ARSTrainer(Trainer):
         self.episodes_so_far = state["episodes_so_far"]
         self.policy.set_weights(state["weights"])
         self.policy.set_filter(state["filter"])
-        FilterManager.synchronize({
-            DEFAULT_POLICY_ID: self.policy.get_filter()
-        }, self.workers)
+        FilterManager.synchronize(
+            {DEFAULT_POLICY_ID: self.policy.get_filter()},
+            self.workers,
+            tree=self._get_aggregation_tree(self.workers))
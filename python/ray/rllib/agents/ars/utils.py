@@ -5,11 +5,21 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import fcntl
+import logging
+import os
+import tempfile
+
 import numpy as np
 from ray.rllib.utils import try_import_tf
 
 tf = try_import_tf()
 
+logger = logging.getLogger(__name__)
+
+# Number of samples to generate at a time when creating the noise table
+NOISE_CHUNK_SIZE = 1 << 24
+
 
 def compute_ranks(x):
     """Returns ranks in [0, len(x))
@@ -50,7 +60,21 @@ def itergroups(items, group_size):
         yield tuple(group)
 
 
-def batched_weighted_sum(weights, vecs, batch_size):
+def batched_weighted_sum(weights, vecs, batch_size, indices=None):
+    """Returns the sum of weights[i] * vecs[i] and the number of items summed.
+
+    If indices is given, vecs must be a 2D array and the i-th vector is taken
+    to be vecs[indices[i]]. The rows of each batch are then gathered in bulk,
+    which is fast for strided views over a noise table.
+    """
+    if indices is not None:
+        weights = np.asarray(weights, dtype=np.float32)
+        total = 0
+        for start in range(0, len(indices), batch_size):
+            end = start + batch_size
+            total += np.dot(weights[start:end], vecs[indices[start:end]])
+        return total, len(indices)
+
     total = 0
     num_items_summed = 0
     for batch_weights, batch_vecs in zip(
@@ -61,3 +85,52 @@ def batched_weighted_sum(weights, vecs, batch_size):
             np.asarray(batch_vecs, dtype=np.float32))
         num_items_summed += len(batch_weights)
     return total, num_items_summed
+
+
+def get_shared_noise(count, seed=123, directory=None):
+    """Returns a read-only table of `count` standard normal float32 samples.
+
+    The table is generated deterministically from the seed at most once per
+    node, into a file that is memory mapped by every process that uses it, so
+    all processes on a node share a single copy. The file is left in place
+    for reuse by later runs, and an existing table in /dev/shm or the temp
+    directory is reused.
+
+    Arguments:
+        count (int): Number of samples.
+        seed (int): Seed of the samples.
+        directory (str): Directory to generate the table in if there is no
+            existing one. Defaults to the temp directory. Note that a table
+            in a RAM-backed directory such as /dev/shm uses memory until it
+            is deleted.
+    """
+    size = count * np.dtype(np.float32).itemsize
+    name = "rllib_noise_{}_{}.float32".format(seed, count)
+    directory = directory or tempfile.gettempdir()
+    lock_path = os.path.join(tempfile.gettempdir(), name + ".lock")
+    with open(lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            for d in [directory, "/dev/shm", tempfile.gettempdir()]:
+                path = os.path.join(d, name)
+                if os.path.isfile(path) and os.path.getsize(path) == size:
+                    break
+            else:
+                path = os.path.join(directory, name)
+                logger.info("Generating noise table {}".format(path))
+                _write_noise(path, count, seed)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return np.memmap(path, dtype=np.float32, mode="r", shape=(count, ))
+
+
+def _write_noise(path, count, seed):
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    # Chunked draws from one RandomState give the same sequence as a single
+    # randn(count) call, without materializing it in float64
+    rs = np.random.RandomState(seed)
+    with open(tmp_path, "wb") as f:
+        for start in range(0, count, NOISE_CHUNK_SIZE):
+            n = min(NOISE_CHUNK_SIZE, count - start)
+            rs.randn(n).astype(np.float32).tofile(f)
+    os.rename(tmp_path, path)
@@ -8,6 +8,7 @@ from __future__ import print_function
 from collections import namedtuple
 import logging
 import numpy as np
+import os
 import time
 
 import ray
@@ -28,6 +29,13 @@ Result = namedtuple("Result", [
     "eval_returns", "eval_lengths"
 ])
 
+
+def merge_results(results):
+    """Concatenates Results, to gather them through an AggregationTree."""
+    return Result(*[[x for r in results for x in getattr(r, field)]
+                    for field in Result._fields])
+
+
 # yapf: disable
 # __sphinx_doc_begin__
 DEFAULT_CONFIG = with_common_config({
@@ -47,14 +55,6 @@ DEFAULT_CONFIG = with_common_config({
 # yapf: enable
 
 
-@ray.remote
-def create_shared_noise(count):
-    """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
-    return noise
-
-
 class SharedNoiseTable(object):
     def __init__(self, noise):
         self.noise = noise
@@ -63,6 +63,14 @@ class SharedNoiseTable(object):
     def get(self, i, dim):
         return self.noise[i:i + dim]
 
+    def get_rows(self, dim):
+        """Returns a strided view whose row i is get(i, dim)."""
+        return np.lib.stride_tricks.as_strided(
+            self.noise,
+            shape=(len(self.noise) - dim + 1, dim),
+            strides=(self.noise.strides[0], self.noise.strides[0]),
+            writeable=False)
+
     def sample_index(self, dim):
         return np.random.randint(0, len(self.noise) - dim + 1)
 
@@ -73,12 +81,12 @@ class Worker(object):
                  config,
                  policy_params,
                  env_creator,
-                 noise,
                  min_task_runtime=0.2):
         self.min_task_runtime = min_task_runtime
         self.config = config
         self.policy_params = policy_params
-        self.noise = SharedNoiseTable(noise)
+        self.noise = SharedNoiseTable(
+            utils.get_shared_noise(config["noise_size"]))
 
         self.env = env_creator(config["env_config"])
         from ray.rllib import models
@@ -91,6 +99,9 @@ class Worker(object):
             self.preprocessor, config["observation_filter"], config["model"],
             **policy_params)
 
+    def get_host(self):
+        return os.uname()[1]
+
     @property
     def filters(self):
         return {DEFAULT_POLICY_ID: self.policy.get_filter()}
@@ -99,10 +110,11 @@ class Worker(object):
         for k in self.filters:
             self.filters[k].sync(new_filters[k])
 
-    def get_filters(self, flush_after=False):
+    def get_filters(self, flush_after=False, deltas=False):
         return_filters = {}
         for k, f in self.filters.items():
-            return_filters[k] = f.as_serializable()
+            return_filters[k] = f.as_delta() if deltas else \
+                f.as_serializable()
             if flush_after:
                 f.clear_buffer()
         return return_filters
@@ -185,15 +197,15 @@ class ESTrainer(Trainer):
         self.optimizer = optimizers.Adam(self.policy, config["stepsize"])
         self.report_length = config["report_length"]
 
-        # Create the shared noise table.
+        # Create the shared noise table. Each node generates its own copy.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        self.noise = SharedNoiseTable(
+            utils.get_shared_noise(config["noise_size"]))
 
         # Create the actors.
         logger.info("Creating actors.")
         self._workers = [
-            Worker.remote(config, policy_params, env_creator, noise_id)
+            Worker.remote(config, policy_params, env_creator)
             for _ in range(config["num_workers"])
         ]
 
@@ -252,9 +264,9 @@ class ESTrainer(Trainer):
         # Compute and take a step.
         g, count = utils.batched_weighted_sum(
             proc_noisy_returns[:, 0] - proc_noisy_returns[:, 1],
-            (self.noise.get(index, self.policy.num_params)
-             for index in noise_indices),
-            batch_size=500)
+            self.noise.get_rows(self.policy.num_params),
+            batch_size=500,
+            indices=noise_indices)
         g /= noisy_returns.size
         assert (g.shape == (self.policy.num_params, ) and g.dtype == np.float32
                 and count == len(noise_indices))
@@ -268,9 +280,10 @@ class ESTrainer(Trainer):
             self.reward_list.append(np.mean(eval_returns))
 
         # Now sync the filters
-        FilterManager.synchronize({
-            DEFAULT_POLICY_ID: self.policy.get_filter()
-        }, self._workers)
+        FilterManager.synchronize(
+            {DEFAULT_POLICY_ID: self.policy.get_filter()},
+            self._workers,
+            tree=self._get_aggregation_tree(self._workers))
 
         info = {
             "weights_norm": np.square(theta).sum(),
@@ -298,6 +311,7 @@ class ESTrainer(Trainer):
         # workaround for https://github.com/ray-project/ray/issues/1516
         for w in self._workers:
             w.__ray_terminate__.remote()
+        self._stop_aggregation_tree()
 
     def _collect_results(self, theta_id, min_episodes, min_timesteps):
         num_episodes, num_timesteps = 0, 0
@@ -306,11 +320,17 @@ class ESTrainer(Trainer):
             logger.info(
                 "Collected {} episodes {} timesteps so far this iter".format(
                     num_episodes, num_timesteps))
-            rollout_ids = [
-                worker.do_rollouts.remote(theta_id) for worker in self._workers
-            ]
             # Get the results of the rollouts.
-            for result in ray_get_and_free(rollout_ids):
+            tree = self._get_aggregation_tree(self._workers)
+            if tree is not None:
+                # Gather the results through the tree, as a single Result
+                batch = [tree.reduce("do_rollouts", merge_results, theta_id)]
+            else:
+                batch = ray_get_and_free([
+                    worker.do_rollouts.remote(theta_id)
+                    for worker in self._workers
+                ])
+            for result in batch:
                 results.append(result)
                 # Update the number of episodes and the number of timesteps
                 # keeping in mind that result.noisy_lengths is a list of lists,
@@ -332,6 +352,7 @@ class ESTrainer(Trainer):
         self.episodes_so_far = state["episodes_so_far"]
         self.policy.set_weights(state["weights"])
         self.policy.set_filter(state["filter"])
-        FilterManager.synchronize({
-            DEFAULT_POLICY_ID: self.policy.get_filter()
-        }, self._workers)
+        FilterManager.synchronize(
+            {DEFAULT_POLICY_ID: self.policy.get_filter()},
+            self._workers,
+            tree=self._get_aggregation_tree(self._workers))
@@ -20,6 +20,7 @@ from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.evaluation.worker_set import WorkerSet
 from ray.rllib.utils.annotations import override, PublicAPI, DeveloperAPI
 from ray.rllib.utils import FilterManager, deep_update, merge_dicts
+from ray.rllib.utils.aggregation_tree import AggregationTree
 from ray.rllib.utils.memory import ray_get_and_free
 from ray.rllib.utils import try_import_tf
 from ray.tune.registry import ENV_CREATOR, register_env, _global_registry
@@ -150,6 +151,11 @@ COMMON_CONFIG = {
     "observation_filter": "NoFilter",
     # Whether to synchronize the statistics of remote filters.
     "synchronize_filters": True,
+    # If positive, gather filter updates from the remote workers through a
+    # tree of actors with this fan-in instead of all on the driver, which
+    # helps with hundreds of workers. ES and ARS also gather their rollout
+    # results this way. A3C has its own gradient_aggregation_fan_in.
+    "aggregation_fan_in": 0,
     # Configure TF for single-process operation by default
     "tf_session_args": {
         # note: overriden by `local_tf_session_args`
@@ -175,7 +181,8 @@ COMMON_CONFIG = {
     "compress_observations": False,
     # Drop metric batches from unresponsive workers after this many seconds
     "collect_metrics_timeout": 180,
-    # Smooth metrics over this many episodes.
+    # Smooth metrics over at least this many episodes. Whole iterations are
+    # added until this many are reached.
     "metrics_smoothing_episodes": 100,
     # If using num_envs_per_worker > 1, whether to create those new envs in
     # remote processes instead of in the same worker. This adds overheads, but
@@ -187,6 +194,12 @@ COMMON_CONFIG = {
     # but optimal value could be obtained by measuring your environment
     # step / reset and model inference perf.
     "remote_env_batch_wait_ms": 0,
+    # If positive and using num_envs_per_worker > 1, step the envs of each
+    # worker in this many local subprocesses, with observations and actions
+    # of Box / Discrete spaces passed through shared memory. This scales
+    # CPU-heavy envs across the cores of a node without the per-step object
+    # store traffic of remote_worker_envs.
+    "num_env_processes": 0,
     # Minimum time per iteration
     "min_iter_time_s": 0,
     # Minimum env steps to optimize for per train call. This value does
@@ -219,6 +232,15 @@ COMMON_CONFIG = {
     # of this number of batches. Use this if the input data is not in random
     # enough order. Input is delayed until the shuffle buffer is filled.
     "shuffle_buffer_size": 0,
+    # If positive, offline input files are read by this many background
+    # threads that decode and postprocess batches in parallel, instead of
+    # line by line on the sampling thread.
+    "input_num_readers": 0,
+    # Max number of decoded batches to prefetch when using parallel readers.
+    "input_prefetch_batches": 16,
+    # If set, the file order of each pass over the input files is derived
+    # deterministically from this seed when using parallel readers.
+    "input_seed": None,
     # Specify where experiences should be saved:
     #  - None: don't save any experiences
     #  - "logdir" to save to the agent log dir
@@ -376,7 +398,9 @@ class Trainer(Trainable):
             FilterManager.synchronize(
                 self.workers.local_worker().filters,
                 self.workers.remote_workers(),
-                update_remote=self.config["synchronize_filters"])
+                update_remote=self.config["synchronize_filters"],
+                tree=self._get_aggregation_tree(
+                    self.workers.remote_workers()))
             logger.debug("synchronized filters: {}".format(
                 self.workers.local_worker().filters))
 
@@ -460,6 +484,7 @@ class Trainer(Trainable):
             self.workers.stop()
         if hasattr(self, "optimizer"):
             self.optimizer.stop()
+        self._stop_aggregation_tree()
 
     @override(Trainable)
     def _save(self, checkpoint_dir):
@@ -745,6 +770,29 @@ class Trainer(Trainable):
 
         self.optimizer.reset(healthy_workers)
 
+    @DeveloperAPI
+    def _get_aggregation_tree(self, remote_workers):
+        """Returns an AggregationTree over the given workers.
+
+        Returns None if aggregation_fan_in is not set or there are too few
+        workers for a tree to help. The tree is rebuilt if the set of
+        workers changes, e.g., after a worker failure.
+        """
+        fan_in = self.config["aggregation_fan_in"]
+        if not fan_in or len(remote_workers) <= fan_in:
+            return None
+        tree = getattr(self, "_aggregation_tree", None)
+        if tree is None or tree.leaves != list(remote_workers):
+            self._stop_aggregation_tree()
+            tree = AggregationTree(remote_workers, fan_in)
+            self._aggregation_tree = tree
+        return tree
+
+    def _stop_aggregation_tree(self):
+        if getattr(self, "_aggregation_tree", None) is not None:
+            self._aggregation_tree.stop()
+            self._aggregation_tree = None
+
     def _has_policy_optimizer(self):
         return hasattr(self, "optimizer") and isinstance(
             self.optimizer, PolicyOptimizer)
@@ -3,9 +3,10 @@ from ray.rllib.env.multi_agent_env import MultiAgentEnv
 from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.env.serving_env import ServingEnv
 from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.env.subproc_vector_env import SubprocVectorEnv
 from ray.rllib.env.env_context import EnvContext
 
 __all__ = [
     "BaseEnv", "MultiAgentEnv", "ExternalEnv", "VectorEnv", "ServingEnv",
-    "EnvContext"
+    "EnvContext", "SubprocVectorEnv"
 ]
@@ -81,14 +81,19 @@ class BaseEnv(object):
                     make_env=None,
                     num_envs=1,
                     remote_envs=False,
-                    remote_env_batch_wait_ms=0):
+                    remote_env_batch_wait_ms=0,
+                    num_env_processes=0):
         """Wraps any env type as needed to expose the async interface."""
 
         from ray.rllib.env.remote_vector_env import RemoteVectorEnv
+        from ray.rllib.env.subproc_vector_env import SubprocVectorEnv
         if remote_envs and num_envs == 1:
             raise ValueError(
                 "Remote envs only make sense to use if num_envs > 1 "
                 "(i.e. vectorization is enabled).")
+        if remote_envs and num_env_processes > 0:
+            raise ValueError(
+                "Only one of remote envs and env processes can be enabled.")
 
         if not isinstance(env, BaseEnv):
             if isinstance(env, MultiAgentEnv):
@@ -123,6 +128,14 @@ class BaseEnv(object):
                         num_envs,
                         multiagent=False,
                         remote_env_batch_wait_ms=remote_env_batch_wait_ms)
+                elif num_env_processes > 0 and num_envs > 1:
+                    env = SubprocVectorEnv(
+                        make_env,
+                        num_envs,
+                        num_env_processes,
+                        action_space=env.action_space,
+                        observation_space=env.observation_space)
+                    env = _VectorEnvToBaseEnv(env)
                 else:
                     env = VectorEnv.wrap(
                         make_env=make_env,
@@ -199,6 +212,9 @@ class BaseEnv(object):
                 env.close()
 
 
+# How often to check the serving thread is alive while waiting for data
+_EXTERNAL_ENV_POLL_TIMEOUT_S = 1.0
+
 # Fixed agent identifier when there is only the single agent in the env
 _DUMMY_AGENT_ID = "agent0"
 
@@ -226,10 +242,12 @@ class _ExternalEnvToBaseEnv(BaseEnv):
         with self.external_env._results_avail_condition:
             results = self._poll()
             while len(results[0]) == 0:
-                self.external_env._results_avail_condition.wait()
+                while not self.external_env._ready_episodes:
+                    self.external_env._results_avail_condition.wait(
+                        _EXTERNAL_ENV_POLL_TIMEOUT_S)
+                    if not self.external_env.isAlive():
+                        raise Exception("Serving thread has stopped.")
                 results = self._poll()
-                if not self.external_env.isAlive():
-                    raise Exception("Serving thread has stopped.")
         limit = self.external_env._max_concurrent_episodes
         assert len(results[0]) < limit, \
             ("Too many concurrent episodes, were some leaked? This "
@@ -240,31 +258,43 @@ class _ExternalEnvToBaseEnv(BaseEnv):
     def send_actions(self, action_dict):
         if self.multiagent:
             for env_id, actions in action_dict.items():
-                self.external_env._episodes[env_id].action_queue.put(actions)
+                self.external_env._episodes[env_id].put_action(actions)
         else:
             for env_id, action in action_dict.items():
-                self.external_env._episodes[env_id].action_queue.put(
+                self.external_env._episodes[env_id].put_action(
                     action[_DUMMY_AGENT_ID])
 
     def _poll(self):
         all_obs, all_rewards, all_dones, all_infos = {}, {}, {}, {}
         off_policy_actions = {}
-        for eid, episode in self.external_env._episodes.copy().items():
+        episodes = self.external_env._episodes
+        ready = self.external_env._ready_episodes
+        # Only visit episodes that sent data. Data sent by an episode
+        # already polled here is left in the queue for the next poll.
+        deferred = []
+        while ready:
+            eid = ready.popleft()
+            if eid in all_obs:
+                deferred.append(eid)
+                continue
+            episode = episodes.get(eid)
+            if episode is None:
+                continue
             data = episode.get_data()
-            cur_done = episode.cur_done_dict[
-                "__all__"] if self.multiagent else episode.cur_done
+            cur_done = data["done"]["__all__"] if self.multiagent \
+                else data["done"]
             if cur_done:
-                del self.external_env._episodes[eid]
-            if data:
-                if self.prep:
-                    all_obs[eid] = self.prep.transform(data["obs"])
-                else:
-                    all_obs[eid] = data["obs"]
-                all_rewards[eid] = data["reward"]
-                all_dones[eid] = data["done"]
-                all_infos[eid] = data["info"]
-                if "off_policy_action" in data:
-                    off_policy_actions[eid] = data["off_policy_action"]
+                del episodes[eid]
+            if self.prep:
+                all_obs[eid] = self.prep.transform(data["obs"])
+            else:
+                all_obs[eid] = data["obs"]
+            all_rewards[eid] = data["reward"]
+            all_dones[eid] = data["done"]
+            all_infos[eid] = data["info"]
+            if "off_policy_action" in data:
+                off_policy_actions[eid] = data["off_policy_action"]
+        ready.extendleft(reversed(deferred))
         if self.multiagent:
             # ensure a consistent set of keys
             # rely on all_obs having all possible keys for now
@@ -339,6 +369,12 @@ class _VectorEnvToBaseEnv(BaseEnv):
     def get_unwrapped(self):
         return self.vector_env.get_unwrapped()
 
+    @override(BaseEnv)
+    def stop(self):
+        BaseEnv.stop(self)
+        if hasattr(self.vector_env, "close"):
+            self.vector_env.close()
+
 
 class _MultiAgentEnvToBaseEnv(BaseEnv):
     """Internal adapter of MultiAgentEnv to BaseEnv.
@@ -2,11 +2,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 from six.moves import queue
 import threading
 import uuid
 
-from ray.rllib.utils.annotations import PublicAPI
+from ray.rllib.utils.annotations import PublicAPI, DeveloperAPI
 
 
 @PublicAPI
@@ -59,6 +60,9 @@ class ExternalEnv(threading.Thread):
         self._episodes = {}
         self._finished = set()
         self._results_avail_condition = threading.Condition()
+        # Ids of episodes with new data, in the order the data was sent.
+        # Only accessed while holding _results_avail_condition.
+        self._ready_episodes = collections.deque()
         self._max_concurrent_episodes = max_concurrent
 
     @PublicAPI
@@ -104,7 +108,8 @@ class ExternalEnv(threading.Thread):
                 "Episode {} is already started".format(episode_id))
 
         self._episodes[episode_id] = _ExternalEnvEpisode(
-            episode_id, self._results_avail_condition, training_enabled)
+            episode_id, self._results_avail_condition, training_enabled,
+            self._ready_episodes)
 
         return episode_id
 
@@ -136,6 +141,25 @@ class ExternalEnv(threading.Thread):
         episode = self._get(episode_id)
         episode.log_action(observation, action)
 
+    @DeveloperAPI
+    def request_action(self, episode_id, observation, callback, action=None):
+        """Non-blocking version of get_action() and log_action().
+
+        Records the observation (and off-policy action if given) and returns
+        immediately. Once the policy has computed the action (or processed
+        the off-policy action), `callback(action)` is called from the
+        sampling thread, so it must be fast and thread-safe.
+
+        Arguments:
+            episode_id (str): Episode id returned from start_episode().
+            observation (obj): Current environment observation.
+            callback (func): Called with the action for the observation.
+            action (obj): Off-policy action for the observation, if any.
+        """
+
+        episode = self._get(episode_id)
+        episode.request_action(observation, callback, action)
+
     @PublicAPI
     def log_returns(self, episode_id, reward, info=None):
         """Record returns from the environment.
@@ -188,13 +212,16 @@ class _ExternalEnvEpisode(object):
                  episode_id,
                  results_avail_condition,
                  training_enabled,
+                 ready_queue,
                  multiagent=False):
         self.episode_id = episode_id
         self.results_avail_condition = results_avail_condition
+        self.ready_queue = ready_queue
         self.training_enabled = training_enabled
         self.multiagent = multiagent
         self.data_queue = queue.Queue()
         self.action_queue = queue.Queue()
+        self.action_callback = None
         if multiagent:
             self.new_observation_dict = None
             self.new_action_dict = None
@@ -214,23 +241,28 @@ class _ExternalEnvEpisode(object):
         return self.data_queue.get_nowait()
 
     def log_action(self, observation, action):
-        if self.multiagent:
-            self.new_observation_dict = observation
-            self.new_action_dict = action
-        else:
-            self.new_observation = observation
-            self.new_action = action
+        self._set_observation(observation, action)
         self._send()
         self.action_queue.get(True, timeout=60.0)
 
     def wait_for_action(self, observation):
-        if self.multiagent:
-            self.new_observation_dict = observation
-        else:
-            self.new_observation = observation
+        self._set_observation(observation)
         self._send()
         return self.action_queue.get(True, timeout=60.0)
 
+    def request_action(self, observation, callback, action=None):
+        # Set before sending, the action may be put right after
+        self.action_callback = callback
+        self._set_observation(observation, action)
+        self._send()
+
+    def put_action(self, action):
+        callback, self.action_callback = self.action_callback, None
+        if callback is not None:
+            callback(action)
+        else:
+            self.action_queue.put(action)
+
     def done(self, observation):
         if self.multiagent:
             self.new_observation_dict = observation
@@ -240,6 +272,14 @@ class _ExternalEnvEpisode(object):
             self.cur_done = True
         self._send()
 
+    def _set_observation(self, observation, action=None):
+        if self.multiagent:
+            self.new_observation_dict = observation
+            self.new_action_dict = action
+        else:
+            self.new_observation = observation
+            self.new_action = action
+
     def _send(self):
         if self.multiagent:
             item = {
@@ -269,4 +309,5 @@ class _ExternalEnvEpisode(object):
             item["info"]["training_enabled"] = False
         with self.results_avail_condition:
             self.data_queue.put_nowait(item)
+            self.ready_queue.append(self.episode_id)
             self.results_avail_condition.notify()
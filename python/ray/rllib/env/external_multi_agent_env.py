@@ -71,6 +71,7 @@ class ExternalMultiAgentEnv(ExternalEnv):
             episode_id,
             self._results_avail_condition,
             training_enabled,
+            self._ready_episodes,
             multiagent=True)
 
         return episode_id
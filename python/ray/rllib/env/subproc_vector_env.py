@@ -0,0 +1,273 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import logging
+import multiprocessing
+import traceback
+
+import gym
+import numpy as np
+
+from ray import cloudpickle as pickle
+from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.utils.annotations import override, PublicAPI
+
+logger = logging.getLogger(__name__)
+
+
+@PublicAPI
+class SubprocVectorEnv(VectorEnv):
+    """Vector env that steps sub-envs in a pool of local worker processes.
+
+    Each worker process owns a contiguous slice of the sub-envs and steps
+    them in a batch per call. For Box and Discrete spaces, observations are
+    written into a shared-memory numpy block and actions are read from one,
+    so only rewards, dones and infos go through the pipe. Other spaces are
+    sent through the pipe.
+
+    Observations are returned with the dtype of the observation space.
+
+    The worker processes are started with the "spawn" method where available,
+    so they don't inherit the state of the calling process.
+    """
+
+    def __init__(self,
+                 make_env,
+                 num_envs,
+                 num_processes,
+                 action_space,
+                 observation_space):
+        """Initialize a SubprocVectorEnv.
+
+        Arguments:
+            make_env (func): Factory that produces a new gym env given the
+                vector index.
+            num_envs (int): Number of sub-envs to create.
+            num_processes (int): Number of worker processes to step the
+                sub-envs in. Capped at num_envs.
+            action_space (gym.Space): Action space of individual envs.
+            observation_space (gym.Space): Observation space of individual
+                envs.
+        """
+        self.num_envs = num_envs
+        self.action_space = action_space
+        self.observation_space = observation_space
+        num_processes = max(1, min(num_processes, num_envs))
+        ctx = _get_context()
+
+        self._obs_buf, self._obs = _shared_array(ctx, observation_space,
+                                                 num_envs)
+        self._act_buf, self._actions = _shared_array(ctx, action_space,
+                                                     num_envs)
+
+        # Split the sub-envs into contiguous slices, one per process
+        bounds = np.linspace(0, num_envs, num_processes + 1).astype(int)
+        self._slices = [(bounds[i], bounds[i + 1])
+                        for i in range(num_processes)]
+        self._proc_index = np.repeat(
+            np.arange(num_processes), np.diff(bounds))
+        self._conns = []
+        self._procs = []
+        make_env_bytes = pickle.dumps(make_env)
+        for start, end in self._slices:
+            conn, child_conn = ctx.Pipe()
+            proc = ctx.Process(
+                target=_env_worker,
+                args=(child_conn, make_env_bytes, start, end, self._obs_buf,
+                      observation_space, self._act_buf, action_space,
+                      num_envs))
+            proc.daemon = True
+            proc.start()
+            child_conn.close()
+            self._conns.append(conn)
+            self._procs.append(proc)
+        logger.info("Started {} env subprocesses for {} envs".format(
+            num_processes, num_envs))
+
+    @override(VectorEnv)
+    def vector_reset(self):
+        for conn in self._conns:
+            conn.send(("reset", None))
+        obs = []
+        for reply in _recv_all(self._conns):
+            obs.extend(reply)
+        return self._collect_obs(obs)
+
+    @override(VectorEnv)
+    def reset_at(self, index):
+        conn = self._conns[self._proc_index[index]]
+        conn.send(("reset", [index]))
+        obs = _recv_all([conn])[0][0]
+        if self._obs is not None:
+            return self._obs[index].copy()
+        return obs
+
+    @override(VectorEnv)
+    def vector_step(self, actions):
+        if self._actions is not None:
+            self._actions[:] = actions
+        for conn, (start, end) in zip(self._conns, self._slices):
+            conn.send(("step",
+                       None if self._actions is not None else
+                       actions[start:end]))
+        obs_batch, rew_batch, done_batch, info_batch = [], [], [], []
+        for obs, rewards, dones, infos in _recv_all(self._conns):
+            obs_batch.extend(obs)
+            rew_batch.extend(rewards)
+            done_batch.extend(dones)
+            info_batch.extend(infos)
+        return (self._collect_obs(obs_batch), rew_batch, done_batch,
+                info_batch)
+
+    @override(VectorEnv)
+    def get_unwrapped(self):
+        # The sub-envs only exist in the worker processes.
+        return []
+
+    def close(self):
+        """Closes all sub-envs and shuts down the worker processes."""
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (IOError, EOFError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._conns = []
+        self._procs = []
+
+    def _collect_obs(self, obs):
+        if self._obs is None:
+            return obs
+        # Copy out since the shared block is overwritten by the next step
+        return list(self._obs.copy())
+
+
+def _get_context():
+    if hasattr(multiprocessing, "get_context"):
+        return multiprocessing.get_context("spawn")
+    # Python 2 only supports forking
+    return multiprocessing
+
+
+def _shared_array(ctx, space, num_envs):
+    """Returns a shared buffer and numpy view for a batch of space values.
+
+    Returns (None, None) if values of the space don't have a fixed shape.
+    """
+
+    spec = _shared_spec(space)
+    if spec is None:
+        return None, None
+    dtype, shape = spec
+    size = num_envs * int(np.prod(shape)) * dtype.itemsize
+    buf = ctx.RawArray("b", max(size, 1))
+    return buf, _as_array(buf, space, num_envs)
+
+
+def _shared_spec(space):
+    if isinstance(space, gym.spaces.Box):
+        return np.dtype(space.dtype), space.shape
+    elif isinstance(space, gym.spaces.Discrete):
+        return np.dtype(np.int64), ()
+    return None
+
+
+def _as_array(buf, space, num_envs):
+    dtype, shape = _shared_spec(space)
+    count = num_envs * int(np.prod(shape))
+    return np.frombuffer(
+        buf, dtype=dtype, count=count).reshape((num_envs, ) + shape)
+
+
+def _recv_all(conns):
+    """Returns one reply from each connection.
+
+    All replies are read before raising the first error, so that no stale
+    replies are left in the pipes for the next call.
+    """
+
+    replies = []
+    error = None
+    for conn in conns:
+        try:
+            status, payload = conn.recv()
+        except EOFError:
+            status, payload = "error", "Env subprocess exited unexpectedly"
+        if status == "error" and error is None:
+            error = payload
+        replies.append(payload)
+    if error is not None:
+        raise RuntimeError("Error in env subprocess:\n{}".format(error))
+    return replies
+
+
+def _env_worker(conn, make_env_bytes, start, end, obs_buf, observation_space,
+                act_buf, action_space, num_envs):
+    """Steps the sub-envs [start, end) on requests sent through conn."""
+
+    obs_view = act_view = None
+    if obs_buf is not None:
+        obs_view = _as_array(obs_buf, observation_space, num_envs)
+    if act_buf is not None:
+        act_view = _as_array(act_buf, action_space, num_envs)
+    try:
+        make_env = pickle.loads(make_env_bytes)
+        envs = {i: make_env(i) for i in range(start, end)}
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        conn.close()
+        return
+
+    def put_obs(i, obs):
+        if obs_view is None:
+            return obs
+        obs_view[i] = obs
+        return None
+
+    while True:
+        try:
+            cmd, arg = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        try:
+            if cmd == "reset":
+                indices = range(start, end) if arg is None else arg
+                conn.send(("ok", [put_obs(i, envs[i].reset())
+                                  for i in indices]))
+            elif cmd == "step":
+                obs_batch, rew_batch, done_batch, info_batch = [], [], [], []
+                for i in range(start, end):
+                    action = (act_view[i]
+                              if act_view is not None else arg[i - start])
+                    if isinstance(action_space, gym.spaces.Discrete):
+                        action = int(action)
+                    obs, r, done, info = envs[i].step(action)
+                    if not np.isscalar(r) or not np.isreal(r) or \
+                            not np.isfinite(r):
+                        raise ValueError(
+                            "Reward should be finite scalar, got {} ({})".
+                            format(r, type(r)))
+                    if type(info) is not dict:
+                        raise ValueError(
+                            "Info should be a dict, got {} ({})".format(
+                                info, type(info)))
+                    obs_batch.append(put_obs(i, obs))
+                    rew_batch.append(r)
+                    done_batch.append(done)
+                    info_batch.append(info)
+                conn.send(("ok", (obs_batch, rew_batch, done_batch,
+                                  info_batch)))
+            elif cmd == "close":
+                for env in envs.values():
+                    if hasattr(env, "close"):
+                        env.close()
+                break
+            else:
+                raise ValueError("Unknown command {}".format(cmd))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+    conn.close()
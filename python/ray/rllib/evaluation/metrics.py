@@ -3,8 +3,6 @@ from __future__ import division
 from __future__ import print_function
 
 import logging
-import numpy as np
-import collections
 
 import ray
 from ray.rllib.policy.sample_batch import DEFAULT_POLICY_ID
@@ -12,9 +10,13 @@ from ray.rllib.offline.off_policy_estimator import OffPolicyEstimate
 from ray.rllib.policy.policy import LEARNER_STATS_KEY
 from ray.rllib.utils.annotations import DeveloperAPI
 from ray.rllib.utils.memory import ray_get_and_free
+from ray.rllib.utils.stat_sketch import StatSketch
 
 logger = logging.getLogger(__name__)
 
+# Percentiles of episode rewards, lengths and custom metrics to report
+PERCENTILES = [10, 50, 90]
+
 
 @DeveloperAPI
 def get_learner_stats(grad_info):
@@ -42,10 +44,9 @@ def get_learner_stats(grad_info):
 def collect_metrics(local_worker=None, remote_workers=[], timeout_seconds=180):
     """Gathers episode metrics from RolloutWorker instances."""
 
-    episodes, num_dropped = collect_episodes(
+    summary, num_dropped = collect_metrics_summary(
         local_worker, remote_workers, timeout_seconds=timeout_seconds)
-    metrics = summarize_episodes(episodes, episodes, num_dropped)
-    return metrics
+    return summary.summarize(num_dropped)
 
 
 @DeveloperAPI
@@ -53,28 +54,42 @@ def collect_episodes(local_worker=None, remote_workers=[],
                      timeout_seconds=180):
     """Gathers new episodes metrics tuples from the given evaluators."""
 
-    if remote_workers:
-        pending = [
-            a.apply.remote(lambda ev: ev.get_metrics()) for a in remote_workers
-        ]
-        collected, _ = ray.wait(
-            pending, num_returns=len(pending), timeout=timeout_seconds * 1.0)
-        num_metric_batches_dropped = len(pending) - len(collected)
-        if pending and len(collected) == 0:
-            raise ValueError(
-                "Timed out waiting for metrics from workers. You can "
-                "configure this timeout with `collect_metrics_timeout`.")
-        metric_lists = ray_get_and_free(collected)
-    else:
-        metric_lists = []
-        num_metric_batches_dropped = 0
-
-    if local_worker:
-        metric_lists.append(local_worker.get_metrics())
+    metric_lists, num_dropped = _collect(
+        lambda ev: ev.get_metrics(), local_worker, remote_workers,
+        timeout_seconds)
     episodes = []
     for metrics in metric_lists:
         episodes.extend(metrics)
-    return episodes, num_metric_batches_dropped
+    return episodes, num_dropped
+
+
+@DeveloperAPI
+def collect_metrics_summary(local_worker=None,
+                            remote_workers=[],
+                            timeout_seconds=180,
+                            max_recent=0):
+    """Gathers a merged MetricsSummary of the new episodes of evaluators.
+
+    Unlike collect_episodes(), each evaluator only sends a summary of its
+    episodes instead of one metrics tuple per episode.
+
+    Arguments:
+        max_recent (int): Number of the most recent metrics tuples each
+            evaluator sends. All of them are kept in the summary, in
+            collect_episodes() order.
+
+    Returns:
+        summary (MetricsSummary): Merged summary of all evaluators.
+        num_dropped (int): Number of evaluators that timed out.
+    """
+
+    summaries, num_dropped = _collect(
+        lambda ev: ev.get_metrics_summary(max_recent), local_worker,
+        remote_workers, timeout_seconds)
+    merged = MetricsSummary(max_recent * len(summaries))
+    for summary in summaries:
+        merged.merge(summary)
+    return merged, num_dropped
 
 
 @DeveloperAPI
@@ -87,75 +102,189 @@ def summarize_episodes(episodes, new_episodes, num_dropped):
         num_dropped: number of workers haven't returned their metrics
     """
 
-    if num_dropped > 0:
-        logger.warning("WARNING: {} workers have NOT returned metrics".format(
-            num_dropped))
-
-    episodes, estimates = _partition(episodes)
+    summary = MetricsSummary()
+    summary.add(episodes)
     new_episodes, _ = _partition(new_episodes)
+    return summary.summarize(num_dropped, len(new_episodes))
+
+
+@DeveloperAPI
+class MetricsSummary(object):
+    """Mergeable summary of episode metrics and off-policy estimates.
+
+    Keeps a StatSketch per metric, so summaries computed on different
+    workers can be shipped to the driver and merged there instead of the
+    full list of per-episode metrics.
+
+    The last `max_recent` metrics tuples added are kept as well, so that
+    results can be smoothed over an exact number of recent episodes.
+
+    Attributes:
+        num_episodes (int): Number of RolloutMetrics added.
+        num_estimates (int): Number of OffPolicyEstimates added.
+        recent (list): The last `max_recent` metrics tuples added or merged,
+            oldest first.
+    """
+
+    def __init__(self, max_recent=0):
+        self.max_recent = max_recent
+        self.recent = []
+        self.num_episodes = 0
+        self.num_estimates = 0
+        self.episode_reward = StatSketch()
+        self.episode_length = StatSketch()
+        self.policy_rewards = {}
+        self.custom_metrics = {}
+        self.perf_stats = {}
+        self.estimators = {}
+
+    def __len__(self):
+        return self.num_episodes + self.num_estimates
+
+    @DeveloperAPI
+    def add(self, episodes):
+        """Adds a list of RolloutMetrics and OffPolicyEstimates."""
 
-    episode_rewards = []
-    episode_lengths = []
-    policy_rewards = collections.defaultdict(list)
-    custom_metrics = collections.defaultdict(list)
-    perf_stats = collections.defaultdict(list)
-    for episode in episodes:
-        episode_lengths.append(episode.episode_length)
-        episode_rewards.append(episode.episode_reward)
-        for k, v in episode.custom_metrics.items():
-            custom_metrics[k].append(v)
-        for k, v in episode.perf_stats.items():
-            perf_stats[k].append(v)
-        for (_, policy_id), reward in episode.agent_rewards.items():
-            if policy_id != DEFAULT_POLICY_ID:
-                policy_rewards[policy_id].append(reward)
-    if episode_rewards:
-        min_reward = min(episode_rewards)
-        max_reward = max(episode_rewards)
+        rollouts, estimates = _partition(episodes)
+        self._add_recent(episodes)
+        self.num_episodes += len(rollouts)
+        self.num_estimates += len(estimates)
+        for episode in rollouts:
+            self.episode_length.add(episode.episode_length)
+            self.episode_reward.add(episode.episode_reward)
+            _add_all(self.custom_metrics, episode.custom_metrics)
+            _add_all(self.perf_stats, episode.perf_stats)
+            for (_, policy_id), reward in episode.agent_rewards.items():
+                if policy_id != DEFAULT_POLICY_ID:
+                    _add_all(self.policy_rewards, {policy_id: reward})
+        for e in estimates:
+            _add_all(
+                self.estimators.setdefault(e.estimator_name, {}), e.metrics)
+
+    @DeveloperAPI
+    def merge(self, other):
+        """Merges another MetricsSummary into this one."""
+
+        self._add_recent(other.recent)
+        self.num_episodes += other.num_episodes
+        self.num_estimates += other.num_estimates
+        self.episode_reward.merge(other.episode_reward)
+        self.episode_length.merge(other.episode_length)
+        _merge_all(self.policy_rewards, other.policy_rewards)
+        _merge_all(self.custom_metrics, other.custom_metrics)
+        _merge_all(self.perf_stats, other.perf_stats)
+        for name, metrics in other.estimators.items():
+            _merge_all(self.estimators.setdefault(name, {}), metrics)
+
+    def _add_recent(self, episodes):
+        if self.max_recent > 0:
+            self.recent.extend(episodes)
+            del self.recent[:-self.max_recent]
+
+    @DeveloperAPI
+    def summarize(self, num_dropped=0, episodes_this_iter=None):
+        """Returns the training result metrics for the summarized episodes.
+
+        Arguments:
+            num_dropped (int): Number of workers that haven't returned their
+                metrics.
+            episodes_this_iter (int): Number of new episodes in this
+                iteration, defaults to all summarized episodes.
+        """
+
+        if num_dropped > 0:
+            logger.warning(
+                "WARNING: {} workers have NOT returned metrics".format(
+                    num_dropped))
+        if episodes_this_iter is None:
+            episodes_this_iter = self.num_episodes
+
+        result = dict(
+            episode_reward_max=_max(self.episode_reward),
+            episode_reward_min=_min(self.episode_reward),
+            episode_reward_mean=self.episode_reward.mean(),
+            episode_len_mean=self.episode_length.mean())
+        for p in PERCENTILES:
+            result["episode_reward_p{}".format(p)] = \
+                self.episode_reward.quantile(p / 100.0)
+        for p in PERCENTILES:
+            result["episode_len_p{}".format(p)] = \
+                self.episode_length.quantile(p / 100.0)
+
+        custom_metrics = {}
+        for k, sketch in self.custom_metrics.items():
+            custom_metrics[k + "_mean"] = sketch.mean()
+            custom_metrics[k + "_min"] = _min(sketch)
+            custom_metrics[k + "_max"] = _max(sketch)
+            for p in PERCENTILES:
+                custom_metrics["{}_p{}".format(k, p)] = sketch.quantile(
+                    p / 100.0)
+
+        result.update(
+            episodes_this_iter=episodes_this_iter,
+            policy_reward_mean={
+                k: v.mean()
+                for k, v in self.policy_rewards.items()
+            },
+            custom_metrics=custom_metrics,
+            sampler_perf={k: v.mean()
+                          for k, v in self.perf_stats.items()},
+            off_policy_estimator={
+                name: {k: v.mean()
+                       for k, v in metrics.items()}
+                for name, metrics in self.estimators.items()
+            },
+            num_metric_batches_dropped=num_dropped)
+        return result
+
+
+def _collect(fn, local_worker, remote_workers, timeout_seconds):
+    """Applies fn to each worker and returns the results that arrived."""
+
+    if remote_workers:
+        pending = [a.apply.remote(fn) for a in remote_workers]
+        collected, _ = ray.wait(
+            pending, num_returns=len(pending), timeout=timeout_seconds * 1.0)
+        num_dropped = len(pending) - len(collected)
+        if pending and len(collected) == 0:
+            raise ValueError(
+                "Timed out waiting for metrics from workers. You can "
+                "configure this timeout with `collect_metrics_timeout`.")
+        results = ray_get_and_free(collected)
     else:
-        min_reward = float("nan")
-        max_reward = float("nan")
-    avg_reward = np.mean(episode_rewards)
-    avg_length = np.mean(episode_lengths)
-
-    for policy_id, rewards in policy_rewards.copy().items():
-        policy_rewards[policy_id] = np.mean(rewards)
-
-    for k, v_list in custom_metrics.copy().items():
-        custom_metrics[k + "_mean"] = np.mean(v_list)
-        filt = [v for v in v_list if not np.isnan(v)]
-        if filt:
-            custom_metrics[k + "_min"] = np.min(filt)
-            custom_metrics[k + "_max"] = np.max(filt)
-        else:
-            custom_metrics[k + "_min"] = float("nan")
-            custom_metrics[k + "_max"] = float("nan")
-        del custom_metrics[k]
-
-    for k, v_list in perf_stats.copy().items():
-        perf_stats[k] = np.mean(v_list)
-
-    estimators = collections.defaultdict(lambda: collections.defaultdict(list))
-    for e in estimates:
-        acc = estimators[e.estimator_name]
-        for k, v in e.metrics.items():
-            acc[k].append(v)
-    for name, metrics in estimators.items():
-        for k, v_list in metrics.items():
-            metrics[k] = np.mean(v_list)
-        estimators[name] = dict(metrics)
-
-    return dict(
-        episode_reward_max=max_reward,
-        episode_reward_min=min_reward,
-        episode_reward_mean=avg_reward,
-        episode_len_mean=avg_length,
-        episodes_this_iter=len(new_episodes),
-        policy_reward_mean=dict(policy_rewards),
-        custom_metrics=dict(custom_metrics),
-        sampler_perf=dict(perf_stats),
-        off_policy_estimator=dict(estimators),
-        num_metric_batches_dropped=num_dropped)
+        results = []
+        num_dropped = 0
+
+    if local_worker:
+        results.append(fn(local_worker))
+    return results, num_dropped
+
+
+def _add_all(sketches, values):
+    for k, v in values.items():
+        if k not in sketches:
+            sketches[k] = StatSketch()
+        sketches[k].add(v)
+
+
+def _merge_all(sketches, others):
+    for k, other in others.items():
+        if k not in sketches:
+            sketches[k] = StatSketch()
+        sketches[k].merge(other)
+
+
+def _min(sketch):
+    # Not available if there are only NaN values
+    if sketch.count == sketch.num_nan:
+        return float("nan")
+    return sketch.min
+
+
+def _max(sketch):
+    if sketch.count == sketch.num_nan:
+        return float("nan")
+    return sketch.max
 
 
 def _partition(episodes):
@@ -15,6 +15,7 @@ from ray.rllib.env.multi_agent_env import MultiAgentEnv
 from ray.rllib.env.external_multi_agent_env import ExternalMultiAgentEnv
 from ray.rllib.env.vector_env import VectorEnv
 from ray.rllib.evaluation.interface import EvaluatorInterface
+from ray.rllib.evaluation.metrics import MetricsSummary
 from ray.rllib.evaluation.sampler import AsyncSampler, SyncSampler
 from ray.rllib.policy.sample_batch import MultiAgentBatch, DEFAULT_POLICY_ID
 from ray.rllib.policy.policy import Policy
@@ -30,6 +31,7 @@ from ray.rllib.utils.debug import disable_log_once_globally, log_once, \
     summarize, enable_periodic_logging
 from ray.rllib.utils.filter import get_filter
 from ray.rllib.utils.tf_run_builder import TFRunBuilder
+from ray.rllib.utils.weight_sync import VersionedWeights, WeightsReceiver
 from ray.rllib.utils import try_import_tf
 
 tf = try_import_tf()
@@ -129,6 +131,7 @@ class RolloutWorker(EvaluatorInterface):
                  output_creator=lambda ioctx: NoopOutput(),
                  remote_worker_envs=False,
                  remote_env_batch_wait_ms=0,
+                 num_env_processes=0,
                  soft_horizon=False,
                  _fake_sampler=False):
         """Initialize a rollout worker.
@@ -213,6 +216,9 @@ class RolloutWorker(EvaluatorInterface):
                 least one env is ready) is a reasonable default, but optimal
                 value could be obtained by measuring your environment
                 step / reset and model inference perf.
+            num_env_processes (int): If positive and num_envs > 1, step
+                the envs in this many local subprocesses that exchange
+                observations and actions through shared memory.
             soft_horizon (bool): Calculate rewards but don't reset the
                 environment when the horizon is hit.
             _fake_sampler (bool): Use a fake (inf speed) sampler for testing.
@@ -249,6 +255,7 @@ class RolloutWorker(EvaluatorInterface):
         self.preprocessing_enabled = True
         self.last_batch = None
         self._fake_sampler = _fake_sampler
+        self._weights_receiver = WeightsReceiver()
 
         self.env = _validate_env(env_creator(env_context))
         if isinstance(self.env, MultiAgentEnv) or \
@@ -338,7 +345,8 @@ class RolloutWorker(EvaluatorInterface):
             make_env=make_env,
             num_envs=num_envs,
             remote_envs=remote_worker_envs,
-            remote_env_batch_wait_ms=remote_env_batch_wait_ms)
+            remote_env_batch_wait_ms=remote_env_batch_wait_ms,
+            num_env_processes=num_env_processes)
         self.num_envs = num_envs
 
         if self.batch_mode == "truncate_episodes":
@@ -488,9 +496,18 @@ class RolloutWorker(EvaluatorInterface):
 
     @override(EvaluatorInterface)
     def set_weights(self, weights):
+        if isinstance(weights, VersionedWeights):
+            weights = self._weights_receiver.receive(weights)
+            if weights is None:
+                return  # already holding these or newer weights
         for pid, w in weights.items():
             self.policy_map[pid].set_weights(w)
 
+    @DeveloperAPI
+    def get_weights_version(self):
+        """Returns the version of the last VersionedWeights set, if any."""
+        return self._weights_receiver.version
+
     @override(EvaluatorInterface)
     def compute_gradients(self, samples):
         if log_once("compute_gradients"):
@@ -583,6 +600,22 @@ class RolloutWorker(EvaluatorInterface):
             out.extend(m.get_metrics())
         return out
 
+    @DeveloperAPI
+    def get_metrics_summary(self, max_recent=0):
+        """Returns a MetricsSummary of the new metrics from evaluation.
+
+        This is much smaller to send than the list from get_metrics() when
+        there are many new episodes.
+
+        Arguments:
+            max_recent (int): Number of the most recent metrics to keep in
+                the summary.
+        """
+
+        summary = MetricsSummary(max_recent)
+        summary.add(self.get_metrics())
+        return summary
+
     @DeveloperAPI
     def foreach_env(self, func):
         """Apply the given function to each underlying env instance."""
@@ -638,18 +671,21 @@ class RolloutWorker(EvaluatorInterface):
             self.filters[k].sync(new_filters[k])
 
     @DeveloperAPI
-    def get_filters(self, flush_after=False):
+    def get_filters(self, flush_after=False, deltas=False):
         """Returns a snapshot of filters.
 
         Args:
             flush_after (bool): Clears the filter buffer state.
+            deltas (bool): Only return the state accumulated since the last
+                flush, suitable for Filter.apply_changes().
 
         Returns:
             return_filters (dict): Dict for serializable filters
         """
         return_filters = {}
         for k, f in self.filters.items():
-            return_filters[k] = f.as_serializable()
+            return_filters[k] = f.as_delta() if deltas else \
+                f.as_serializable()
             if flush_after:
                 f.clear_buffer()
         return return_filters
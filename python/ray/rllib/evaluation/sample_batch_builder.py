@@ -20,17 +20,152 @@ def to_float_array(v):
     return arr
 
 
+class _ColumnBuffer(object):
+    """Typed numpy column that rows are written into in place.
+
+    The dtype and row shape are taken from the first value, and rows are
+    written into preallocated blocks. Whole columns added with extend() are
+    kept as is, so a column built from a single block or batch is handed off
+    without copying. The dtype is widened if later values need it, so the
+    built array has the same dtype as to_float_array() of the equivalent
+    list. Columns of scalars, and values that don't fit a fixed-shape numeric
+    array (e.g., info dicts), are kept in a list, since appending to a list
+    and converting once is cheaper than per-element numpy writes for those.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.dtype = None  # dtype np.array() would infer for the rows so far
+        self.row_shape = None
+        self.chunks = []  # filled blocks and added columns
+        self.data = None  # block that appended rows are written into
+        self.count = 0  # number of rows written into the current block
+        self.rows = None  # list fallback for scalar and non-numeric columns
+
+    def append(self, value):
+        if self.rows is not None:
+            self.rows.append(value)
+            return
+        arr = np.asarray(value)
+        if self.dtype is None:
+            if arr.ndim == 0 or not self._init(arr.dtype, arr.shape):
+                self.rows = [value]
+                return
+        elif not self._fit(arr.dtype, arr.shape):
+            self._to_rows()
+            self.rows.append(value)
+            return
+        if self.data is None:
+            self.data = np.empty(
+                (self.capacity, ) + self.row_shape,
+                dtype=_storage_dtype(self.dtype))
+        self.data[self.count] = arr
+        self.count += 1
+        if self.count == len(self.data):
+            self._seal()
+            self.capacity *= 2
+
+    def extend(self, column):
+        if self.rows is not None:
+            self.rows.extend(column)
+            return
+        arr = np.asarray(column)
+        if len(arr) == 0:
+            return
+        if self.dtype is None:
+            if not self._init(arr.dtype, arr.shape[1:]):
+                self.rows = list(column)
+                return
+        elif not self._fit(arr.dtype, arr.shape[1:]):
+            self._to_rows()
+            self.rows.extend(column)
+            return
+        self._seal()
+        self.chunks.append(arr)
+
+    def build(self):
+        """Returns the column as a single array."""
+
+        if self.rows is not None:
+            return to_float_array(self.rows)
+        if self.dtype is None:
+            return to_float_array([])
+        self._seal()
+        dtype = _storage_dtype(self.dtype)
+        if len(self.chunks) > 1 or self.chunks[0].dtype != dtype:
+            self.chunks = [
+                np.concatenate(self.chunks).astype(dtype, copy=False)
+            ]
+        return self.chunks[0]
+
+    def __len__(self):
+        if self.rows is not None:
+            return len(self.rows)
+        return sum(len(c) for c in self.chunks) + self.count
+
+    def __getitem__(self, i):
+        if self.rows is not None:
+            return self.rows[i]
+        return self.build()[i]
+
+    def _init(self, dtype, row_shape):
+        if dtype.kind not in "biuf":
+            return False
+        self.dtype = dtype
+        self.row_shape = row_shape
+        return True
+
+    def _fit(self, dtype, row_shape):
+        if dtype == self.dtype and row_shape == self.row_shape:
+            return True
+        if dtype.kind not in "biuf" or row_shape != self.row_shape:
+            return False
+        new_dtype = np.promote_types(self.dtype, dtype)
+        if _storage_dtype(new_dtype) != _storage_dtype(self.dtype):
+            self._seal()  # rows written from now on need the wider dtype
+        self.dtype = new_dtype
+        return True
+
+    def _seal(self):
+        if self.count:
+            self.chunks.append(self.data[:self.count])
+        self.data = None
+        self.count = 0
+
+    def _to_rows(self):
+        self.rows = list(self.build())
+        self.chunks = []
+
+
+def _storage_dtype(dtype):
+    if dtype == np.float64:
+        return np.float32  # save some memory, as in to_float_array()
+    return dtype
+
+
 @PublicAPI
 class SampleBatchBuilder(object):
     """Util to build a SampleBatch incrementally.
 
     For efficiency, SampleBatches hold values in column form (as arrays).
-    However, it is useful to add data one row (dict) at a time.
+    However, it is useful to add data one row (dict) at a time. Rows are
+    written in place into preallocated numpy columns, which are handed off
+    to the built SampleBatch without further copies.
     """
 
     @PublicAPI
-    def __init__(self):
-        self.buffers = collections.defaultdict(list)
+    def __init__(self, capacity=32):
+        """Initialize a SampleBatchBuilder.
+
+        Arguments:
+            capacity (int): Number of rows to preallocate per column. Columns
+                grow as needed, and later batches preallocate for the size
+                of the previously built batch.
+        """
+        self.min_capacity = capacity
+        self.capacity = capacity
+        self.buffers = collections.defaultdict(
+            lambda: _ColumnBuffer(self.capacity))
         self.count = 0
         self.unroll_id = 0  # disambiguates unrolls within a single episode
 
@@ -55,11 +190,12 @@ class SampleBatchBuilder(object):
         """Returns a sample batch including all previously added values."""
 
         batch = SampleBatch(
-            {k: to_float_array(v)
+            {k: v.build()
              for k, v in self.buffers.items()})
         batch.data[SampleBatch.UNROLL_ID] = np.repeat(self.unroll_id,
                                                       batch.count)
         self.buffers.clear()
+        self.capacity = max(self.count, self.min_capacity)
         self.count = 0
         self.unroll_id += 1
         return batch
@@ -92,6 +228,9 @@ class MultiAgentSampleBatchBuilder(object):
         }
         self.agent_builders = {}
         self.agent_to_policy = {}
+        # Size of the last agent batch per policy, used to preallocate the
+        # columns of new agent builders.
+        self.agent_capacity = {}
         self.postp_callback = postp_callback
         self.count = 0  # increment this manually
 
@@ -116,7 +255,8 @@ class MultiAgentSampleBatchBuilder(object):
         """
 
         if agent_id not in self.agent_builders:
-            self.agent_builders[agent_id] = SampleBatchBuilder()
+            self.agent_builders[agent_id] = SampleBatchBuilder(
+                self.agent_capacity.get(policy_id, 32))
             self.agent_to_policy[agent_id] = policy_id
         builder = self.agent_builders[agent_id]
         builder.add_values(**values)
@@ -134,9 +274,10 @@ class MultiAgentSampleBatchBuilder(object):
         # Materialize the batches so far
         pre_batches = {}
         for agent_id, builder in self.agent_builders.items():
-            pre_batches[agent_id] = (
-                self.policy_map[self.agent_to_policy[agent_id]],
-                builder.build_and_reset())
+            policy_id = self.agent_to_policy[agent_id]
+            self.agent_capacity[policy_id] = builder.count
+            pre_batches[agent_id] = (self.policy_map[policy_id],
+                                     builder.build_and_reset())
 
         # Apply postprocessor
         post_batches = {}
@@ -178,7 +319,7 @@ class MultiAgentSampleBatchBuilder(object):
 
     def check_missing_dones(self):
         for agent_id, builder in self.agent_builders.items():
-            if builder.buffers["dones"][-1] is not True:
+            if not builder.buffers["dones"][-1]:
                 raise ValueError(
                     "The environment terminated for all agents, but we still "
                     "don't have a last observation for "
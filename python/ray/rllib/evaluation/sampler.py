@@ -139,7 +139,8 @@ class AsyncSampler(threading.Thread, SamplerInput):
                  tf_sess=None,
                  clip_actions=True,
                  blackhole_outputs=False,
-                 soft_horizon=False):
+                 soft_horizon=False,
+                 policy_evaluator=None):
         for _, f in obs_filters.items():
             assert getattr(f, "is_concurrent", False), \
                 "Observation Filter must support concurrent updates."
@@ -162,6 +163,7 @@ class AsyncSampler(threading.Thread, SamplerInput):
         self.clip_actions = clip_actions
         self.blackhole_outputs = blackhole_outputs
         self.soft_horizon = soft_horizon
+        self.policy_evaluator = policy_evaluator
         self.perf_stats = PerfStats()
         self.shutdown = False
 
@@ -185,7 +187,7 @@ class AsyncSampler(threading.Thread, SamplerInput):
             self.policy_mapping_fn, self.unroll_length, self.horizon,
             self.preprocessors, self.obs_filters, self.clip_rewards,
             self.clip_actions, self.pack, self.callbacks, self.tf_sess,
-            self.perf_stats, self.soft_horizon)
+            self.perf_stats, self.soft_horizon, self.policy_evaluator)
         while not self.shutdown:
             # The timeout variable exists because apparently, if one worker
             # dies, the other workers won't die with it, unless the timeout is
@@ -227,10 +229,215 @@ class AsyncSampler(threading.Thread, SamplerInput):
         return extra
 
 
-def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
-                unroll_length, horizon, preprocessors, obs_filters,
-                clip_rewards, clip_actions, pack, callbacks, tf_sess,
-                perf_stats, soft_horizon):
+class PolicyEvalBatcher(object):
+    """Computes actions for batches of PolicyEvalData.
+
+    For TF policies evaluated through a TFRunBuilder, the observations,
+    previous actions and previous rewards are copied into arrays that are
+    preallocated per policy and reused across calls, instead of feeding
+    lists of per-agent arrays that TF has to convert on every step. Other
+    policies get lists as before.
+    """
+
+    def __init__(self, policies, tf_sess=None):
+        self.policies = policies
+        self.tf_sess = tf_sess
+        self._buffers = {}
+
+    def evaluate(self, to_eval, episodes):
+        """Returns dict of policy id to compute_actions() outputs.
+
+        Arguments:
+            to_eval (dict): Map of policy id to list of PolicyEvalData.
+            episodes (dict): Map of policy id to the list of episodes the
+                rows of `to_eval` belong to.
+        """
+
+        eval_results = {}
+
+        if self.tf_sess:
+            builder = TFRunBuilder(self.tf_sess, "policy_eval")
+            pending_fetches = {}
+        else:
+            builder = None
+
+        for policy_id, eval_data in to_eval.items():
+            rnn_in_cols = _to_column_format([t.rnn_state for t in eval_data])
+            policy = _get_or_raise(self.policies, policy_id)
+            if builder and (policy.compute_actions.__code__ is
+                            TFPolicy.compute_actions.__code__):
+                # TODO(ekl): how can we make info batch available to TF code?
+                pending_fetches[policy_id] = policy._build_compute_actions(
+                    builder,
+                    self._stack(policy_id, "obs", [t.obs for t in eval_data]),
+                    rnn_in_cols,
+                    prev_action_batch=self._stack(
+                        policy_id, "prev_action",
+                        [t.prev_action for t in eval_data]),
+                    prev_reward_batch=self._stack(
+                        policy_id, "prev_reward",
+                        [t.prev_reward for t in eval_data], np.float32))
+            else:
+                eval_results[policy_id] = policy.compute_actions(
+                    [t.obs for t in eval_data],
+                    rnn_in_cols,
+                    prev_action_batch=[t.prev_action for t in eval_data],
+                    prev_reward_batch=[t.prev_reward for t in eval_data],
+                    info_batch=[t.info for t in eval_data],
+                    episodes=episodes[policy_id])
+        if builder:
+            for k, v in pending_fetches.items():
+                eval_results[k] = builder.get(v)
+
+        return eval_results
+
+    def _stack(self, policy_id, column, values, dtype=None):
+        """Returns the values stacked into a reused array, or the list of
+        values if they don't have a common shape."""
+
+        try:
+            first = np.asarray(values[0], dtype=dtype)
+            if first.dtype == np.object_:
+                return values
+            key = (policy_id, column)
+            buf = self._buffers.get(key)
+            if buf is None or buf.shape[1:] != first.shape or \
+                    buf.dtype != first.dtype or len(buf) < len(values):
+                size = max(len(values), 2 * len(buf) if buf is not None else 0)
+                buf = np.empty((size, ) + first.shape, dtype=first.dtype)
+                self._buffers[key] = buf
+            for i, v in enumerate(values):
+                buf[i] = v
+        except (ValueError, TypeError):
+            return values
+        return buf[:len(values)]
+
+
+class SharedPolicyEvaluator(threading.Thread):
+    """Computes actions for several AsyncSamplers on a single thread.
+
+    Samplers pass this as `policy_evaluator`. Requests submitted while the
+    thread is busy are merged, so their rows are evaluated with one
+    compute_actions() call per policy. All samplers must use the same
+    policies.
+
+    Examples:
+        >>> evaluator = SharedPolicyEvaluator(policies, tf_sess)
+        >>> samplers = [
+        ...     AsyncSampler(env, policies, ..., policy_evaluator=evaluator)
+        ...     for env in envs]
+    """
+
+    def __init__(self, policies, tf_sess=None, max_wait_ms=0.0):
+        """Initialize and start a SharedPolicyEvaluator.
+
+        Arguments:
+            policies (dict): Map of policy ids to Policy instances.
+            tf_sess (Session|None): Optional tensorflow session to use for
+                batching TF policy evaluations.
+            max_wait_ms (float): How long to wait for requests from other
+                samplers before evaluating a batch.
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.batcher = PolicyEvalBatcher(policies, tf_sess)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.num_requests = 0
+        self.num_batches = 0
+        self._requests = queue.Queue()
+        self.start()
+
+    def evaluate(self, to_eval, episodes):
+        """Same as PolicyEvalBatcher.evaluate(), blocks until evaluated."""
+
+        request = _EvalRequest(to_eval, episodes)
+        self._requests.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def run(self):
+        while True:
+            requests = [self._requests.get()]
+            deadline = time.time() + self.max_wait_s
+            while True:
+                try:
+                    timeout = deadline - time.time()
+                    if timeout > 0:
+                        requests.append(self._requests.get(timeout=timeout))
+                    else:
+                        requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            self._evaluate(requests)
+
+    def _evaluate(self, requests):
+        self.num_requests += len(requests)
+        self.num_batches += 1
+        to_eval = defaultdict(list)
+        episodes = defaultdict(list)
+        spans = []
+        for request in requests:
+            span = {}
+            for policy_id, eval_data in request.to_eval.items():
+                start = len(to_eval[policy_id])
+                to_eval[policy_id].extend(eval_data)
+                episodes[policy_id].extend(request.episodes[policy_id])
+                span[policy_id] = (start, len(to_eval[policy_id]))
+            spans.append(span)
+        try:
+            eval_results = self.batcher.evaluate(to_eval, episodes)
+        except Exception as e:
+            for request in requests:
+                request.error = e
+                request.done.set()
+            return
+        for request, span in zip(requests, spans):
+            request.result = {
+                policy_id: _slice_eval_result(eval_results[policy_id], start,
+                                              end)
+                for policy_id, (start, end) in span.items()
+            }
+            request.done.set()
+
+
+class _EvalRequest(object):
+    def __init__(self, to_eval, episodes):
+        self.to_eval = to_eval
+        self.episodes = episodes
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _slice_eval_result(eval_result, start, end):
+    actions, rnn_out_cols, pi_info_cols = eval_result
+    if isinstance(actions, TupleActions):
+        actions = TupleActions([b[start:end] for b in actions.batches])
+    else:
+        actions = actions[start:end]
+    return (actions, [c[start:end] for c in rnn_out_cols],
+            {k: v[start:end]
+             for k, v in pi_info_cols.items()})
+
+
+def _env_runner(base_env,
+                extra_batch_callback,
+                policies,
+                policy_mapping_fn,
+                unroll_length,
+                horizon,
+                preprocessors,
+                obs_filters,
+                clip_rewards,
+                clip_actions,
+                pack,
+                callbacks,
+                tf_sess,
+                perf_stats,
+                soft_horizon,
+                policy_evaluator=None):
     """This implements the common experience collection logic.
 
     Args:
@@ -257,6 +464,9 @@ def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
         perf_stats (PerfStats): Record perf stats into this object.
         soft_horizon (bool): Calculate rewards but don't reset the
             environment when the horizon is hit.
+        policy_evaluator (SharedPolicyEvaluator|None): Evaluator shared
+            with other samplers to compute actions with. By default, actions
+            are computed on the calling thread.
 
     Yields:
         rollout (SampleBatch): Object containing state, action, reward,
@@ -295,6 +505,9 @@ def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
 
     active_episodes = defaultdict(new_episode)
 
+    if policy_evaluator is None:
+        policy_evaluator = PolicyEvalBatcher(policies, tf_sess)
+
     while True:
         perf_stats.iters += 1
         t0 = time.time()
@@ -321,7 +534,7 @@ def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
 
         # Do batched policy eval
         t2 = time.time()
-        eval_results = _do_policy_eval(tf_sess, to_eval, policies,
+        eval_results = _do_policy_eval(policy_evaluator, to_eval,
                                        active_episodes)
         perf_stats.inference_time += time.time() - t2
 
@@ -505,47 +718,22 @@ def _process_observations(base_env, policies, batch_builder_pool,
     return active_envs, to_eval, outputs
 
 
-def _do_policy_eval(tf_sess, to_eval, policies, active_episodes):
+def _do_policy_eval(policy_evaluator, to_eval, active_episodes):
     """Call compute actions on observation batches to get next actions.
 
     Returns:
         eval_results: dict of policy to compute_action() outputs.
     """
 
-    eval_results = {}
-
-    if tf_sess:
-        builder = TFRunBuilder(tf_sess, "policy_eval")
-        pending_fetches = {}
-    else:
-        builder = None
-
     if log_once("compute_actions_input"):
         logger.info("Inputs to compute_actions():\n\n{}\n".format(
             summarize(to_eval)))
 
-    for policy_id, eval_data in to_eval.items():
-        rnn_in_cols = _to_column_format([t.rnn_state for t in eval_data])
-        policy = _get_or_raise(policies, policy_id)
-        if builder and (policy.compute_actions.__code__ is
-                        TFPolicy.compute_actions.__code__):
-            # TODO(ekl): how can we make info batch available to TF code?
-            pending_fetches[policy_id] = policy._build_compute_actions(
-                builder, [t.obs for t in eval_data],
-                rnn_in_cols,
-                prev_action_batch=[t.prev_action for t in eval_data],
-                prev_reward_batch=[t.prev_reward for t in eval_data])
-        else:
-            eval_results[policy_id] = policy.compute_actions(
-                [t.obs for t in eval_data],
-                rnn_in_cols,
-                prev_action_batch=[t.prev_action for t in eval_data],
-                prev_reward_batch=[t.prev_reward for t in eval_data],
-                info_batch=[t.info for t in eval_data],
-                episodes=[active_episodes[t.env_id] for t in eval_data])
-    if builder:
-        for k, v in pending_fetches.items():
-            eval_results[k] = builder.get(v)
+    episodes = {
+        policy_id: [active_episodes[t.env_id] for t in eval_data]
+        for policy_id, eval_data in to_eval.items()
+    }
+    eval_results = policy_evaluator.evaluate(to_eval, episodes)
 
     if log_once("compute_actions_result"):
         logger.info("Outputs of compute_actions():\n\n{}\n".format(
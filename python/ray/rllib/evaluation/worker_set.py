@@ -9,7 +9,7 @@ from ray.rllib.utils.annotations import DeveloperAPI
 from ray.rllib.evaluation.rollout_worker import RolloutWorker, \
     _validate_multiagent_config
 from ray.rllib.offline import NoopOutput, JsonReader, MixedInput, JsonWriter, \
-    ShuffledInput
+    ShuffledInput, ParallelJsonReader
 from ray.rllib.utils import merge_dicts, try_import_tf
 from ray.rllib.utils.memory import ray_get_and_free
 
@@ -144,6 +144,14 @@ class WorkerSet(object):
             input_creator = (lambda ioctx: ShuffledInput(
                 MixedInput(config["input"], ioctx), config[
                     "shuffle_buffer_size"]))
+        elif config["input_num_readers"] > 0:
+            input_creator = (lambda ioctx: ParallelJsonReader(
+                config["input"],
+                ioctx,
+                num_readers=config["input_num_readers"],
+                prefetch_batches=config["input_prefetch_batches"],
+                shuffle_buffer_size=config["shuffle_buffer_size"],
+                seed=config["input_seed"]))
         else:
             input_creator = (lambda ioctx: ShuffledInput(
                 JsonReader(config["input"], ioctx), config[
@@ -210,5 +218,6 @@ class WorkerSet(object):
             output_creator=output_creator,
             remote_worker_envs=config["remote_worker_envs"],
             remote_env_batch_wait_ms=config["remote_env_batch_wait_ms"],
+            num_env_processes=config["num_env_processes"],
             soft_horizon=config["soft_horizon"],
             _fake_sampler=config.get("_fake_sampler", False))
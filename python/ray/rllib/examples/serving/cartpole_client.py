@@ -11,7 +11,7 @@ To try this out, in two separate shells run:
 import argparse
 import gym
 
-from ray.rllib.utils.policy_client import PolicyClient
+from ray.rllib.utils.policy_client import PolicyClient, BinaryPolicyClient
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -20,6 +20,10 @@ parser.add_argument(
     "--off-policy",
     action="store_true",
     help="Whether to take random instead of on-policy actions.")
+parser.add_argument(
+    "--binary",
+    action="store_true",
+    help="Talk to an AsyncPolicyServer over its binary protocol.")
 parser.add_argument(
     "--stop-at-reward",
     type=int,
@@ -29,7 +33,10 @@ parser.add_argument(
 if __name__ == "__main__":
     args = parser.parse_args()
     env = gym.make("CartPole-v0")
-    client = PolicyClient("http://localhost:9900")
+    if args.binary:
+        client = BinaryPolicyClient("localhost:9900")
+    else:
+        client = PolicyClient("http://localhost:9900")
 
     eid = client.start_episode(training_enabled=not args.no_train)
     obs = env.reset()
@@ -6,8 +6,11 @@ from __future__ import print_function
 To try this out, in two separate shells run:
     $ python cartpole_server.py
     $ python cartpole_client.py
+
+Pass --binary to both to use the asyncio server and its binary protocol.
 """
 
+import argparse
 import os
 from gym import spaces
 import numpy as np
@@ -23,23 +26,35 @@ SERVER_ADDRESS = "localhost"
 SERVER_PORT = 9900
 CHECKPOINT_FILE = "last_checkpoint.out"
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--binary",
+    action="store_true",
+    help="Serve with AsyncPolicyServer instead of the HTTP PolicyServer.")
+
 
 class CartpoleServing(ExternalEnv):
-    def __init__(self):
+    def __init__(self, binary=False):
         ExternalEnv.__init__(
             self, spaces.Discrete(2),
             spaces.Box(low=-10, high=10, shape=(4, ), dtype=np.float32))
+        self.binary = binary
 
     def run(self):
         print("Starting policy server at {}:{}".format(SERVER_ADDRESS,
                                                        SERVER_PORT))
-        server = PolicyServer(self, SERVER_ADDRESS, SERVER_PORT)
+        if self.binary:
+            from ray.rllib.utils.async_policy_server import AsyncPolicyServer
+            server = AsyncPolicyServer(self, SERVER_ADDRESS, SERVER_PORT)
+        else:
+            server = PolicyServer(self, SERVER_ADDRESS, SERVER_PORT)
         server.serve_forever()
 
 
 if __name__ == "__main__":
+    args = parser.parse_args()
     ray.init()
-    register_env("srv", lambda _: CartpoleServing())
+    register_env("srv", lambda _: CartpoleServing(args.binary))
 
     # We use DQN since it supports off-policy actions, but you can choose and
     # configure any agent.
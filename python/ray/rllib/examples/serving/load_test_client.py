@@ -0,0 +1,128 @@
+"""Load test for a policy server started with --binary.
+
+Simulates many concurrent CartPole-like episodes that are multiplexed over a
+few persistent connections, and reports request throughput and action
+latency percentiles. Requires Python 3.
+
+To try this out, in two separate shells run:
+    $ python cartpole_server.py --binary
+    $ python load_test_client.py --num-episodes=500 --num-connections=4
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+import numpy as np
+
+from ray.rllib.utils import policy_wire
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--address", type=str, default="localhost")
+parser.add_argument("--port", type=int, default=9900)
+parser.add_argument(
+    "--num-episodes",
+    type=int,
+    default=100,
+    help="Number of episodes to run concurrently.")
+parser.add_argument(
+    "--num-connections",
+    type=int,
+    default=4,
+    help="Number of connections to spread the episodes over.")
+parser.add_argument(
+    "--episode-len", type=int, default=200, help="Steps per episode.")
+parser.add_argument(
+    "--duration", type=float, default=30.0, help="Seconds to run for.")
+parser.add_argument("--obs-size", type=int, default=4)
+
+
+class Connection(object):
+    """Pipelines requests over one connection to an AsyncPolicyServer."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.request_ids = itertools.count()
+        self.pending = {}
+        self.num_requests = 0
+        self.reader_task = asyncio.ensure_future(self._read_responses())
+
+    async def send(self, **data):
+        request_id = next(self.request_ids) % 2**32
+        future = asyncio.get_event_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(policy_wire.encode_request(request_id, data))
+        self.num_requests += 1
+        return await future
+
+    async def _read_responses(self):
+        while True:
+            header = await self.reader.readexactly(
+                policy_wire.FRAME_HEADER.size)
+            size, = policy_wire.FRAME_HEADER.unpack(header)
+            body = await self.reader.readexactly(size)
+            request_id, value, error = policy_wire.decode_response(body)
+            future = self.pending.pop(request_id)
+            if error:
+                future.set_exception(RuntimeError(value))
+            else:
+                future.set_result(value)
+
+
+async def run_episodes(conn, args, deadline, latencies):
+    while time.time() < deadline:
+        eid = await conn.send(
+            command=policy_wire.START_EPISODE,
+            episode_id=None,
+            training_enabled=True)
+        for _ in range(args.episode_len):
+            obs = np.random.uniform(-1, 1, args.obs_size).astype(np.float32)
+            start = time.time()
+            await conn.send(
+                command=policy_wire.GET_ACTION,
+                episode_id=eid,
+                observation=obs)
+            latencies.append(time.time() - start)
+            await conn.send(
+                command=policy_wire.LOG_RETURNS,
+                episode_id=eid,
+                reward=1.0,
+                info=None)
+            if time.time() >= deadline:
+                break
+        await conn.send(
+            command=policy_wire.END_EPISODE,
+            episode_id=eid,
+            observation=np.zeros(args.obs_size, dtype=np.float32))
+
+
+async def main(args):
+    conns = []
+    for _ in range(args.num_connections):
+        reader, writer = await asyncio.open_connection(args.address, args.port)
+        conns.append(Connection(reader, writer))
+    latencies = []
+    start = time.time()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        run_episodes(conns[i % len(conns)], args, deadline, latencies)
+        for i in range(args.num_episodes)
+    ])
+    elapsed = time.time() - start
+    num_requests = sum(c.num_requests for c in conns)
+    latencies_ms = np.array(latencies) * 1000
+    print("Requests/s:", round(num_requests / elapsed, 1))
+    print("Actions/s:", round(len(latencies) / elapsed, 1))
+    for p in [50, 90, 99]:
+        print("Action latency p{} (ms): {}".format(
+            p, round(float(np.percentile(latencies_ms, p)), 2)))
+    for c in conns:
+        c.reader_task.cancel()
+        c.writer.close()
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args))
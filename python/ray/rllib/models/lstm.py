@@ -170,49 +170,41 @@ def chop_into_sequences(episode_ids,
         [2, 3, 1]
     """
 
-    prev_id = None
-    seq_lens = []
-    seq_len = 0
     unique_ids = np.add(
         np.add(episode_ids, agent_indices),
         np.array(unroll_ids) << 32)
-    for uid in unique_ids:
-        if (prev_id is not None and uid != prev_id) or \
-                seq_len >= max_seq_len:
-            seq_lens.append(seq_len)
-            seq_len = 0
-        seq_len += 1
-        prev_id = uid
-    if seq_len:
-        seq_lens.append(seq_len)
-    assert sum(seq_lens) == len(unique_ids)
+    num_steps = len(unique_ids)
+
+    # Position of each step within its run of equal ids. A new sequence
+    # starts at every multiple of max_seq_len within a run.
+    run_start = np.ones(num_steps, dtype=bool)
+    run_start[1:] = unique_ids[1:] != unique_ids[:-1]
+    run_base = np.maximum.accumulate(
+        np.where(run_start, np.arange(num_steps), 0))
+    seq_start = (np.arange(num_steps) - run_base) % max_seq_len == 0
+    seq_starts = np.flatnonzero(seq_start)
+    seq_lens = np.diff(np.append(seq_starts, num_steps))
+    assert seq_lens.sum() == num_steps
 
     # Dynamically shrink max len as needed to optimize memory usage
     if dynamic_max:
-        max_seq_len = max(seq_lens) + _extra_padding
+        max_seq_len = seq_lens.max() + _extra_padding
+
+    # Destination row of each step in the padded [NUM_SEQ * MAX_LEN] layout.
+    seq_index = np.cumsum(seq_start) - 1
+    dest = (seq_index * max_seq_len + np.arange(num_steps) -
+            seq_starts[seq_index])
 
     feature_sequences = []
     for f in feature_columns:
-        f = np.array(f)
+        f = np.asarray(f)
         f_pad = np.zeros((len(seq_lens) * max_seq_len, ) + np.shape(f)[1:])
-        seq_base = 0
-        i = 0
-        for l in seq_lens:
-            for seq_offset in range(l):
-                f_pad[seq_base + seq_offset] = f[i]
-                i += 1
-            seq_base += max_seq_len
-        assert i == len(unique_ids), f
+        assert len(f) == num_steps, f
+        f_pad[dest] = f
         feature_sequences.append(f_pad)
 
     initial_states = []
     for s in state_columns:
-        s = np.array(s)
-        s_init = []
-        i = 0
-        for l in seq_lens:
-            s_init.append(s[i])
-            i += l
-        initial_states.append(np.array(s_init))
-
-    return feature_sequences, initial_states, np.array(seq_lens)
+        initial_states.append(np.asarray(s)[seq_starts])
+
+    return feature_sequences, initial_states, seq_lens
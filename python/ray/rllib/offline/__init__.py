@@ -9,6 +9,7 @@ from ray.rllib.offline.output_writer import OutputWriter, NoopOutput
 from ray.rllib.offline.input_reader import InputReader
 from ray.rllib.offline.mixed_input import MixedInput
 from ray.rllib.offline.shuffled_input import ShuffledInput
+from ray.rllib.offline.parallel_json_reader import ParallelJsonReader
 
 __all__ = [
     "IOContext",
@@ -19,4 +20,5 @@ __all__ = [
     "InputReader",
     "MixedInput",
     "ShuffledInput",
+    "ParallelJsonReader",
 ]
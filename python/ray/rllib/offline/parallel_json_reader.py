@@ -0,0 +1,191 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import logging
+import random
+import threading
+from six.moves import queue
+from six.moves.urllib.parse import urlparse
+
+try:
+    from smart_open import smart_open
+except ImportError:
+    smart_open = None
+
+from ray.rllib.offline.input_reader import InputReader
+from ray.rllib.offline.json_reader import JsonReader, _from_json
+from ray.rllib.utils.annotations import override, DeveloperAPI
+
+logger = logging.getLogger(__name__)
+
+
+@DeveloperAPI
+class ParallelJsonReader(JsonReader):
+    """Reader that loads JSON file chunks with a pool of background threads.
+
+    Input files are sharded across `num_readers` reader threads, which stream
+    whole files, decode and (optionally) postprocess batches, and push them
+    onto a bounded prefetch queue. The file order of each epoch is a
+    deterministic permutation when a seed is given. Batches taken off the
+    queue can additionally be shuffled over a large window of batches.
+    """
+
+    @DeveloperAPI
+    def __init__(self,
+                 inputs,
+                 ioctx=None,
+                 num_readers=4,
+                 prefetch_batches=16,
+                 shuffle_buffer_size=0,
+                 seed=None):
+        """Initialize a ParallelJsonReader.
+
+        Arguments:
+            inputs (str|list): either a glob expression for files, e.g.,
+                "/tmp/**/*.json", or a list of single file paths or URIs, e.g.,
+                ["s3://bucket/file.json", "s3://bucket/file2.json"].
+            ioctx (IOContext): current IO context object.
+            num_readers (int): number of background reader threads.
+            prefetch_batches (int): max number of decoded batches to hold
+                in the prefetch queue.
+            shuffle_buffer_size (int): if positive, shuffle batches over a
+                window of this many batches.
+            seed (int): if set, the file order of each epoch is derived
+                deterministically from this seed and the worker index.
+                Otherwise a random seed is drawn once for this reader. All
+                reader threads share the same order for a given epoch.
+        """
+        JsonReader.__init__(self, inputs, ioctx)
+        if seed is not None:
+            seed += self.ioctx.worker_index
+        self.seed = seed
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.buffer = []
+        self.rng = random.Random(seed)
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+        self.epoch_seed = seed
+        self.queue = queue.Queue(maxsize=max(1, prefetch_batches))
+        num_readers = max(1, min(num_readers, len(self.files)))
+        self.readers = [
+            _ReaderThread(self, i, num_readers) for i in range(num_readers)
+        ]
+        for reader in self.readers:
+            reader.start()
+
+    @override(InputReader)
+    def next(self):
+        if self.shuffle_buffer_size <= 1:
+            return self._next_batch()
+        if len(self.buffer) < self.shuffle_buffer_size:
+            logger.info("Filling shuffle buffer to {} batches".format(
+                self.shuffle_buffer_size))
+            while len(self.buffer) < self.shuffle_buffer_size:
+                self.buffer.append(self._next_batch())
+            logger.info("Shuffle buffer filled")
+        i = self.rng.randint(0, len(self.buffer) - 1)
+        batch = self.buffer[i]
+        self.buffer[i] = self._next_batch()
+        return batch
+
+    def stop(self):
+        """Signals all reader threads to exit."""
+        for reader in self.readers:
+            reader.stopped = True
+
+    def epoch_files(self, epoch):
+        """Returns the file order to use for the given epoch.
+
+        The order only depends on the epoch, so the reader threads shard the
+        same permutation and together cover every file exactly once.
+        """
+        files = list(self.files)
+        random.Random(self.epoch_seed * 1000003 + epoch).shuffle(files)
+        return files
+
+    def _next_batch(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(r.is_alive() for r in self.readers) and \
+                        self.queue.empty():
+                    raise ValueError(
+                        "Failed to read valid experience batch from files: "
+                        "{}".format(self.files))
+                continue
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+
+class _ReaderThread(threading.Thread):
+    """Thread that decodes one shard of the input files into a queue."""
+
+    def __init__(self, reader, index, num_readers):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.reader = reader
+        self.index = index
+        self.num_readers = num_readers
+        self.stopped = False
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            logger.exception("Error reading from input")
+            self.reader.queue.put(e)
+
+    def _run(self):
+        epoch = 0
+        while not self.stopped:
+            files = self.reader.epoch_files(epoch)
+            shard = files[self.index::self.num_readers]
+            num_read = 0
+            for path in shard:
+                for batch in self._read_file(path):
+                    self._put(self.reader._postprocess_if_needed(batch))
+                    num_read += 1
+                    if self.stopped:
+                        return
+            if num_read == 0:
+                logger.warning("No valid batches in files: {}".format(shard))
+                return
+            epoch += 1
+
+    def _put(self, batch):
+        while not self.stopped:
+            try:
+                self.reader.queue.put(batch, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def _read_file(self, path):
+        if urlparse(path).scheme:
+            if smart_open is None:
+                raise ValueError(
+                    "You must install the `smart_open` module to read "
+                    "from URIs like {}".format(path))
+            f = smart_open(path, "r")
+        else:
+            f = open(path, "r")
+        try:
+            for line in f:
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8")
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    batch = _from_json(line)
+                except Exception:
+                    logger.exception(
+                        "Ignoring corrupt json record in {}: {}".format(
+                            path, line))
+                    continue
+                yield batch
+        finally:
+            f.close()
@@ -7,10 +7,10 @@ from __future__ import print_function
 import numpy as np
 import random
 
-import ray
 from ray.rllib.utils.actors import TaskPool
 from ray.rllib.utils.annotations import override
 from ray.rllib.utils.memory import ray_get_and_free
+from ray.rllib.utils.weight_sync import WeightSyncer
 
 
 class Aggregator(object):
@@ -55,10 +55,10 @@ class Aggregator(object):
 class AggregationWorkerBase(object):
     """Aggregators should extend from this class."""
 
-    def __init__(self, initial_weights_obj_id, remote_workers,
+    def __init__(self, weight_syncer, remote_workers,
                  max_sample_requests_in_flight_per_worker, replay_proportion,
                  replay_buffer_num_slots, train_batch_size, sample_batch_size):
-        self.broadcasted_weights = initial_weights_obj_id
+        self.weight_syncer = weight_syncer
         self.remote_workers = remote_workers
         self.sample_batch_size = sample_batch_size
         self.train_batch_size = train_batch_size
@@ -74,7 +74,7 @@ class AggregationWorkerBase(object):
         # Kick off async background sampling
         self.sample_tasks = TaskPool()
         for ev in self.remote_workers:
-            ev.set_weights.remote(self.broadcasted_weights)
+            self.weight_syncer.sync(ev)
             for _ in range(max_sample_requests_in_flight_per_worker):
                 self.sample_tasks.add(ev, ev.sample.remote())
 
@@ -123,8 +123,8 @@ class AggregationWorkerBase(object):
                     self.replay_index += 1
                     self.replay_index %= self.replay_buffer_num_slots
 
-            ev.set_weights.remote(self.broadcasted_weights)
-            self.num_weight_syncs += 1
+            if self.weight_syncer.sync(ev):
+                self.num_weight_syncs += 1
             self.num_sent_since_broadcast += 1
 
             # Kick off another sample request
@@ -134,6 +134,7 @@ class AggregationWorkerBase(object):
     def stats(self):
         return {
             "num_weight_syncs": self.num_weight_syncs,
+            "weights_version": self.weight_syncer.version,
             "num_steps_replayed": self.num_replayed,
         }
 
@@ -170,19 +171,21 @@ class SimpleAggregator(AggregationWorkerBase, Aggregator):
                  replay_buffer_num_slots=0,
                  train_batch_size=500,
                  sample_batch_size=50,
-                 broadcast_interval=5):
+                 broadcast_interval=5,
+                 weight_sync_encoding="full"):
         self.workers = workers
         self.local_worker = workers.local_worker()
         self.broadcast_interval = broadcast_interval
+        self.weight_syncer = WeightSyncer(weight_sync_encoding)
         self.broadcast_new_weights()
         AggregationWorkerBase.__init__(
-            self, self.broadcasted_weights, self.workers.remote_workers(),
+            self, self.weight_syncer, self.workers.remote_workers(),
             max_sample_requests_in_flight_per_worker, replay_proportion,
             replay_buffer_num_slots, train_batch_size, sample_batch_size)
 
     @override(Aggregator)
     def broadcast_new_weights(self):
-        self.broadcasted_weights = ray.put(self.local_worker.get_weights())
+        self.weight_syncer.set_weights(self.local_worker.get_weights())
         self.num_sent_since_broadcast = 0
 
     @override(Aggregator)
@@ -15,6 +15,7 @@ from ray.rllib.utils.annotations import override
 from ray.rllib.optimizers.aso_aggregator import Aggregator, \
     AggregationWorkerBase
 from ray.rllib.utils.memory import ray_get_and_free
+from ray.rllib.utils.weight_sync import WeightSyncer, WeightsReceiver
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,8 @@ class TreeAggregator(Aggregator):
                  replay_buffer_num_slots=0,
                  train_batch_size=500,
                  sample_batch_size=50,
-                 broadcast_interval=5):
+                 broadcast_interval=5,
+                 weight_sync_encoding="full"):
         self.workers = workers
         self.num_aggregation_workers = num_aggregation_workers
         self.max_sample_requests_in_flight_per_worker = \
@@ -46,8 +48,8 @@ class TreeAggregator(Aggregator):
         self.sample_batch_size = sample_batch_size
         self.train_batch_size = train_batch_size
         self.broadcast_interval = broadcast_interval
-        self.broadcasted_weights = ray.put(
-            workers.local_worker().get_weights())
+        self.weight_syncer = WeightSyncer(weight_sync_encoding)
+        self.weight_syncer.set_weights(workers.local_worker().get_weights())
         self.num_batches_processed = 0
         self.num_broadcasts = 0
         self.num_sent_since_broadcast = 0
@@ -70,7 +72,9 @@ class TreeAggregator(Aggregator):
 
         self.aggregators = aggregators
         for i, agg in enumerate(self.aggregators):
-            agg.init.remote(self.broadcasted_weights, assigned_workers[i],
+            # The initial weights must arrive before init()
+            self.weight_syncer.sync(agg)
+            agg.init.remote(assigned_workers[i],
                             self.max_sample_requests_in_flight_per_worker,
                             self.replay_proportion,
                             self.replay_buffer_num_slots,
@@ -78,7 +82,6 @@ class TreeAggregator(Aggregator):
 
         self.agg_tasks = TaskPool()
         for agg in self.aggregators:
-            agg.set_weights.remote(self.broadcasted_weights)
             self.agg_tasks.add(agg, agg.get_train_batches.remote())
 
         self.initialized = True
@@ -90,13 +93,13 @@ class TreeAggregator(Aggregator):
             for b in ray_get_and_free(batches):
                 self.num_sent_since_broadcast += 1
                 yield b
-            agg.set_weights.remote(self.broadcasted_weights)
+            self.weight_syncer.sync(agg)
             self.agg_tasks.add(agg, agg.get_train_batches.remote())
             self.num_batches_processed += 1
 
     @override(Aggregator)
     def broadcast_new_weights(self):
-        self.broadcasted_weights = ray.put(
+        self.weight_syncer.set_weights(
             self.workers.local_worker().get_weights())
         self.num_sent_since_broadcast = 0
         self.num_broadcasts += 1
@@ -125,23 +128,31 @@ class TreeAggregator(Aggregator):
 class AggregationWorker(AggregationWorkerBase):
     def __init__(self):
         self.initialized = False
+        self.weight_syncer = None
+        self.weights_receiver = WeightsReceiver()
 
-    def init(self, initial_weights_obj_id, remote_workers,
-             max_sample_requests_in_flight_per_worker, replay_proportion,
-             replay_buffer_num_slots, train_batch_size, sample_batch_size):
+    def init(self, remote_workers, max_sample_requests_in_flight_per_worker,
+             replay_proportion, replay_buffer_num_slots, train_batch_size,
+             sample_batch_size):
         """Deferred init that assigns sub-workers to this aggregator."""
 
         logger.info("Assigned workers {} to aggregation worker {}".format(
             remote_workers, self))
         assert remote_workers
+        assert self.weight_syncer is not None, "Initial weights not set."
         AggregationWorkerBase.__init__(
-            self, initial_weights_obj_id, remote_workers,
+            self, self.weight_syncer, remote_workers,
             max_sample_requests_in_flight_per_worker, replay_proportion,
             replay_buffer_num_slots, train_batch_size, sample_batch_size)
         self.initialized = True
 
     def set_weights(self, weights):
-        self.broadcasted_weights = weights
+        # Relay the weights to the sub-workers with the same encoding
+        if self.weight_syncer is None:
+            self.weight_syncer = WeightSyncer(weights.encoding)
+        decoded = self.weights_receiver.receive(weights)
+        if decoded is not None:
+            self.weight_syncer.set_weights(decoded, weights.version)
 
     def get_train_batches(self):
         assert self.initialized, "Must call init() before using this class."
@@ -5,6 +5,7 @@ from __future__ import print_function
 import ray
 from ray.rllib.evaluation.metrics import get_learner_stats
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
+from ray.rllib.utils.aggregation_tree import AggregationTree
 from ray.rllib.utils.annotations import override
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils.memory import ray_get_and_free
@@ -16,15 +17,22 @@ class AsyncGradientsOptimizer(PolicyOptimizer):
     This optimizer asynchronously pulls and applies gradients from remote
     workers, sending updated weights back as needed. This pipelines the
     gradient computations on the remote workers.
+
+    If aggregation_fan_in is set, the workers instead compute gradients in
+    synchronous rounds. The gradients are summed up a tree of actors with
+    this fan-in, and their average is applied once per round, so the driver
+    does not have to fetch and apply every worker's gradients.
     """
 
-    def __init__(self, workers, grads_per_step=100):
+    def __init__(self, workers, grads_per_step=100, aggregation_fan_in=0):
         PolicyOptimizer.__init__(self, workers)
 
         self.apply_timer = TimerStat()
         self.wait_timer = TimerStat()
         self.dispatch_timer = TimerStat()
         self.grads_per_step = grads_per_step
+        self.aggregation_fan_in = aggregation_fan_in
+        self.tree = None
         self.learner_stats = {}
         if not self.workers.remote_workers():
             raise ValueError(
@@ -32,6 +40,10 @@ class AsyncGradientsOptimizer(PolicyOptimizer):
 
     @override(PolicyOptimizer)
     def step(self):
+        if self.aggregation_fan_in:
+            self._step_tree()
+            return
+
         weights = ray.put(self.workers.local_worker().get_weights())
         pending_gradients = {}
         num_gradients = 0
@@ -69,6 +81,37 @@ class AsyncGradientsOptimizer(PolicyOptimizer):
                     pending_gradients[future] = e
                     num_gradients += 1
 
+    def _step_tree(self):
+        remote_workers = self.workers.remote_workers()
+        if self.tree is None or self.tree.leaves != remote_workers:
+            self.stop()
+            self.tree = AggregationTree(remote_workers,
+                                        self.aggregation_fan_in)
+
+        num_gradients = 0
+        while num_gradients < self.grads_per_step:
+            with self.dispatch_timer:
+                weights = ray.put(self.workers.local_worker().get_weights())
+            with self.wait_timer:
+                grads, num_grads, batch_count, info = self.tree.reduce(
+                    "apply", _sum_gradients, _sample_and_compute_gradients,
+                    weights)
+                self.learner_stats = get_learner_stats(info)
+
+            if grads is not None:
+                with self.apply_timer:
+                    self.workers.local_worker().apply_gradients(
+                        _scale(grads, 1.0 / num_grads))
+            self.num_steps_sampled += batch_count
+            self.num_steps_trained += batch_count
+            num_gradients += len(remote_workers)
+
+    @override(PolicyOptimizer)
+    def stop(self):
+        if self.tree is not None:
+            self.tree.stop()
+            self.tree = None
+
     @override(PolicyOptimizer)
     def stats(self):
         return dict(
@@ -78,3 +121,43 @@ class AsyncGradientsOptimizer(PolicyOptimizer):
                 "dispatch_time_ms": round(1000 * self.dispatch_timer.mean, 3),
                 "learner": self.learner_stats,
             })
+
+
+def _sample_and_compute_gradients(worker, weights):
+    worker.set_weights(weights)
+    grads, info = worker.compute_gradients(worker.sample())
+    return grads, 1, info["batch_count"], info
+
+
+def _sum_gradients(values):
+    """Sums (grads, num_grads, batch_count, info) tuples of several workers.
+
+    The info of one of the workers is kept."""
+
+    total, num_grads, batch_count, info = None, 0, 0, {}
+    for grads, n, count, worker_info in values:
+        batch_count += count
+        info = worker_info
+        if grads is not None:
+            total = grads if total is None else _add(total, grads)
+            num_grads += n
+    return total, num_grads, batch_count, info
+
+
+def _add(a, b):
+    # Not in place, since the inputs may be read-only object store buffers
+    if isinstance(a, dict):
+        return {k: _add(a[k], b[k]) for k in a}
+    elif isinstance(a, (list, tuple)):
+        return [_add(x, y) for x, y in zip(a, b)]
+    else:
+        return a + b
+
+
+def _scale(grads, factor):
+    if isinstance(grads, dict):
+        return {k: _scale(v, factor) for k, v in grads.items()}
+    elif isinstance(grads, (list, tuple)):
+        return [_scale(g, factor) for g in grads]
+    else:
+        return grads * factor
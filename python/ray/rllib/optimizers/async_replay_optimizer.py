@@ -22,9 +22,10 @@ from ray.rllib.policy.sample_batch import SampleBatch, DEFAULT_POLICY_ID, \
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer
 from ray.rllib.utils.annotations import override
-from ray.rllib.utils.actors import TaskPool, create_colocated
-from ray.rllib.utils.memory import ray_get_and_free
+from ray.rllib.utils.actors import TaskPool, create_colocated, get_hosts
+from ray.rllib.utils.memory import ray_get_and_free, ray_free
 from ray.rllib.utils.timer import TimerStat
+from ray.rllib.utils.weight_sync import WeightSyncer
 from ray.rllib.utils.window_stat import WindowStat
 
 SAMPLE_QUEUE_DEPTH = 2
@@ -60,7 +61,8 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                  num_replay_buffer_shards=1,
                  max_weight_sync_delay=400,
                  debug=False,
-                 batch_replay=False):
+                 batch_replay=False,
+                 weight_sync_encoding="full"):
         PolicyOptimizer.__init__(self, workers)
 
         self.debug = debug
@@ -86,6 +88,14 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             prioritized_replay_beta,
             prioritized_replay_eps,
         ], num_replay_buffer_shards)
+        self.local_host = os.uname()[1]
+        self.replay_hosts = dict(
+            zip(self.replay_actors, get_hosts(self.replay_actors)))
+        self.router = ReplayShardRouter(
+            self.replay_actors,
+            [self.replay_hosts[ra] for ra in self.replay_actors],
+            max_imbalance=max(sample_batch_size,
+                              buffer_size // num_replay_buffer_shards // 10))
 
         # Stats
         self.timers = {
@@ -95,8 +105,14 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                 "replay_processing", "update_priorities", "train", "sample"
             ]
         }
+        self.weight_syncer = WeightSyncer(weight_sync_encoding)
         self.num_weight_syncs = 0
         self.num_samples_dropped = 0
+        self.replay_bytes_local = 0
+        self.replay_bytes_remote = 0
+        self.add_bytes_local = 0
+        self.add_bytes_remote = 0
+        self.add_bytes_tasks = []
         self.learning_started = False
 
         # Number of worker steps since the last weight update
@@ -145,6 +161,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
     def stats(self):
         replay_stats = ray_get_and_free(self.replay_actors[0].stats.remote(
             self.debug))
+        self._update_add_bytes()
         timing = {
             "{}_time_ms".format(k): round(1000 * self.timers[k].mean, 3)
             for k in self.timers
@@ -158,9 +175,16 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                                        3),
             "train_throughput": round(self.timers["train"].mean_throughput, 3),
             "num_weight_syncs": self.num_weight_syncs,
+            "weights_version": self.weight_syncer.version,
             "num_samples_dropped": self.num_samples_dropped,
             "learner_queue": self.learner.learner_queue_size.stats(),
             "replay_shard_0": replay_stats,
+            "replay_locality": {
+                "add_bytes_local": self.add_bytes_local,
+                "add_bytes_remote": self.add_bytes_remote,
+                "replay_bytes_local": self.replay_bytes_local,
+                "replay_bytes_remote": self.replay_bytes_remote,
+            },
         }
         debug_stats = {
             "timing_breakdown": timing,
@@ -173,19 +197,42 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             stats["learner"] = self.learner.stats
         return dict(PolicyOptimizer.stats(self), **stats)
 
+    def _update_add_bytes(self):
+        """Updates the add locality totals of all replay shards.
+
+        The totals requested by the previous call are collected if they have
+        arrived, so stats() doesn't wait on every shard.
+        """
+        if self.add_bytes_tasks:
+            ready, _ = ray.wait(
+                self.add_bytes_tasks,
+                num_returns=len(self.add_bytes_tasks),
+                timeout=0.0)
+            if len(ready) < len(self.add_bytes_tasks):
+                return
+            totals = ray_get_and_free(self.add_bytes_tasks)
+            self.add_bytes_local = sum(t[0] for t in totals)
+            self.add_bytes_remote = sum(t[1] for t in totals)
+        self.add_bytes_tasks = [
+            ra.get_add_bytes.remote() for ra in self.replay_actors
+        ]
+
     # For https://github.com/ray-project/ray/issues/2541 only
     def _set_workers(self, remote_workers):
         self.workers.reset(remote_workers)
-        weights = self.workers.local_worker().get_weights()
+        self.router.set_producer_hosts(remote_workers,
+                                       get_hosts(remote_workers))
+        self.weight_syncer.reset()
+        self.weight_syncer.set_weights(
+            self.workers.local_worker().get_weights())
         for ev in self.workers.remote_workers():
-            ev.set_weights.remote(weights)
+            self.weight_syncer.sync(ev)
             self.steps_since_update[ev] = 0
             for _ in range(SAMPLE_QUEUE_DEPTH):
                 self.sample_tasks.add(ev, ev.sample_with_count.remote())
 
     def _step(self):
         sample_timesteps, train_timesteps = 0, 0
-        weights = None
 
         with self.timers["sample_processing"]:
             completed = list(self.sample_tasks.completed())
@@ -193,47 +240,106 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             for i, (ev, (sample_batch, count)) in enumerate(completed):
                 sample_timesteps += counts[i]
 
-                # Send the data to the replay buffer
-                random.choice(
-                    self.replay_actors).add_batch.remote(sample_batch)
+                # Send the data to a replay shard, preferably on the same node
+                ra, is_local = self.router.route(ev, counts[i])
+                ra.add_batch.remote(sample_batch, is_local)
 
                 # Update weights if needed
                 self.steps_since_update[ev] += counts[i]
                 if self.steps_since_update[ev] >= self.max_weight_sync_delay:
                     # Note that it's important to pull new weights once
                     # updated to avoid excessive correlation between actors
-                    if weights is None or self.learner.weights_updated:
-                        self.learner.weights_updated = False
-                        with self.timers["put_weights"]:
-                            weights = ray.put(
+                    with self.timers["put_weights"]:
+                        if self.learner.weights_updated:
+                            self.learner.weights_updated = False
+                            self.weight_syncer.set_weights(
                                 self.workers.local_worker().get_weights())
-                    ev.set_weights.remote(weights)
-                    self.num_weight_syncs += 1
+                        if self.weight_syncer.sync(ev):
+                            self.num_weight_syncs += 1
                     self.steps_since_update[ev] = 0
 
                 # Kick off another sample request
                 self.sample_tasks.add(ev, ev.sample_with_count.remote())
 
         with self.timers["replay_processing"]:
-            for ra, replay in self.replay_tasks.completed():
+            # Take replays from shards on this node first, so that replays
+            # dropped due to a full learner queue are never fetched remotely
+            completed = sorted(
+                self.replay_tasks.completed(),
+                key=lambda c: self.replay_hosts[c[0]] != self.local_host)
+            for ra, replay in completed:
                 self.replay_tasks.add(ra, ra.replay.remote())
                 if self.learner.inqueue.full():
                     self.num_samples_dropped += 1
                 else:
                     with self.timers["get_samples"]:
-                        samples = ray_get_and_free(replay)
-                    # Defensive copy against plasma crashes, see #2610 #3452
-                    self.learner.inqueue.put((ra, samples and samples.copy()))
+                        samples = ray.get(replay)
+                    if samples is None:
+                        ray_free(replay)
+                        continue
+                    if self.replay_hosts[ra] == self.local_host:
+                        self.replay_bytes_local += _size_bytes(samples)
+                    else:
+                        self.replay_bytes_remote += _size_bytes(samples)
+                    # The samples are read in place from the object store,
+                    # so the object must not be freed until the learner is
+                    # done with them (see #2610 #3452). The learner hands
+                    # the object id back once it has dropped the samples.
+                    self.learner.inqueue.put((ra, replay, samples))
+                    del samples
 
         with self.timers["update_priorities"]:
             while not self.learner.outqueue.empty():
-                ra, prio_dict, count = self.learner.outqueue.get()
+                ra, prio_dict, count, replay = self.learner.outqueue.get()
                 ra.update_priorities.remote(prio_dict)
+                ray_free(replay)
                 train_timesteps += count
 
         return sample_timesteps, train_timesteps
 
 
+class ReplayShardRouter(object):
+    """Picks the replay shard to send each sample batch to.
+
+    Batches go to the least filled shard on the node of the worker that
+    produced them. If no shard lives on that node, or the local shard is more
+    than `max_imbalance` timesteps ahead of the least filled shard overall,
+    the least filled shard overall is used instead.
+    """
+
+    def __init__(self, shards, shard_hosts, max_imbalance):
+        self.shards = shards
+        self.shard_hosts = shard_hosts
+        self.max_imbalance = max_imbalance
+        self.fill = [0] * len(shards)
+        self.shards_by_host = collections.defaultdict(list)
+        for i, host in enumerate(shard_hosts):
+            self.shards_by_host[host].append(i)
+        self.producer_hosts = {}
+
+    def set_producer_hosts(self, producers, hosts):
+        self.producer_hosts.update(zip(producers, hosts))
+
+    def route(self, producer, count):
+        """Returns the shard for a batch of `count` timesteps from producer.
+
+        Returns:
+            shard (ActorHandle): replay shard to add the batch to.
+            is_local (bool): whether the shard is on the producer's node.
+        """
+        host = self.producer_hosts.get(producer)
+        least_filled = min(
+            range(len(self.shards)), key=self.fill.__getitem__)
+        i = least_filled
+        if self.shards_by_host.get(host):
+            local = min(self.shards_by_host[host], key=self.fill.__getitem__)
+            if self.fill[local] - self.fill[least_filled] <= \
+                    self.max_imbalance:
+                i = local
+        self.fill[i] += count
+        return self.shards[i], self.shard_hosts[i] == host
+
+
 @ray.remote(num_cpus=0)
 class ReplayActor(object):
     """A replay buffer shard.
@@ -261,20 +367,26 @@ class ReplayActor(object):
         self.replay_timer = TimerStat()
         self.update_priorities_timer = TimerStat()
         self.num_added = 0
+        self.add_bytes = {True: 0, False: 0}
 
     def get_host(self):
         return os.uname()[1]
 
-    def add_batch(self, batch):
+    def get_add_bytes(self):
+        return self.add_bytes[True], self.add_bytes[False]
+
+    def add_batch(self, batch, is_local=None):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
             batch = MultiAgentBatch({DEFAULT_POLICY_ID: batch}, batch.count)
+        if is_local is not None:
+            self.add_bytes[is_local] += _size_bytes(batch)
         with self.add_batch_timer:
             for policy_id, s in batch.policy_batches.items():
-                for row in s.rows():
-                    self.replay_buffers[policy_id].add(
-                        row["obs"], row["actions"], row["rewards"],
-                        row["new_obs"], row["dones"], row["weights"])
+                self.replay_buffers[policy_id].add_batch(
+                    s["obs"], s["actions"], s["rewards"], s["new_obs"],
+                    s["dones"], s["weights"])
+        self.add_batch_timer.push_units_processed(batch.count)
         self.num_added += batch.count
 
     def replay(self):
@@ -309,9 +421,12 @@ class ReplayActor(object):
     def stats(self, debug=False):
         stat = {
             "add_batch_time_ms": round(1000 * self.add_batch_timer.mean, 3),
+            "add_throughput": round(self.add_batch_timer.mean_throughput, 3),
             "replay_time_ms": round(1000 * self.replay_timer.mean, 3),
             "update_priorities_time_ms": round(
                 1000 * self.update_priorities_timer.mean, 3),
+            "add_bytes_local": self.add_bytes[True],
+            "add_bytes_remote": self.add_bytes[False],
         }
         for policy_id, replay_buffer in self.replay_buffers.items():
             stat.update({
@@ -340,14 +455,20 @@ class BatchReplayActor(object):
         # Metrics
         self.num_added = 0
         self.cur_size = 0
+        self.add_bytes = {True: 0, False: 0}
 
     def get_host(self):
         return os.uname()[1]
 
-    def add_batch(self, batch):
+    def get_add_bytes(self):
+        return self.add_bytes[True], self.add_bytes[False]
+
+    def add_batch(self, batch, is_local=None):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
             batch = MultiAgentBatch({DEFAULT_POLICY_ID: batch}, batch.count)
+        if is_local is not None:
+            self.add_bytes[is_local] += _size_bytes(batch)
         self.buffer.append(batch)
         self.cur_size += batch.count
         self.num_added += batch.count
@@ -366,6 +487,8 @@ class BatchReplayActor(object):
         stat = {
             "cur_size": self.cur_size,
             "num_added": self.num_added,
+            "add_bytes_local": self.add_bytes[True],
+            "add_bytes_remote": self.add_bytes[False],
         }
         return stat
 
@@ -398,16 +521,35 @@ class LearnerThread(threading.Thread):
 
     def step(self):
         with self.queue_timer:
-            ra, replay = self.inqueue.get()
-        if replay is not None:
-            prio_dict = {}
-            with self.grad_timer:
-                grad_out = self.local_worker.learn_on_batch(replay)
-                for pid, info in grad_out.items():
-                    prio_dict[pid] = (
-                        replay.policy_batches[pid].data.get("batch_indexes"),
-                        info.get("td_error"))
-                    self.stats[pid] = get_learner_stats(info)
-            self.outqueue.put((ra, prio_dict, replay.count))
+            ra, replay_id, replay = self.inqueue.get()
+        prio_dict = {}
+        with self.grad_timer:
+            grad_out = self.local_worker.learn_on_batch(replay)
+            for pid, info in grad_out.items():
+                batch_indexes = replay.policy_batches[pid].data.get(
+                    "batch_indexes")
+                # Copy so nothing refers to the replay object once it is
+                # handed back to be freed
+                if batch_indexes is not None:
+                    batch_indexes = batch_indexes.copy()
+                prio_dict[pid] = (batch_indexes, info.get("td_error"))
+                self.stats[pid] = get_learner_stats(info)
+        count = replay.count
+        del replay
+        self.outqueue.put((ra, prio_dict, count, replay_id))
         self.learner_queue_size.push(self.inqueue.qsize())
         self.weights_updated = True
+
+
+def _size_bytes(batch):
+    """Returns the approximate size of the batch data in bytes.
+
+    Only the array buffers are counted. Object arrays such as infos count
+    their pointers, and columns that aren't arrays are skipped, so that this
+    stays cheap on every add.
+    """
+
+    if isinstance(batch, MultiAgentBatch):
+        return sum(_size_bytes(b) for b in batch.policy_batches.values())
+    return sum(
+        v.nbytes for v in batch.data.values() if isinstance(v, np.ndarray))
@@ -43,6 +43,7 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
                  minibatch_buffer_size=1,
                  learner_queue_size=16,
                  num_aggregation_workers=0,
+                 weight_sync_encoding="full",
                  _fake_gpus=False):
         PolicyOptimizer.__init__(self, workers)
 
@@ -91,7 +92,8 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
                 replay_buffer_num_slots=replay_buffer_num_slots,
                 train_batch_size=train_batch_size,
                 sample_batch_size=sample_batch_size,
-                broadcast_interval=broadcast_interval)
+                broadcast_interval=broadcast_interval,
+                weight_sync_encoding=weight_sync_encoding)
         else:
             self.aggregator = SimpleAggregator(
                 workers,
@@ -101,7 +103,8 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
                 replay_buffer_num_slots=replay_buffer_num_slots,
                 train_batch_size=train_batch_size,
                 sample_batch_size=sample_batch_size,
-                broadcast_interval=broadcast_interval)
+                broadcast_interval=broadcast_interval,
+                weight_sync_encoding=weight_sync_encoding)
 
     def add_stat_val(self, key, val):
         if key not in self._last_stats_sum:
@@ -3,9 +3,11 @@ from __future__ import division
 from __future__ import print_function
 
 import logging
+import math
 
 from ray.rllib.utils.annotations import DeveloperAPI
-from ray.rllib.evaluation.metrics import collect_episodes, summarize_episodes
+from ray.rllib.evaluation.metrics import collect_metrics_summary, \
+    MetricsSummary
 
 logger = logging.getLogger(__name__)
 
@@ -100,18 +102,22 @@ class PolicyOptimizer(object):
             res (dict): A training result dict from worker metrics with
                 `info` replaced with stats from self.
         """
-        episodes, num_dropped = collect_episodes(
+        remote_workers = selected_workers or self.workers.remote_workers()
+        # Each worker only sends its share of the recent episodes to keep
+        summary, num_dropped = collect_metrics_summary(
             self.workers.local_worker(),
-            selected_workers or self.workers.remote_workers(),
-            timeout_seconds=timeout_seconds)
-        orig_episodes = list(episodes)
-        missing = min_history - len(episodes)
+            remote_workers,
+            timeout_seconds=timeout_seconds,
+            max_recent=int(
+                math.ceil(min_history / float(max(1, len(remote_workers))))))
+        smoothed = MetricsSummary()
+        smoothed.merge(summary)
+        missing = min_history - len(summary)
         if missing > 0:
-            episodes.extend(self.episode_history[-missing:])
-            assert len(episodes) <= min_history
-        self.episode_history.extend(orig_episodes)
+            smoothed.add(self.episode_history[-missing:])
+        self.episode_history.extend(summary.recent)
         self.episode_history = self.episode_history[-min_history:]
-        res = summarize_episodes(episodes, orig_episodes, num_dropped)
+        res = smoothed.summarize(num_dropped, summary.num_episodes)
         res.update(info=self.stats())
         return res
 
@@ -54,6 +54,50 @@ class ReplayBuffer(object):
             self._evicted_hit_stats.push(self._hit_count[self._next_idx])
             self._hit_count[self._next_idx] = 0
 
+    @DeveloperAPI
+    def add_batch(self, obses_t, actions, rewards, obses_tp1, dones, weights):
+        """Add a batch of transitions given as columns.
+
+        Equivalent to calling add() for each row in order, but the rows are
+        written into the storage one contiguous slice at a time.
+
+        Returns
+        -------
+        idxes: np.array
+          storage index each of the added transitions was written to
+        """
+        data = list(zip(obses_t, actions, rewards, obses_tp1, dones))
+        idxes = (self._next_idx + np.arange(len(data))) % self._maxsize
+        self._num_added += len(data)
+
+        pos = 0
+        while pos < len(data):
+            start = self._next_idx
+            chunk = data[pos:pos + self._maxsize - start]
+            end = start + len(chunk)
+            num_new = end - len(self._storage)
+            if num_new > 0:
+                self._est_size_bytes += sum(
+                    sys.getsizeof(d) for row in chunk[-num_new:] for d in row)
+            self._storage[start:end] = chunk
+
+            # Replicate the per-row eviction accounting of add()
+            if self._eviction_started:
+                first = start
+            elif end >= self._maxsize:
+                self._eviction_started = True
+                first = end - 1
+            else:
+                first = end
+            for i in range(first + 1, end + 1):
+                i %= self._maxsize
+                self._evicted_hit_stats.push(self._hit_count[i])
+                self._hit_count[i] = 0
+
+            self._next_idx = end % self._maxsize
+            pos += len(chunk)
+        return idxes
+
     def _encode_sample(self, idxes):
         obses_t, actions, rewards, obses_tp1, dones = [], [], [], [], []
         for i in idxes:
@@ -155,6 +199,30 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         self._it_sum[idx] = weight**self._alpha
         self._it_min[idx] = weight**self._alpha
 
+    @DeveloperAPI
+    def add_batch(self, obses_t, actions, rewards, obses_tp1, dones, weights):
+        """See ReplayBuffer.add_batch
+
+        The priorities of the whole batch are written into the segment trees
+        with a single update per tree. Transitions with a weight of None get
+        the current max priority.
+        """
+
+        idxes = super(PrioritizedReplayBuffer, self).add_batch(
+            obses_t, actions, rewards, obses_tp1, dones, weights)
+        if weights is None:
+            weights = np.full(len(idxes), self._max_priority)
+        else:
+            weights = np.asarray(weights)
+            if weights.dtype == np.object_:
+                weights = np.array(
+                    [self._max_priority if w is None else w for w in weights],
+                    dtype=np.float64)
+        priorities = np.power(weights, self._alpha)
+        self._it_sum.set_items(idxes, priorities)
+        self._it_min.set_items(idxes, priorities)
+        return idxes
+
     def _sample_proportional(self, batch_size):
         res = []
         for _ in range(batch_size):
@@ -4,6 +4,8 @@ from __future__ import print_function
 
 import operator
 
+import numpy as np
+
 
 class SegmentTree(object):
     def __init__(self, capacity, operation, neutral_element):
@@ -92,6 +94,39 @@ class SegmentTree(object):
                                                self._value[2 * idx + 1])
             idx //= 2
 
+    def set_items(self, idxes, values):
+        """Sets several array elements at once.
+
+        Equivalent to assigning `self[idx] = val` for each pair in order,
+        but every internal node above the updated leaves is recomputed only
+        once instead of once per leaf.
+
+        Parameters
+        ----------
+        idxes: [int]
+          indices of the array elements to set
+        values: [obj]
+          new values for the elements at `idxes`
+        """
+        if isinstance(idxes, np.ndarray):
+            idxes = idxes.tolist()
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        value = self._value
+        nodes = set()
+        for idx, val in zip(idxes, values):
+            idx += self._capacity
+            value[idx] = val
+            nodes.add(idx // 2)
+        # All leaves are at the same depth, so process one level at a time
+        while nodes and 0 not in nodes:
+            parents = set()
+            for idx in nodes:
+                value[idx] = self._operation(value[2 * idx],
+                                             value[2 * idx + 1])
+                parents.add(idx // 2)
+            nodes = parents
+
     def __getitem__(self, idx):
         assert 0 <= idx < self._capacity
         return self._value[self._capacity + idx]
@@ -103,14 +103,13 @@ class SyncReplayOptimizer(PolicyOptimizer):
                 }, batch.count)
 
             for policy_id, s in batch.policy_batches.items():
-                for row in s.rows():
-                    self.replay_buffers[policy_id].add(
-                        pack_if_needed(row["obs"]),
-                        row["actions"],
-                        row["rewards"],
-                        pack_if_needed(row["new_obs"]),
-                        row["dones"],
-                        weight=None)
+                self.replay_buffers[policy_id].add_batch(
+                    [pack_if_needed(o) for o in s["obs"]],
+                    s["actions"],
+                    s["rewards"],
+                    [pack_if_needed(o) for o in s["new_obs"]],
+                    s["dones"],
+                    weights=None)
 
         if self.num_steps_sampled >= self.replay_starts:
             self._optimize()
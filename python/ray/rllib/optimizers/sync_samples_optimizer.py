@@ -2,7 +2,6 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import ray
 import logging
 from ray.rllib.evaluation.metrics import get_learner_stats
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
@@ -11,6 +10,7 @@ from ray.rllib.utils.annotations import override
 from ray.rllib.utils.filter import RunningStat
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils.memory import ray_get_and_free
+from ray.rllib.utils.weight_sync import WeightSyncer
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,11 @@ class SyncSamplesOptimizer(PolicyOptimizer):
     model weights are then broadcast to all remote workers.
     """
 
-    def __init__(self, workers, num_sgd_iter=1, train_batch_size=1):
+    def __init__(self,
+                 workers,
+                 num_sgd_iter=1,
+                 train_batch_size=1,
+                 weight_sync_encoding="full"):
         PolicyOptimizer.__init__(self, workers)
 
         self.update_weights_timer = TimerStat()
@@ -33,14 +37,16 @@ class SyncSamplesOptimizer(PolicyOptimizer):
         self.num_sgd_iter = num_sgd_iter
         self.train_batch_size = train_batch_size
         self.learner_stats = {}
+        self.weight_syncer = WeightSyncer(weight_sync_encoding)
 
     @override(PolicyOptimizer)
     def step(self):
         with self.update_weights_timer:
             if self.workers.remote_workers():
-                weights = ray.put(self.workers.local_worker().get_weights())
+                self.weight_syncer.set_weights(
+                    self.workers.local_worker().get_weights())
                 for e in self.workers.remote_workers():
-                    e.set_weights.remote(weights)
+                    self.weight_syncer.sync(e)
 
         with self.sample_timer:
             samples = []
@@ -81,5 +87,6 @@ class SyncSamplesOptimizer(PolicyOptimizer):
                 "sample_peak_throughput": round(
                     self.sample_timer.mean_throughput, 3),
                 "opt_samples": round(self.grad_timer.mean_units_processed, 3),
+                "weights_version": self.weight_syncer.version,
                 "learner": self.learner_stats,
             })
@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer
+
+
+def _add_rows(buf, batch, weights):
+    for i in range(len(batch)):
+        buf.add(batch[i], i, float(i), batch[i] + 1, False, weights[i])
+
+
+def test_add_batch_matches_add():
+    for batch_size in [3, 5, 12]:
+        buf = PrioritizedReplayBuffer(5, alpha=0.6)
+        buf_batch = PrioritizedReplayBuffer(5, alpha=0.6)
+        for _ in range(4):
+            obs = np.random.randn(batch_size, 2)
+            weights = np.random.uniform(0.1, 2.0, size=batch_size)
+            _add_rows(buf, obs, weights)
+            buf_batch.add_batch(obs, np.arange(batch_size),
+                                np.arange(batch_size, dtype=np.float64),
+                                obs + 1, [False] * batch_size, weights)
+            buf._hit_count += 1
+            buf_batch._hit_count += 1
+        assert buf._next_idx == buf_batch._next_idx
+        assert buf._num_added == buf_batch._num_added
+        assert buf._evicted_hit_stats.items == \
+            buf_batch._evicted_hit_stats.items
+        for row, row_batch in zip(buf._storage, buf_batch._storage):
+            assert np.array_equal(row[0], row_batch[0])
+            assert row[1:3] == row_batch[1:3]
+        assert np.allclose(buf._it_sum._value, buf_batch._it_sum._value)
+        assert np.allclose(buf._it_min._value, buf_batch._it_min._value)
+
+
+def test_add_batch_default_weights():
+    buf = PrioritizedReplayBuffer(4, alpha=0.6)
+    buf.add_batch([0, 1], [0, 1], [0.0, 1.0], [1, 2], [False, True], None)
+    buf.add_batch([2], [2], [2.0], [3], [False], [None])
+    assert len(buf) == 3
+    assert np.isclose(buf._it_sum.sum(), 3.0)
+
+
+if __name__ == "__main__":
+    test_add_batch_matches_add()
+    test_add_batch_default_weights()
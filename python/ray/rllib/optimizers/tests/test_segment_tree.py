@@ -99,9 +99,22 @@ def test_max_interval_tree():
     assert np.isclose(tree.min(3, 4), 3.0)
 
 
+def test_tree_set_items():
+    for tree_cls in [SumSegmentTree, MinSegmentTree]:
+        tree = tree_cls(8)
+        tree_batch = tree_cls(8)
+        idxes = [5, 1, 2, 5, 7]
+        values = [2.0, 0.5, 3.0, 1.5, 4.0]
+        for idx, val in zip(idxes, values):
+            tree[idx] = val
+        tree_batch.set_items(np.array(idxes), np.array(values))
+        assert tree._value == tree_batch._value
+
+
 if __name__ == "__main__":
     test_tree_set()
     test_tree_set_overlap()
     test_prefixsum_idx()
     test_prefixsum_idx2()
     test_max_interval_tree()
+    test_tree_set_items()
@@ -40,9 +40,16 @@ class _MockWorker(object):
     def set_weights(self, weights):
         self._weights = weights
 
-    def get_filters(self, flush_after=False):
-        obs_filter = self.obs_filter.copy()
-        rew_filter = self.rew_filter.copy()
+    def apply(self, func, *args):
+        return func(self, *args)
+
+    def get_filters(self, flush_after=False, deltas=False):
+        if deltas:
+            obs_filter = self.obs_filter.as_delta()
+            rew_filter = self.rew_filter.as_delta()
+        else:
+            obs_filter = self.obs_filter.copy()
+            rew_filter = self.rew_filter.copy()
         if flush_after:
             self.obs_filter.clear_buffer(), self.rew_filter.clear_buffer()
 
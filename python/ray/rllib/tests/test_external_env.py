@@ -5,6 +5,7 @@ from __future__ import print_function
 import gym
 import numpy as np
 import random
+import threading
 import unittest
 import uuid
 
@@ -12,6 +13,7 @@ import ray
 from ray.rllib.agents.dqn import DQNTrainer
 from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
+from ray.rllib.env.base_env import BaseEnv
 from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.tests.test_rollout_worker import (BadPolicy, MockPolicy,
                                                  MockEnv)
@@ -117,7 +119,57 @@ class MultiServing(ExternalEnv):
                     del cur_obs[i]
 
 
+class IdleServing(ExternalEnv):
+    def __init__(self, env, stop):
+        ExternalEnv.__init__(
+            self, env.action_space, env.observation_space, max_concurrent=2000)
+        self.stop = stop
+
+    def run(self):
+        self.stop.wait()
+
+
 class TestExternalEnv(unittest.TestCase):
+    def testExternalEnvPollsReadyEpisodes(self):
+        env = IdleServing(MockEnv(25), threading.Event())
+        base_env = BaseEnv.to_base_env(env)
+        eids = [env.start_episode() for _ in range(1000)]
+        received = []
+        env.request_action(eids[5], 5, received.append)
+        env.request_action(eids[500], 500, received.append)
+        obs = base_env.poll()[0]
+        self.assertEqual(obs, {
+            eids[5]: {
+                "agent0": 5
+            },
+            eids[500]: {
+                "agent0": 500
+            }
+        })
+        self.assertEqual(len(env._ready_episodes), 0)
+        base_env.send_actions({
+            eids[5]: {
+                "agent0": 0
+            },
+            eids[500]: {
+                "agent0": 1
+            }
+        })
+        self.assertEqual(received, [0, 1])
+        env.end_episode(eids[500], 501)
+        obs, _, dones, _, _ = base_env.poll()
+        self.assertEqual(obs, {eids[500]: {"agent0": 501}})
+        self.assertTrue(dones[eids[500]]["__all__"])
+        self.assertNotIn(eids[500], env._episodes)
+        self.assertEqual(len(env._episodes), 999)
+
+    def testExternalEnvPollFailsIfServingThreadStops(self):
+        stop = threading.Event()
+        env = IdleServing(MockEnv(25), stop)
+        base_env = BaseEnv.to_base_env(env)
+        stop.set()
+        self.assertRaises(Exception, base_env.poll)
+
     def testExternalEnvCompleteEpisodes(self):
         ev = RolloutWorker(
             env_creator=lambda _: SimpleServing(MockEnv(25)),
@@ -8,6 +8,8 @@ import numpy as np
 import ray
 from ray.rllib.utils.filter import RunningStat, MeanStdFilter
 from ray.rllib.utils import FilterManager
+from ray.rllib.utils.aggregation_tree import AggregationTree
+from ray.rllib.utils.filter_manager import merge_filter_deltas
 from ray.rllib.tests.mock_worker import _MockWorker
 
 
@@ -26,6 +28,19 @@ class RunningStatTest(unittest.TestCase):
                      if (len(li) == 1) else np.var(li, ddof=1, axis=0))
                 self.assertTrue(np.allclose(rs.var, v))
 
+    def testPushBatch(self):
+        for shp in ((), (3, ), (3, 4)):
+            rs = RunningStat(shp)
+            rs_batch = RunningStat(shp)
+            for n in (1, 7, 0, 30):
+                vals = np.random.randn(n, *shp)
+                for val in vals:
+                    rs.push(val)
+                rs_batch.push_batch(vals)
+                self.assertEqual(rs.n, rs_batch.n)
+                self.assertTrue(np.allclose(rs.mean, rs_batch.mean))
+                self.assertTrue(np.allclose(rs.var, rs_batch.var))
+
     def testCombiningStat(self):
         for shape in [(), (3, ), (3, 4)]:
             li = []
@@ -72,6 +87,33 @@ class MSFTest(unittest.TestCase):
             self.assertEqual(filt.buffer.n, 5)
             self.assertEqual(filt.rs.n, 15)
 
+    def testVectorized(self):
+        for shape in [(), (3, ), (3, 4)]:
+            filt = MeanStdFilter(shape)
+            filt_vec = MeanStdFilter(shape)
+            obs = np.random.randn(10, *shape)
+            for o in obs:
+                filt(o)
+            filt_vec(obs)
+            self.assertEqual(filt_vec.rs.n, 10)
+            self.assertEqual(filt_vec.buffer.n, 10)
+            self.assertTrue(np.allclose(filt.rs.mean, filt_vec.rs.mean))
+            self.assertTrue(np.allclose(filt.rs.std, filt_vec.rs.std))
+
+    def testApplyDelta(self):
+        filt = MeanStdFilter(())
+        filt2 = MeanStdFilter(())
+        for i in range(5):
+            filt2(i)
+        filt2.clear_buffer()
+        for i in range(3):
+            filt2(i)
+        delta = filt2.as_delta()
+        self.assertEqual(delta.buffer.n, 3)
+        filt.apply_changes(delta, with_buffer=False)
+        self.assertEqual(filt.rs.n, 3)
+        self.assertEqual(filt.buffer.n, 0)
+
 
 class FilterManagerTest(unittest.TestCase):
     def setUp(self):
@@ -106,5 +148,61 @@ class FilterManagerTest(unittest.TestCase):
         self.assertEqual(obs_f.buffer.n, filt1.buffer.n)
 
 
+class MergeFilterDeltasTest(unittest.TestCase):
+    def testMergeMatchesApplyingSeparately(self):
+        workers = [_MockWorker(sample_count=n) for n in [3, 5, 7]]
+        for w in workers:
+            w.sample()
+        deltas = [w.get_filters(deltas=True) for w in workers]
+        merged = merge_filter_deltas(
+            [merge_filter_deltas(deltas[:2]), deltas[2]])
+        self.assertEqual(len(merged), 1)
+
+        separate = MeanStdFilter(())
+        for d in deltas:
+            separate.apply_changes(d["obs_filter"])
+        combined = MeanStdFilter(())
+        combined.apply_changes(merged[0]["obs_filter"])
+        self.assertEqual(combined.rs.n, 15)
+        self.assertTrue(np.allclose(combined.rs.mean, separate.rs.mean))
+        self.assertTrue(np.allclose(combined.rs.var, separate.rs.var))
+
+
+class FilterTreeTest(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=1)
+
+    def tearDown(self):
+        ray.shutdown()
+
+    def testSynchronizeThroughTree(self):
+        RemoteWorker = ray.remote(_MockWorker)
+        remotes = [RemoteWorker.remote(sample_count=10) for _ in range(5)]
+        ray.get([r.sample.remote() for r in remotes])
+        tree = AggregationTree(remotes, fan_in=2)
+        self.assertGreater(len(tree.nodes), 1)
+
+        local = MeanStdFilter(())
+        FilterManager.synchronize(
+            {
+                "obs_filter": local,
+                "rew_filter": local.copy()
+            }, remotes, tree=tree)
+        self.assertEqual(local.rs.n, 50)
+        filters = tree.reduce("get_filters", lambda fs: fs)
+        self.assertEqual(len(filters), 5)
+        for f in filters:
+            self.assertEqual(f["obs_filter"].rs.n, 50)
+
+    def testBroadcastThroughTree(self):
+        RemoteWorker = ray.remote(_MockWorker)
+        remotes = [RemoteWorker.remote() for _ in range(5)]
+        tree = AggregationTree(remotes, fan_in=2)
+        tree.broadcast("set_weights", ray.put(7))
+        # The broadcast has reached every leaf once it returns
+        self.assertEqual(
+            ray.get([r.get_weights.remote() for r in remotes]), [7] * 5)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
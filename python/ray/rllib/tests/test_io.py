@@ -17,7 +17,8 @@ import ray
 from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.agents.pg.pg_policy import PGTFPolicy
 from ray.rllib.evaluation import SampleBatch
-from ray.rllib.offline import IOContext, JsonWriter, JsonReader
+from ray.rllib.offline import IOContext, JsonWriter, JsonReader, \
+    ParallelJsonReader
 from ray.rllib.offline.json_writer import _to_json
 from ray.rllib.tests.test_multi_agent_env import MultiCartpole
 from ray.tune.registry import register_env
@@ -75,6 +76,19 @@ class AgentIOTest(unittest.TestCase):
         self.assertEqual(result["timesteps_total"], 250)  # read from input
         self.assertTrue(np.isnan(result["episode_reward_mean"]))
 
+    def testAgentInputDirParallel(self):
+        self.writeOutputs(self.test_dir)
+        agent = PGTrainer(
+            env="CartPole-v0",
+            config={
+                "input": self.test_dir,
+                "input_num_readers": 2,
+                "input_evaluation": [],
+            })
+        result = agent.train()
+        self.assertEqual(result["timesteps_total"], 250)  # read from input
+        self.assertTrue(np.isnan(result["episode_reward_mean"]))
+
     def testSplitByEpisode(self):
         splits = SAMPLES.split_by_episode()
         self.assertEqual(len(splits), 3)
@@ -260,6 +274,64 @@ class JsonIOTest(unittest.TestCase):
         self.assertGreater(len(seen_o), 90)
         self.assertLess(len(seen_o), 101)
 
+    def testParallelReadWrite(self):
+        ioctx = IOContext(self.test_dir, {}, 0, None)
+        writer = JsonWriter(
+            self.test_dir, ioctx, max_file_size=5000, compress_columns=["obs"])
+        for i in range(100):
+            writer.write(make_sample_batch(i))
+        reader = ParallelJsonReader(
+            self.test_dir + "/*.json", num_readers=4, shuffle_buffer_size=50)
+        seen_a = set()
+        for i in range(1000):
+            batch = reader.next()
+            self.assertEqual(batch["actions"][0], batch["obs"][0])
+            seen_a.add(batch["actions"][0])
+        reader.stop()
+        self.assertEqual(len(seen_a), 100)
+
+    def testParallelReadDeterministicOrder(self):
+        ioctx = IOContext(self.test_dir, {}, 0, None)
+        writer = JsonWriter(
+            self.test_dir, ioctx, max_file_size=5000, compress_columns=["obs"])
+        for i in range(100):
+            writer.write(make_sample_batch(i))
+
+        def read(seed):
+            reader = ParallelJsonReader(
+                self.test_dir + "/*.json", num_readers=1, seed=seed)
+            out = [reader.next()["actions"][0] for _ in range(250)]
+            reader.stop()
+            return out
+
+        self.assertEqual(read(42), read(42))
+        self.assertEqual(sorted(read(42)[:100]), list(range(100)))
+
+    def testParallelShardsCoverAllFiles(self):
+        files = [
+            "{}/file{}.json".format(self.test_dir, i) for i in range(10)
+        ]
+        for path in files:
+            open(path, "w").close()
+        state = random.getstate()
+        reader = ParallelJsonReader(files, num_readers=3)
+        reader.stop()
+        self.assertEqual(random.getstate(), state)
+        for epoch in range(3):
+            shards = []
+            for r in reader.readers:
+                shards.extend(
+                    reader.epoch_files(epoch)[r.index::r.num_readers])
+            self.assertEqual(len(shards), len(files))
+            self.assertEqual(sorted(shards), sorted(files))
+
+    def testParallelAbortOnAllEmptyInputs(self):
+        with open(self.test_dir + "/empty1", "w") as f:
+            for _ in range(100):
+                f.write("\n")
+        reader = ParallelJsonReader([self.test_dir + "/empty1"])
+        self.assertRaises(ValueError, lambda: reader.next())
+
     def testSkipsOverEmptyLinesAndFiles(self):
         open(self.test_dir + "/empty", "w").close()
         with open(self.test_dir + "/f1", "w") as f:
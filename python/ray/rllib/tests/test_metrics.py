@@ -0,0 +1,194 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+
+import ray
+from ray.rllib.evaluation.metrics import MetricsSummary, \
+    collect_metrics_summary, summarize_episodes
+from ray.rllib.evaluation.sampler import RolloutMetrics
+from ray.rllib.offline.off_policy_estimator import OffPolicyEstimate
+from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
+from ray.rllib.utils.stat_sketch import StatSketch
+
+
+def _make_episodes(n, seed):
+    rng = np.random.RandomState(seed)
+    episodes = []
+    for i in range(n):
+        episodes.append(
+            RolloutMetrics(
+                episode_length=int(rng.randint(1, 200)),
+                episode_reward=float(rng.randn() * 100),
+                agent_rewards={
+                    ("a0", "p0"): float(rng.randn()),
+                    ("a1", "p1"): float(rng.randn()),
+                },
+                custom_metrics={
+                    "m": float(rng.rand()),
+                    "maybe_nan": float("nan") if i % 2 else 1.0,
+                },
+                perf_stats={"mean_inference_ms": float(rng.rand())}))
+    episodes.append(OffPolicyEstimate("is", {"V_gain_est": 2.0}))
+    return episodes
+
+
+class MetricsSummaryTest(unittest.TestCase):
+    def testSummarizeMatchesEpisodes(self):
+        episodes = _make_episodes(1000, 0)
+        result = summarize_episodes(episodes, episodes[:10], 0)
+        rewards = [e.episode_reward for e in episodes[:-1]]
+        self.assertEqual(result["episodes_this_iter"], 10)
+        self.assertEqual(result["episode_reward_max"], max(rewards))
+        self.assertEqual(result["episode_reward_min"], min(rewards))
+        self.assertAlmostEqual(result["episode_reward_mean"],
+                               np.mean(rewards))
+        self.assertAlmostEqual(
+            result["episode_len_mean"],
+            np.mean([e.episode_length for e in episodes[:-1]]))
+        for p in [10, 50, 90]:
+            self.assertAlmostEqual(
+                result["episode_reward_p{}".format(p)],
+                np.percentile(rewards, p),
+                delta=0.02 * abs(np.percentile(rewards, p)) + 1)
+        self.assertEqual(set(result["policy_reward_mean"]), {"p0", "p1"})
+        custom = result["custom_metrics"]
+        self.assertTrue(np.isnan(custom["maybe_nan_mean"]))
+        self.assertEqual(custom["maybe_nan_min"], 1.0)
+        self.assertEqual(custom["maybe_nan_max"], 1.0)
+        self.assertIn("m_p50", custom)
+        self.assertIn("mean_inference_ms", result["sampler_perf"])
+        self.assertEqual(result["off_policy_estimator"],
+                         {"is": {
+                             "V_gain_est": 2.0
+                         }})
+
+    def testMergeEqualsAdd(self):
+        episodes = _make_episodes(300, 1)
+        whole = MetricsSummary()
+        whole.add(episodes)
+        merged = MetricsSummary()
+        for i in range(0, len(episodes), 70):
+            part = MetricsSummary()
+            part.add(episodes[i:i + 70])
+            merged.merge(part)
+        self.assertEqual(len(merged), len(whole))
+        r1, r2 = whole.summarize(), merged.summarize()
+        for k in ["episode_reward_min", "episode_reward_max",
+                  "episode_reward_p50", "episode_len_p90"]:
+            self.assertEqual(r1[k], r2[k])
+        self.assertAlmostEqual(r1["episode_reward_mean"],
+                               r2["episode_reward_mean"])
+
+    def testSmoothingOverRecentEpisodes(self):
+        iterations = [
+            _make_episodes(n, seed)
+            for seed, n in enumerate([2000, 3, 40, 150, 0, 7, 99])
+        ]
+
+        class _Worker(object):
+            def get_metrics_summary(self, max_recent=0):
+                summary = MetricsSummary(max_recent)
+                summary.add(iterations[self.i])
+                return summary
+
+        class _WorkerSet(object):
+            def __init__(self):
+                self.worker = _Worker()
+
+            def local_worker(self):
+                return self.worker
+
+            def remote_workers(self):
+                return []
+
+        workers = _WorkerSet()
+        optimizer = PolicyOptimizer(workers)
+        history = []
+        for i, episodes in enumerate(iterations):
+            # Smoothing as done with the full list of episodes
+            missing = 100 - len(episodes)
+            smoothed = episodes + history[-missing:] if missing > 0 else (
+                episodes)
+            history = (history + episodes)[-100:]
+            expected = summarize_episodes(smoothed, episodes, 0)
+
+            workers.worker.i = i
+            result = optimizer.collect_metrics(180, min_history=100)
+            for k in ["episode_reward_min", "episode_reward_max",
+                      "episodes_this_iter"]:
+                self.assertEqual(result[k], expected[k])
+            for k in ["episode_reward_mean", "episode_len_mean"]:
+                self.assertAlmostEqual(result[k], expected[k])
+
+    def testEmptySummary(self):
+        result = MetricsSummary().summarize()
+        self.assertEqual(result["episodes_this_iter"], 0)
+        self.assertTrue(np.isnan(result["episode_reward_mean"]))
+        self.assertTrue(np.isnan(result["episode_reward_max"]))
+        self.assertTrue(np.isnan(result["episode_reward_p50"]))
+
+    def testSketchQuantiles(self):
+        values = np.concatenate(
+            [-np.random.lognormal(size=5000), [0.0] * 100,
+             np.random.lognormal(size=5000)])
+        sketch = StatSketch(relative_accuracy=0.01)
+        for v in values:
+            sketch.add(v)
+        for q in [0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0]:
+            exact = np.percentile(values, q * 100, interpolation="lower")
+            self.assertLessEqual(
+                abs(sketch.quantile(q) - exact), 0.011 * abs(exact) + 1e-9)
+
+
+class _FixedWorker(object):
+    def __init__(self, seed=0, num_episodes=0):
+        self.episodes = _make_episodes(num_episodes, seed)[:num_episodes]
+
+    def apply(self, fn):
+        return fn(self)
+
+    def get_metrics_summary(self, max_recent=0):
+        summary = MetricsSummary(max_recent)
+        summary.add(self.episodes)
+        return summary
+
+
+class _FixedWorkerSet(object):
+    def __init__(self, local, remotes):
+        self.local = local
+        self.remotes = remotes
+
+    def local_worker(self):
+        return self.local
+
+    def remote_workers(self):
+        return self.remotes
+
+
+class CollectRecentEpisodesTest(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=1)
+
+    def tearDown(self):
+        ray.shutdown()
+
+    def testWorkersSendTheirShareOfRecentEpisodes(self):
+        RemoteWorker = ray.remote(_FixedWorker)
+        remotes = [RemoteWorker.remote(seed, 50) for seed in range(3)]
+        summary, _ = collect_metrics_summary(
+            _FixedWorker(), remotes, max_recent=34)
+        self.assertEqual(summary.num_episodes, 150)
+        self.assertEqual(len(summary.recent), 102)
+
+        optimizer = PolicyOptimizer(_FixedWorkerSet(_FixedWorker(), remotes))
+        result = optimizer.collect_metrics(180, min_history=100)
+        self.assertEqual(result["episodes_this_iter"], 150)
+        self.assertEqual(len(optimizer.episode_history), 100)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
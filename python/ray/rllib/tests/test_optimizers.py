@@ -4,6 +4,7 @@ from __future__ import print_function
 
 import gym
 import numpy as np
+import threading
 import time
 import unittest
 
@@ -15,8 +16,11 @@ from ray.rllib.evaluation.rollout_worker import RolloutWorker
 from ray.rllib.evaluation.worker_set import WorkerSet
 from ray.rllib.optimizers import AsyncGradientsOptimizer, AsyncSamplesOptimizer
 from ray.rllib.optimizers.aso_tree_aggregator import TreeAggregator
+from ray.rllib.optimizers.async_replay_optimizer import ReplayShardRouter, \
+    LearnerThread as ReplayLearnerThread
+from ray.rllib.policy.sample_batch import MultiAgentBatch
 from ray.rllib.tests.mock_worker import _MockWorker
-from ray.rllib.utils import try_import_tf
+from ray.rllib.utils import memory, try_import_tf
 
 tf = try_import_tf()
 
@@ -35,6 +39,21 @@ class AsyncOptimizerTest(unittest.TestCase):
         test_optimizer.step()
         self.assertTrue(all(local.get_weights() == 0))
 
+    def testTreeAggregation(self):
+        ray.init(num_cpus=4)
+        local = _MockWorker()
+        remotes = ray.remote(_MockWorker)
+        remote_workers = [remotes.remote() for i in range(5)]
+        workers = WorkerSet._from_existing(local, remote_workers)
+        test_optimizer = AsyncGradientsOptimizer(
+            workers, grads_per_step=10, aggregation_fan_in=2)
+        test_optimizer.step()
+        self.assertGreater(len(test_optimizer.tree.nodes), 1)
+        # Two rounds of five gradients, each averaged and applied once
+        self.assertTrue(all(local.get_weights() == -8))
+        self.assertEqual(test_optimizer.num_steps_sampled, 100)
+        test_optimizer.stop()
+
 
 class PPOCollectTest(unittest.TestCase):
     def tearDown(self):
@@ -107,6 +126,89 @@ class SampleBatchTest(unittest.TestCase):
         self.assertEqual(b["b"].tolist(), [4, 5, 6, 4, 5])
 
 
+class ReplayShardRouterTest(unittest.TestCase):
+    def testPrefersLocalShards(self):
+        router = ReplayShardRouter(["a1", "a2", "b1"], ["a", "a", "b"],
+                                   max_imbalance=100)
+        router.set_producer_hosts(["wa", "wb", "wc"], ["a", "b", "c"])
+        for _ in range(10):
+            self.assertIn(router.route("wa", 10), [("a1", True),
+                                                   ("a2", True)])
+        self.assertEqual(router.fill, [50, 50, 0])
+        self.assertEqual(router.route("wb", 10), ("b1", True))
+        # No shard on the producer's node, use the least filled one
+        self.assertEqual(router.route("wc", 10), ("b1", False))
+
+    def testBalancesFillLevels(self):
+        router = ReplayShardRouter(["a1", "b1"], ["a", "b"], max_imbalance=20)
+        router.set_producer_hosts(["wa"], ["a"])
+        shards = [router.route("wa", 10)[0] for _ in range(10)]
+        self.assertEqual(shards.count("a1"), 6)
+        self.assertLessEqual(router.fill[0] - router.fill[1], 20)
+
+
+class _SlowLearnerWorker(object):
+    """Checks that the batch stays intact while the store is churned."""
+
+    def __init__(self, churn):
+        self.churn = churn
+
+    def learn_on_batch(self, batch):
+        b = batch.policy_batches["default"]
+        expected = b["obs"][:, 0, 0].copy()
+        self.churn.set()
+        time.sleep(0.5)
+        assert (b["obs"][:, 0, 0] == expected).all()
+        assert (b["obs"] == b["batch_indexes"][:, None, None]).all()
+        return {"default": {"td_error": np.zeros(b.count)}}
+
+
+class ReplayLearnerHandoffTest(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=1, object_store_memory=200 * 1024 * 1024)
+        self.free_queue_size = memory.MAX_FREE_QUEUE_SIZE
+        memory.MAX_FREE_QUEUE_SIZE = 0  # free right away
+
+    def tearDown(self):
+        memory.MAX_FREE_QUEUE_SIZE = self.free_queue_size
+        ray.shutdown()
+
+    def testBatchPinnedUntilLearnerDone(self):
+        # Regression test for #2610 #3452: replay batches are read in place
+        # from the object store and used to be copied, as they could be
+        # freed and overwritten while the learner was still using them.
+        churn = threading.Event()
+        learner = ReplayLearnerThread(_SlowLearnerWorker(churn))
+        learner.start()
+        for i in range(5):
+            indexes = np.arange(100) + 100 * i
+            batch = MultiAgentBatch({
+                "default": SampleBatch({
+                    "obs": np.ones((100, 84, 84), dtype=np.float32) *
+                    indexes[:, None, None],
+                    "batch_indexes": indexes,
+                })
+            }, 100)
+            replay = ray.put(batch)
+            del batch
+            learner.inqueue.put(("shard", replay, ray.get(replay)))
+            churn.wait()
+            churn.clear()
+            # Free everything else and fill the store while training
+            for _ in range(20):
+                memory.ray_get_and_free(
+                    ray.put(np.zeros(1024 * 1024, dtype=np.float32)))
+            ra, prio_dict, count, replay_id = learner.outqueue.get(
+                timeout=30)
+            self.assertEqual(ra, "shard")
+            self.assertEqual(count, 100)
+            self.assertEqual(replay_id, replay)
+            self.assertEqual(prio_dict["default"][0].tolist(),
+                             indexes.tolist())
+            memory.ray_free(replay_id)
+        learner.stopped = True
+
+
 class AsyncSamplesOptimizerTest(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
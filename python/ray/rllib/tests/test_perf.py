@@ -3,11 +3,13 @@ from __future__ import division
 from __future__ import print_function
 
 import gym
+import numpy as np
 import time
 import unittest
 
 import ray
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
+from ray.rllib.models.lstm import chop_into_sequences
 from ray.rllib.tests.test_rollout_worker import MockPolicy
 
 
@@ -30,6 +32,24 @@ class TestPerf(unittest.TestCase):
                 count / (time.time() - start)))
             print()
 
+    def testChopIntoSequencesPerformance(self):
+        num_steps = 20000
+        eps_ids = np.repeat(np.arange(num_steps // 200), 200)
+        features = [np.random.randn(num_steps, 84), np.random.randn(num_steps)]
+        states = [np.random.randn(num_steps, 256)]
+        for _ in range(5):
+            start = time.time()
+            count = 0
+            while time.time() - start < 1:
+                chop_into_sequences(eps_ids, np.ones_like(eps_ids),
+                                    np.zeros_like(eps_ids), features, states,
+                                    20)
+                count += num_steps
+            print()
+            print("Chopped steps per second {}".format(
+                count / (time.time() - start)))
+            print()
+
 
 if __name__ == "__main__":
     ray.init(num_cpus=5)
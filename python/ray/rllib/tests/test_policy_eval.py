@@ -0,0 +1,107 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import unittest
+
+import numpy as np
+
+from ray.rllib.evaluation.sampler import PolicyEvalBatcher, \
+    SharedPolicyEvaluator, PolicyEvalData
+from ray.rllib.policy.policy import Policy
+
+
+class EchoPolicy(Policy):
+    """Returns the first obs entry as the action and records batch sizes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def compute_actions(self,
+                        obs_batch,
+                        state_batches,
+                        prev_action_batch=None,
+                        prev_reward_batch=None,
+                        episodes=None,
+                        **kwargs):
+        assert len(episodes) == len(obs_batch)
+        self.batch_sizes.append(len(obs_batch))
+        actions = np.array([o[0] for o in obs_batch])
+        return actions, [], {"obs": np.array(obs_batch)}
+
+
+def _eval_data(values):
+    return [
+        PolicyEvalData(i, "agent0", np.array([v, 0.0]), {}, [], 0, 0.0)
+        for i, v in enumerate(values)
+    ]
+
+
+class PolicyEvalBatcherTest(unittest.TestCase):
+    def testStackReusesBuffer(self):
+        batcher = PolicyEvalBatcher({})
+        a = batcher._stack("p", "obs", [np.ones(3), np.zeros(3)])
+        self.assertEqual(a.shape, (2, 3))
+        self.assertEqual(a.tolist(), [[1, 1, 1], [0, 0, 0]])
+        b = batcher._stack("p", "obs", [np.full(3, 2.0)])
+        self.assertEqual(b.shape, (1, 3))
+        self.assertTrue(np.shares_memory(a, b))
+        c = batcher._stack("p", "obs", [np.ones(3)] * 5)
+        self.assertEqual(c.shape, (5, 3))
+
+    def testStackFallsBackToList(self):
+        batcher = PolicyEvalBatcher({})
+        ragged = [np.ones(2), np.ones(3)]
+        self.assertIs(batcher._stack("p", "obs", ragged), ragged)
+        tuples = [(1, np.ones(2)), (2, np.ones(2))]
+        self.assertIs(batcher._stack("p", "obs", tuples), tuples)
+
+    def testEvaluateWithoutSession(self):
+        policy = EchoPolicy()
+        batcher = PolicyEvalBatcher({"p": policy})
+        result = batcher.evaluate({"p": _eval_data([1, 2, 3])},
+                                  {"p": [None] * 3})
+        self.assertEqual(result["p"][0].tolist(), [1, 2, 3])
+
+
+class SharedPolicyEvaluatorTest(unittest.TestCase):
+    def testMergesConcurrentRequests(self):
+        policy = EchoPolicy()
+        evaluator = SharedPolicyEvaluator({"p": policy}, max_wait_ms=200.0)
+        results = {}
+
+        def request(i):
+            values = [10 * i + j for j in range(i + 1)]
+            results[i] = evaluator.evaluate({"p": _eval_data(values)},
+                                            {"p": [None] * len(values)})
+
+        threads = [
+            threading.Thread(target=request, args=(i, )) for i in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i in range(4):
+            actions, rnn_out, info = results[i]["p"]
+            expected = [10 * i + j for j in range(i + 1)]
+            self.assertEqual(actions.tolist(), expected)
+            self.assertEqual(rnn_out, [])
+            self.assertEqual(info["obs"][:, 0].tolist(), expected)
+        self.assertEqual(sum(policy.batch_sizes), 10)
+        self.assertLess(evaluator.num_batches, 4)
+        self.assertEqual(evaluator.num_requests, 4)
+
+    def testPropagatesErrors(self):
+        class BadPolicy(EchoPolicy):
+            def compute_actions(self, *args, **kwargs):
+                raise ValueError("intentional error")
+
+        evaluator = SharedPolicyEvaluator({"p": BadPolicy()})
+        self.assertRaises(ValueError, evaluator.evaluate,
+                          {"p": _eval_data([1])}, {"p": [None]})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import socket
+import sys
+import threading
+import unittest
+
+import gym
+import numpy as np
+
+from ray.rllib.env.base_env import BaseEnv
+from ray.rllib.env.external_env import ExternalEnv
+from ray.rllib.utils import policy_wire
+from ray.rllib.utils.policy_client import BinaryPolicyClient
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(("localhost", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class AsyncServing(ExternalEnv):
+    def __init__(self, port, **server_kwargs):
+        ExternalEnv.__init__(self, gym.spaces.Discrete(2),
+                             gym.spaces.Box(-1, 1, (4, ), dtype=np.float32))
+        self.port = port
+        self.server_kwargs = server_kwargs
+        self.server = None
+
+    def run(self):
+        from ray.rllib.utils.async_policy_server import AsyncPolicyServer
+        self.server = AsyncPolicyServer(self, "localhost", self.port,
+                                        **self.server_kwargs)
+        self.server.serve_forever()
+
+
+def _run_sampler(base_env, batch_sizes, stop):
+    # Acts like the sampler: the action is the sign of the first obs entry
+    while not stop.is_set():
+        obs, _, dones, _, off_policy_actions = base_env.poll()
+        actions = {}
+        for eid, agent_obs in obs.items():
+            if dones[eid]["__all__"]:
+                continue
+            if eid in off_policy_actions:
+                actions[eid] = off_policy_actions[eid]
+            else:
+                actions[eid] = {
+                    agent_id: int(o[0] > 0)
+                    for agent_id, o in agent_obs.items()
+                }
+        batch_sizes.append(len(actions))
+        base_env.send_actions(actions)
+
+
+class PolicyWireTest(unittest.TestCase):
+    def testRequestRoundTrip(self):
+        obs = np.random.randn(3, 4).astype(np.float32)
+        data = {
+            "command": policy_wire.LOG_ACTION,
+            "episode_id": u"ep1",
+            "observation": obs,
+            "action": np.int64(1),
+        }
+        frame = policy_wire.encode_request(7, data)
+        request_id, decoded = policy_wire.decode_request(
+            frame[policy_wire.FRAME_HEADER.size:])
+        self.assertEqual(request_id, 7)
+        self.assertEqual(decoded["command"], policy_wire.LOG_ACTION)
+        self.assertEqual(decoded["episode_id"], "ep1")
+        self.assertEqual(decoded["observation"].dtype, np.float32)
+        self.assertTrue(np.array_equal(decoded["observation"], obs))
+        self.assertEqual(decoded["action"], 1)
+        self.assertIsInstance(decoded["action"], np.int64)
+
+    def testResponseValues(self):
+        for value in [
+                None, True, 3, -2.5, u"x", np.zeros((0, 2)), [1, {
+                    "a": 2
+                }], {
+                    "k": np.ones(2)
+                }
+        ]:
+            frame = policy_wire.encode_response(1, value)
+            _, decoded, error = policy_wire.decode_response(
+                frame[policy_wire.FRAME_HEADER.size:])
+            self.assertFalse(error)
+            self.assertEqual(repr(decoded), repr(value))
+
+
+@unittest.skipIf(sys.version_info[0] == 2, "asyncio requires Python 3")
+class AsyncPolicyServerTest(unittest.TestCase):
+    def setUp(self):
+        self.port = _free_port()
+        self.env = AsyncServing(self.port, max_wait_ms=50.0)
+        self.base_env = BaseEnv.to_base_env(self.env)
+        self.batch_sizes = []
+        self.stop = threading.Event()
+        sampler = threading.Thread(
+            target=_run_sampler,
+            args=(self.base_env, self.batch_sizes, self.stop))
+        sampler.daemon = True
+        sampler.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.env.server.shutdown()
+
+    def _connect(self):
+        for _ in range(100):
+            try:
+                client = BinaryPolicyClient("localhost:{}".format(self.port))
+                client.start_episode()
+                return client
+            except socket.error:
+                threading.Event().wait(0.05)
+        raise Exception("Server did not start")
+
+    def testEpisode(self):
+        client = self._connect()
+        eid = client.start_episode(training_enabled=False)
+        for i in range(10):
+            obs = np.full(4, 1 if i % 2 else -1, dtype=np.float32)
+            self.assertEqual(client.get_action(eid, obs), i % 2)
+            client.log_returns(eid, 1.0, info={"i": i})
+        client.log_action(eid, np.zeros(4, dtype=np.float32), 1)
+        client.end_episode(eid, np.zeros(4, dtype=np.float32))
+        self.assertRaises(RuntimeError, client.get_action, eid, np.zeros(4))
+        client.close()
+
+    def testBatchesConcurrentRequests(self):
+        clients = [self._connect() for _ in range(8)]
+        eids = [c.start_episode() for c in clients]
+        barrier = threading.Barrier(len(clients))
+        results = {}
+
+        def act(i):
+            barrier.wait()
+            obs = np.ones(4, dtype=np.float32)
+            results[i] = clients[i].get_action(eids[i], obs)
+
+        threads = [
+            threading.Thread(target=act, args=(i, ))
+            for i in range(len(clients))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {i: 1 for i in range(len(clients))})
+        self.assertGreater(max(self.batch_sizes), 1)
+        self.assertLess(self.env.server.num_batches, len(clients))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
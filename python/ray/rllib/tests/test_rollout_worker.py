@@ -14,10 +14,12 @@ from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.agents.a3c import A2CTrainer
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
 from ray.rllib.evaluation.metrics import collect_metrics
+from ray.rllib.evaluation.sample_batch_builder import SampleBatchBuilder
 from ray.rllib.policy.policy import Policy
 from ray.rllib.evaluation.postprocessing import compute_advantages
 from ray.rllib.policy.sample_batch import DEFAULT_POLICY_ID, SampleBatch
 from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.env.subproc_vector_env import SubprocVectorEnv
 from ray.tune.registry import register_env
 
 
@@ -102,6 +104,18 @@ class MockEnv2(gym.Env):
         return self.i, 100, self.i >= self.episode_length, {}
 
 
+class FailOnFirstStepEnv(MockEnv2):
+    def __init__(self):
+        MockEnv2.__init__(self, episode_length=2)
+        self.failed = False
+
+    def step(self, action):
+        if not self.failed:
+            self.failed = True
+            raise ValueError("kaboom")
+        return MockEnv2.step(self, action)
+
+
 class MockVectorEnv(VectorEnv):
     def __init__(self, episode_length, num_envs):
         self.envs = [MockEnv(episode_length) for _ in range(num_envs)]
@@ -334,6 +348,57 @@ class TestRolloutWorker(unittest.TestCase):
         result = collect_metrics(ev, [])
         self.assertEqual(result["episodes_this_iter"], 4)
 
+    def testEnvProcesses(self):
+        ev = RolloutWorker(
+            env_creator=lambda _: MockEnv(episode_length=8),
+            policy=MockPolicy,
+            batch_mode="truncate_episodes",
+            batch_steps=4,
+            num_envs=4,
+            num_env_processes=2)
+        batch = ev.sample()
+        self.assertEqual(batch.count, 16)
+        result = collect_metrics(ev, [])
+        self.assertEqual(result["episodes_this_iter"], 0)
+        batch = ev.sample()
+        result = collect_metrics(ev, [])
+        self.assertEqual(result["episodes_this_iter"], 4)
+        ev.stop()
+
+    def testSubprocVectorEnv(self):
+        env = SubprocVectorEnv(
+            lambda i: MockEnv2(episode_length=i + 1),
+            num_envs=3,
+            num_processes=2,
+            action_space=gym.spaces.Discrete(2),
+            observation_space=gym.spaces.Discrete(100))
+        self.assertEqual(env.vector_reset(), [0, 0, 0])
+        obs, rewards, dones, infos = env.vector_step([0, 1, 0])
+        self.assertEqual(obs, [1, 1, 1])
+        self.assertEqual(rewards, [100, 100, 100])
+        self.assertEqual(dones, [True, False, False])
+        self.assertEqual(infos, [{}, {}, {}])
+        obs, _, dones, _ = env.vector_step([0, 1, 0])
+        self.assertEqual(obs, [2, 2, 2])
+        self.assertEqual(dones, [True, True, False])
+        self.assertEqual(env.reset_at(1), 0)
+        env.close()
+
+    def testSubprocVectorEnvError(self):
+        env = SubprocVectorEnv(
+            lambda i: FailOnFirstStepEnv() if i == 0 else MockEnv2(2),
+            num_envs=3,
+            num_processes=3,
+            action_space=gym.spaces.Discrete(2),
+            observation_space=gym.spaces.Discrete(100))
+        env.vector_reset()
+        self.assertRaises(RuntimeError, lambda: env.vector_step([0, 0, 0]))
+        # The replies of the other processes to the failed step were drained
+        obs, _, dones, _ = env.vector_step([0, 0, 0])
+        self.assertEqual(obs, [1, 2, 2])
+        self.assertEqual(dones, [False, True, True])
+        env.close()
+
     def testVectorEnvSupport(self):
         ev = RolloutWorker(
             env_creator=lambda _: MockVectorEnv(episode_length=20, num_envs=8),
@@ -441,6 +506,37 @@ class TestRolloutWorker(unittest.TestCase):
         return obs_f
 
 
+class TestSampleBatchBuilder(unittest.TestCase):
+    def testColumnTypes(self):
+        builder = SampleBatchBuilder(capacity=2)
+        for i in range(5):
+            builder.add_values(
+                obs=np.ones(3) * i,
+                actions=i,
+                rewards=1 if i == 0 else 0.5,
+                dones=i == 4,
+                infos={"i": i})
+        batch = builder.build_and_reset()
+        self.assertEqual(batch.count, 5)
+        self.assertEqual(batch["obs"].dtype, np.float32)
+        self.assertEqual(batch["obs"].tolist()[4], [4, 4, 4])
+        self.assertEqual(batch["actions"].dtype, np.int64)
+        self.assertEqual(batch["rewards"].tolist(), [1, 0.5, 0.5, 0.5, 0.5])
+        self.assertEqual(batch["dones"].tolist(), [False] * 4 + [True])
+        self.assertEqual(batch["infos"][2], {"i": 2})
+        self.assertEqual(batch["unroll_id"].tolist(), [0] * 5)
+
+    def testAddBatchWithoutCopy(self):
+        builder = SampleBatchBuilder()
+        batch = SampleBatch({"obs": np.zeros((4, 2), dtype=np.float32)})
+        builder.add_batch(batch)
+        out = builder.build_and_reset()
+        self.assertIs(out["obs"], batch["obs"])
+        builder.add_batch(batch)
+        builder.add_batch(batch)
+        self.assertEqual(builder.build_and_reset()["obs"].shape, (8, 2))
+
+
 if __name__ == "__main__":
     ray.init(num_cpus=5)
     unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ray.rllib.agents.es import utils
+from ray.rllib.agents.es.es import SharedNoiseTable
+
+
+class SharedNoiseTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        # Unusual seeds, so that no table is left over from other runs
+        self.seed = np.random.randint(1 << 30, 1 << 31)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testSharedNoise(self):
+        count = 1000
+        noise = utils.get_shared_noise(
+            count, seed=self.seed, directory=self.tmpdir)
+        expected = np.random.RandomState(self.seed).randn(count).astype(
+            np.float32)
+        self.assertEqual(noise.dtype, np.float32)
+        self.assertTrue(np.array_equal(noise, expected))
+
+        path = os.path.join(self.tmpdir, "rllib_noise_{}_{}.float32".format(
+            self.seed, count))
+        self.assertEqual(noise.filename, path)
+        mtime = os.path.getmtime(path)
+        again = utils.get_shared_noise(
+            count, seed=self.seed, directory=self.tmpdir)
+        self.assertEqual(again.filename, path)
+        self.assertEqual(os.path.getmtime(path), mtime)
+        self.assertTrue(np.array_equal(again, expected))
+
+    def testWriteNoiseInChunks(self):
+        count = 1000
+        path = os.path.join(self.tmpdir, "noise")
+        chunk_size = utils.NOISE_CHUNK_SIZE
+        utils.NOISE_CHUNK_SIZE = 300
+        try:
+            utils._write_noise(path, count, self.seed)
+        finally:
+            utils.NOISE_CHUNK_SIZE = chunk_size
+        expected = np.random.RandomState(self.seed).randn(count).astype(
+            np.float32)
+        self.assertTrue(
+            np.array_equal(np.fromfile(path, dtype=np.float32), expected))
+
+    def testWeightedSumOfRows(self):
+        noise = SharedNoiseTable(
+            np.random.RandomState(0).randn(1000).astype(np.float32))
+        dim = 7
+        rows = noise.get_rows(dim)
+        indices = np.random.randint(0, len(rows), size=50)
+        for i in indices:
+            self.assertTrue(np.array_equal(rows[i], noise.get(i, dim)))
+
+        weights = np.random.randn(50).astype(np.float32)
+        total, count = utils.batched_weighted_sum(
+            weights, rows, batch_size=8, indices=indices)
+        expected, expected_count = utils.batched_weighted_sum(
+            weights, (noise.get(i, dim) for i in indices), batch_size=8)
+        self.assertEqual(count, expected_count)
+        self.assertTrue(np.allclose(total, expected, atol=1e-5))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+import numpy as np
+
+import ray
+from ray.rllib.utils.weight_sync import WeightSyncer, WeightsReceiver
+
+
+class _WeightsHolder(object):
+    def __init__(self):
+        self.receiver = WeightsReceiver()
+        self.weights = None
+        self.num_set = 0
+
+    def set_weights(self, weights):
+        weights = self.receiver.receive(weights)
+        if weights is not None:
+            self.weights = weights
+            self.num_set += 1
+
+    def get(self):
+        return self.weights, self.receiver.version, self.num_set
+
+
+def _make_weights():
+    return {
+        "p0": np.random.randn(100).astype(np.float32),
+        "p1": [np.random.randn(3, 4), np.arange(5)],
+    }
+
+
+def _assert_weights_equal(test, w1, w2, **kwargs):
+    test.assertEqual(set(w1.keys()), set(w2.keys()))
+    test.assertTrue(np.allclose(w1["p0"], w2["p0"], **kwargs))
+    for a, b in zip(w1["p1"], w2["p1"]):
+        test.assertTrue(np.allclose(a, b, **kwargs))
+
+
+class WeightSyncTest(unittest.TestCase):
+    def testEncodings(self):
+        for encoding in ["full", "fp16", "delta"]:
+            syncer = WeightSyncer(encoding)
+            receiver = WeightsReceiver()
+            for _ in range(3):
+                weights = _make_weights()
+                syncer.set_weights(weights)
+                base = receiver.version if encoding == "delta" else None
+                decoded = receiver.receive(syncer.encode(base))
+                self.assertEqual(receiver.version, syncer.version)
+                _assert_weights_equal(self, weights, decoded, atol=1e-2)
+                self.assertEqual(decoded["p0"].dtype, np.float32)
+                self.assertEqual(decoded["p1"][0].dtype, np.float64)
+
+    def testDeltaSendsOnlyChanges(self):
+        syncer = WeightSyncer("delta")
+        receiver = WeightsReceiver()
+        weights = _make_weights()
+        syncer.set_weights(weights)
+        receiver.receive(syncer.encode())
+        new_weights = {
+            "p0": weights["p0"].copy(),
+            "p1": [weights["p1"][0] + 1, weights["p1"][1]],
+        }
+        new_weights["p0"][7] = 42
+        syncer.set_weights(new_weights)
+        update = syncer.encode(receiver.version)
+        self.assertEqual(update.payload["p0"].kind, "sparse")
+        self.assertEqual(update.payload["p1"][1].kind, "same")
+        # Mostly changed arrays are sent in full
+        self.assertIsInstance(update.payload["p1"][0], np.ndarray)
+        decoded = receiver.receive(update)
+        _assert_weights_equal(self, new_weights, decoded, atol=0)
+
+    def testReceiverSkipsStaleUpdates(self):
+        syncer = WeightSyncer()
+        receiver = WeightsReceiver()
+        syncer.set_weights(_make_weights())
+        old = syncer.encode()
+        syncer.set_weights(_make_weights())
+        self.assertIsNotNone(receiver.receive(syncer.encode()))
+        self.assertIsNone(receiver.receive(old))
+        self.assertIsNone(receiver.receive(syncer.encode()))
+        # Versions of a different syncer are not comparable
+        other = WeightSyncer()
+        other.set_weights(_make_weights())
+        self.assertIsNotNone(receiver.receive(other.encode()))
+        self.assertEqual(receiver.source, other.source)
+
+    def testSyncSkipsUpToDateActors(self):
+        ray.init(num_cpus=1)
+        try:
+            holder = ray.remote(_WeightsHolder).remote()
+            syncer = WeightSyncer("delta")
+            weights = _make_weights()
+            syncer.set_weights(weights)
+            self.assertTrue(syncer.sync(holder))
+            self.assertFalse(syncer.sync(holder))
+            weights = _make_weights()
+            syncer.set_weights(weights)
+            self.assertTrue(syncer.sync(holder))
+            held, version, num_set = ray.get(holder.get.remote())
+            _assert_weights_equal(self, weights, held, atol=0)
+            self.assertEqual(version, 2)
+            self.assertEqual(num_set, 2)
+            self.assertEqual(syncer.stats()["num_weight_syncs_skipped"], 1)
+        finally:
+            ray.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -82,9 +82,14 @@ def drop_colocated(actors):
     return non_colocated
 
 
+def get_hosts(actors):
+    """Returns the hostname of each actor, which must implement get_host()."""
+    return ray.get([a.get_host.remote() for a in actors])
+
+
 def split_colocated(actors):
     localhost = os.uname()[1]
-    hosts = ray.get([a.get_host.remote() for a in actors])
+    hosts = get_hosts(actors)
     local = []
     non_local = []
     for host, a in zip(hosts, actors):
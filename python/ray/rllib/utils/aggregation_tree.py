@@ -0,0 +1,219 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import logging
+import os
+
+import ray
+from ray.rllib.utils.annotations import DeveloperAPI
+from ray.rllib.utils.memory import ray_get_and_free
+
+logger = logging.getLogger(__name__)
+
+# Rounds of extra node creation to try to place nodes next to their children
+MAX_PLACEMENT_ATTEMPTS = 3
+
+
+@ray.remote(num_cpus=0)
+class TreeNode(object):
+    """Interior node of an AggregationTree.
+
+    Forwards calls to its children and reduces their results."""
+
+    def __init__(self):
+        self.children = []
+        self.children_are_leaves = True
+
+    def get_host(self):
+        return os.uname()[1]
+
+    def set_children(self, children, children_are_leaves):
+        self.children = children
+        self.children_are_leaves = children_are_leaves
+
+    def reduce(self, method, args, reduce_fn):
+        if self.children_are_leaves:
+            futures = [getattr(c, method).remote(*args) for c in self.children]
+        else:
+            futures = [
+                c.reduce.remote(method, args, reduce_fn)
+                for c in self.children
+            ]
+        return reduce_fn(ray_get_and_free(futures))
+
+    def broadcast(self, method, args):
+        if self.children_are_leaves:
+            futures = [getattr(c, method).remote(*args) for c in self.children]
+        else:
+            futures = [c.broadcast.remote(method, args) for c in self.children]
+        ray_get_and_free(futures)
+
+
+@DeveloperAPI
+class AggregationTree(object):
+    """A k-ary tree of actors to gather results from many leaf actors.
+
+    Each TreeNode calls up to `fan_in` children and reduces their results,
+    so the driver only fetches and reduces the results of the top level of
+    the tree. Broadcasts are forwarded down the tree the same way, and
+    return once every leaf has run the call. Leaves
+    that implement get_host() are grouped with leaves on the same node, and
+    their tree node is placed on that node where possible.
+
+    With `fan_in` or fewer leaves, no tree nodes are created and calls go to
+    the leaves directly.
+
+    Calls through the tree are ordered with respect to other calls through
+    the same tree. Since they block until the leaves are done, they are also
+    ordered with respect to later calls made on the leaves directly.
+
+    Examples:
+        >>> tree = AggregationTree(workers, fan_in=8)
+        >>> tree.broadcast("set_weights", ray.put(weights))
+        >>> total = tree.reduce("sample_with_count", sum_counts)
+    """
+
+    @DeveloperAPI
+    def __init__(self, leaves, fan_in=8):
+        """Build a tree over the given actors.
+
+        Arguments:
+            leaves (list): Actor handles to aggregate over.
+            fan_in (int): Max number of children of each tree node, and of
+                the top level of the tree.
+        """
+        if fan_in < 2:
+            raise ValueError(
+                "fan_in must be at least 2, got {}".format(fan_in))
+        self.leaves = list(leaves)
+        self.fan_in = fan_in
+        self.nodes = []
+        self.top = self.leaves
+        self.top_are_leaves = True
+        hosts = _try_get_hosts(self.leaves)
+        while len(self.top) > fan_in:
+            groups = _group_by_host(self.top, hosts, fan_in)
+            nodes, hosts = _create_nodes([host for host, _ in groups])
+            for node, (_, children) in zip(nodes, groups):
+                node.set_children.remote(children, self.top_are_leaves)
+            self.nodes.extend(nodes)
+            self.top = nodes
+            self.top_are_leaves = False
+        logger.info("Created aggregation tree with {} nodes over {} "
+                    "leaves".format(len(self.nodes), len(self.leaves)))
+
+    @DeveloperAPI
+    def reduce(self, method, reduce_fn, *args):
+        """Calls a method on every leaf and returns the reduced results.
+
+        Arguments:
+            method (str): Name of the leaf method to call.
+            reduce_fn (func): Function from a list of results to a single
+                result of the same kind, since it is applied to partial
+                results again further up the tree.
+            args (list): Arguments to pass to every leaf. Large values
+                should be passed as object ids, which are only resolved by
+                the leaves.
+
+        Returns:
+            The output of reduce_fn on the results of all leaves.
+        """
+        args = list(args)
+        if self.top_are_leaves:
+            futures = [getattr(a, method).remote(*args) for a in self.top]
+        else:
+            futures = [
+                n.reduce.remote(method, args, reduce_fn) for n in self.top
+            ]
+        return reduce_fn(ray_get_and_free(futures))
+
+    @DeveloperAPI
+    def broadcast(self, method, *args):
+        """Calls a method on every leaf and waits for all of them.
+
+        The results of the leaves are discarded.
+
+        Arguments:
+            method (str): Name of the leaf method to call.
+            args (list): Arguments as in reduce().
+        """
+        args = list(args)
+        if self.top_are_leaves:
+            futures = [getattr(a, method).remote(*args) for a in self.top]
+        else:
+            futures = [n.broadcast.remote(method, args) for n in self.top]
+        ray_get_and_free(futures)
+
+    @DeveloperAPI
+    def stop(self):
+        """Terminates the tree nodes. The leaves are left running."""
+        for node in self.nodes:
+            node.__ray_terminate__.remote()
+        self.nodes = []
+
+
+def _try_get_hosts(actors):
+    try:
+        futures = [a.get_host.remote() for a in actors]
+    except AttributeError:
+        return [None] * len(actors)
+    return ray.get(futures)
+
+
+def _group_by_host(actors, hosts, fan_in):
+    """Returns a list of (host, actors) groups with at most fan_in actors.
+
+    Actors on the same host are grouped together. The remainders of all
+    hosts are grouped together at the end, so that there are no more groups
+    than when ignoring the hosts."""
+
+    by_host = collections.OrderedDict()
+    for actor, host in zip(actors, hosts):
+        by_host.setdefault(host, []).append(actor)
+    groups = []
+    leftover = []
+    for host, host_actors in by_host.items():
+        num_full = len(host_actors) // fan_in * fan_in
+        for i in range(0, num_full, fan_in):
+            groups.append((host, host_actors[i:i + fan_in]))
+        leftover.extend((host, a) for a in host_actors[num_full:])
+    for i in range(0, len(leftover), fan_in):
+        chunk = leftover[i:i + fan_in]
+        host = collections.Counter(h for h, _ in chunk).most_common(1)[0][0]
+        groups.append((host, [a for _, a in chunk]))
+    return groups
+
+
+def _create_nodes(wanted_hosts):
+    """Returns (nodes, hosts) with nodes placed on wanted_hosts if possible."""
+
+    spare = collections.defaultdict(list)
+    nodes = [None] * len(wanted_hosts)
+    hosts = [None] * len(wanted_hosts)
+
+    def assign(i, host):
+        nodes[i] = spare[host].pop()
+        hosts[i] = host
+
+    for _ in range(MAX_PLACEMENT_ATTEMPTS):
+        missing = [i for i, n in enumerate(nodes) if n is None]
+        if not missing:
+            break
+        created = [TreeNode.remote() for _ in missing]
+        for node, host in zip(created, _try_get_hosts(created)):
+            spare[host].append(node)
+        for i in missing:
+            if spare[wanted_hosts[i]]:
+                assign(i, wanted_hosts[i])
+            elif wanted_hosts[i] is None:
+                assign(i, next(h for h in spare if spare[h]))
+
+    for i, node in enumerate(nodes):
+        if node is None:
+            assign(i, next(h for h in spare if spare[h]))
+    for host_nodes in spare.values():
+        for node in host_nodes:
+            node.__ray_terminate__.remote()
+    return nodes, hosts
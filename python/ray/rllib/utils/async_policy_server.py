@@ -0,0 +1,210 @@
+# Note: asyncio is only compatible with Python 3
+
+import asyncio
+import logging
+import traceback
+
+from ray.rllib.utils import policy_wire
+from ray.rllib.utils.annotations import PublicAPI
+
+logger = logging.getLogger(__name__)
+
+
+@PublicAPI
+class AsyncPolicyServer(object):
+    """Asyncio policy server that can be launched from a ExternalEnv.
+
+    Unlike PolicyServer, which serves each HTTP request on its own thread
+    with a pickled body, this server runs a single event loop that serves
+    persistent TCP connections speaking the binary format of policy_wire.
+    Clients may pipeline requests for many episodes over one connection.
+
+    GET_ACTION and LOG_ACTION requests are collected for up to `max_wait_ms`
+    (or until `max_batch_size` are pending) and then handed to the
+    ExternalEnv all at once, so the sampler picks them up in a single poll
+    and computes their actions with one `compute_actions` call. Waiting for
+    the actions does not block any thread.
+
+    Examples:
+        >>> class CartpoleServing(ExternalEnv):
+               def run(self):
+                   server = AsyncPolicyServer(self, "localhost", 8900)
+                   server.serve_forever()
+        >>> register_env("srv", lambda _: CartpoleServing())
+        >>> pg = PGTrainer(env="srv", config={"num_workers": 0})
+        >>> while True:
+                pg.train()
+
+        >>> client = BinaryPolicyClient("localhost:8900")
+        >>> eps_id = client.start_episode()
+        >>> action = client.get_action(eps_id, obs)
+    """
+
+    @PublicAPI
+    def __init__(self,
+                 external_env,
+                 address,
+                 port,
+                 max_batch_size=256,
+                 max_wait_ms=1.0,
+                 action_timeout=60.0):
+        """Initialize an AsyncPolicyServer.
+
+        Arguments:
+            external_env (ExternalEnv): Env to forward requests to.
+            address (str): Address to listen on.
+            port (int): Port to listen on.
+            max_batch_size (int): Hand pending action requests to the env as
+                soon as this many are pending.
+            max_wait_ms (float): Max time to hold back an action request to
+                batch it with others. With 0, only requests received within
+                the same event loop iteration are batched.
+            action_timeout (float): Seconds to wait for the policy to
+                compute an action before failing the request.
+        """
+        self.external_env = external_env
+        self.address = address
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.action_timeout = action_timeout
+        self.num_requests = 0
+        self.num_batches = 0
+        self.num_batched_requests = 0
+        self._pending = []
+        self._flush_handle = None
+        self._loop = None
+        self._server = None
+
+    @PublicAPI
+    def serve_forever(self):
+        """Serves requests on a new event loop in the calling thread."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.address,
+                                 self.port))
+        logger.info("Serving policy requests at {}:{}".format(
+            self.address, self.port))
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    @PublicAPI
+    def shutdown(self):
+        """Stops serve_forever(). Can be called from any thread."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def stats(self):
+        return {
+            "num_requests": self.num_requests,
+            "num_action_batches": self.num_batches,
+            "mean_action_batch_size": (
+                self.num_batched_requests / max(1, self.num_batches)),
+        }
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(
+                    policy_wire.FRAME_HEADER.size)
+                size, = policy_wire.FRAME_HEADER.unpack(header)
+                body = await reader.readexactly(size)
+                self.num_requests += 1
+                self._handle_request(body, writer)
+        except asyncio.IncompleteReadError:
+            pass  # client disconnected
+        except ConnectionError as e:
+            logger.info("Policy client connection lost: {}".format(e))
+        finally:
+            writer.close()
+
+    def _handle_request(self, body, writer):
+        try:
+            request_id, args = policy_wire.decode_request(body)
+        except Exception:
+            logger.exception("Dropping malformed request")
+            return
+        command = args["command"]
+        if command in (policy_wire.GET_ACTION, policy_wire.LOG_ACTION):
+            future = self._loop.create_future()
+            self._enqueue((args, future))
+            asyncio.ensure_future(
+                self._respond_when_done(writer, request_id, command, future))
+            return
+        try:
+            result = self._execute_command(args)
+        except Exception:
+            writer.write(
+                policy_wire.encode_response(
+                    request_id, traceback.format_exc(), error=True))
+        else:
+            writer.write(policy_wire.encode_response(request_id, result))
+
+    def _execute_command(self, args):
+        command = args["command"]
+        if command == policy_wire.START_EPISODE:
+            return self.external_env.start_episode(args["episode_id"],
+                                                   args["training_enabled"])
+        elif command == policy_wire.LOG_RETURNS:
+            self.external_env.log_returns(args["episode_id"], args["reward"],
+                                          args["info"])
+        elif command == policy_wire.END_EPISODE:
+            self.external_env.end_episode(args["episode_id"],
+                                          args["observation"])
+        else:
+            raise Exception("Unknown command: {}".format(command))
+        return None
+
+    async def _respond_when_done(self, writer, request_id, command, future):
+        try:
+            action = await asyncio.wait_for(future, self.action_timeout)
+        except Exception:
+            response = policy_wire.encode_response(
+                request_id, traceback.format_exc(), error=True)
+        else:
+            if command == policy_wire.LOG_ACTION:
+                action = None
+            response = policy_wire.encode_response(request_id, action)
+        if not writer.transport.is_closing():
+            writer.write(response)
+
+    def _enqueue(self, request):
+        self._pending.append(request)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(
+                self.max_wait_s, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        self.num_batches += 1
+        self.num_batched_requests += len(batch)
+        # Hold the condition so the sampler sees the whole batch in one poll
+        with self.external_env._results_avail_condition:
+            for args, future in batch:
+                try:
+                    self.external_env.request_action(
+                        args["episode_id"], args["observation"],
+                        self._make_callback(future), args.get("action"))
+                except Exception as e:
+                    future.set_exception(e)
+
+    def _make_callback(self, future):
+        def callback(action):
+            self._loop.call_soon_threadsafe(_set_result, future, action)
+
+        return callback
+
+
+def _set_result(future, result):
+    # The request may have timed out in the meantime
+    if not future.done():
+        future.set_result(result)
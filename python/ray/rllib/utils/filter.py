@@ -35,6 +35,14 @@ class Filter(object):
     def as_serializable(self):
         raise NotImplementedError
 
+    def as_delta(self):
+        """Returns the state accumulated since the last clear_buffer().
+
+        The result is accepted by apply_changes() of a filter of the same
+        type, and is typically much smaller than a full serializable copy.
+        """
+        return self.as_serializable()
+
 
 class NoFilter(Filter):
     is_concurrent = True
@@ -63,6 +71,9 @@ class NoFilter(Filter):
     def as_serializable(self):
         return self
 
+    def as_delta(self):
+        return self
+
 
 # http://www.johndcook.com/blog/standard_deviation/
 class RunningStat(object):
@@ -94,17 +105,40 @@ class RunningStat(object):
             self._M[...] += delta / self._n
             self._S[...] += delta * delta * n1 / self._n
 
+    def push_batch(self, x):
+        """Pushes a batch of values stacked along the first axis.
+
+        This computes the mean and sum of squared deviations of the batch
+        with numpy and merges them in a single step, which is equivalent to
+        calling push() on each row.
+        """
+        x = np.asarray(x)
+        if x.shape[1:] != self._M.shape:
+            raise ValueError(
+                "Unexpected input shape {}, expected {}, value = {}".format(
+                    x.shape[1:], self._M.shape, x))
+        n2 = x.shape[0]
+        if n2 == 0:
+            return
+        M2 = np.mean(x, axis=0)
+        S2 = np.sum(np.square(x - M2), axis=0)
+        self._merge(n2, M2, S2)
+
     def update(self, other):
+        self._merge(other._n, other._M, other._S)
+
+    def _merge(self, n2, M2, S2):
+        # Parallel variance: https://en.wikipedia.org/wiki/Algorithms_for_
+        # calculating_variance#Parallel_algorithm
         n1 = self._n
-        n2 = other._n
         n = n1 + n2
         if n == 0:
             # Avoid divide by zero, which creates nans
             return
-        delta = self._M - other._M
+        delta = self._M - M2
         delta2 = delta * delta
-        M = (n1 * self._M + n2 * other._M) / n
-        S = self._S + other._S + delta2 * n1 * n2 / n
+        M = (n1 * self._M + n2 * M2) / n
+        S = self._S + S2 + delta2 * n1 * n2 / n
         self._n = n
         self._M = M
         self._S = S
@@ -189,6 +223,10 @@ class MeanStdFilter(Filter):
     def as_serializable(self):
         return self.copy()
 
+    def as_delta(self):
+        """Returns only the buffered statistics of this filter."""
+        return MeanStdFilterDelta(self.buffer.copy())
+
     def sync(self, other):
         """Syncs all fields together from other filter.
 
@@ -218,9 +256,8 @@ class MeanStdFilter(Filter):
         if update:
             if len(x.shape) == len(self.rs.shape) + 1:
                 # The vectorized case.
-                for i in range(x.shape[0]):
-                    self.rs.push(x[i])
-                    self.buffer.push(x[i])
+                self.rs.push_batch(x)
+                self.buffer.push_batch(x)
             else:
                 # The unvectorized case.
                 self.rs.push(x)
@@ -273,6 +310,20 @@ class ConcurrentMeanStdFilter(MeanStdFilter):
             self.buffer)
 
 
+class MeanStdFilterDelta(object):
+    """Statistics accumulated by a MeanStdFilter since its last flush.
+
+    This is what workers ship back for synchronization, since apply_changes()
+    only reads the buffer of the other filter.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __repr__(self):
+        return "MeanStdFilterDelta({})".format(self.buffer)
+
+
 def get_filter(filter_config, shape):
     # TODO(rliaw): move this into filter manager
     if filter_config == "MeanStdFilter":
@@ -4,6 +4,7 @@ from __future__ import print_function
 
 import ray
 from ray.rllib.utils.annotations import DeveloperAPI
+from ray.rllib.utils.filter import MeanStdFilterDelta, NoFilter
 from ray.rllib.utils.memory import ray_get_and_free
 
 
@@ -15,18 +16,29 @@ class FilterManager(object):
 
     @staticmethod
     @DeveloperAPI
-    def synchronize(local_filters, remotes, update_remote=True):
+    def synchronize(local_filters, remotes, update_remote=True, tree=None):
         """Aggregates all filters from remote evaluators.
 
-        Local copy is updated and then broadcasted to all remote evaluators.
+        Remote evaluators only send the deltas accumulated since the last
+        synchronization. The local copy is updated with these and then
+        broadcasted to all remote evaluators.
 
         Args:
             local_filters (dict): Filters to be synchronized.
             remotes (list): Remote evaluators with filters.
             update_remote (bool): Whether to push updates to remote filters.
+            tree (AggregationTree): Optional tree over `remotes` to merge the
+                deltas in. The updated filters are still sent to `remotes`
+                from here, so they are applied before any later calls to
+                the remotes.
         """
-        remote_filters = ray_get_and_free(
-            [r.get_filters.remote(flush_after=True) for r in remotes])
+        if tree is not None:
+            remote_filters = tree.reduce("get_filters", merge_filter_deltas,
+                                         True, True)
+        else:
+            remote_filters = ray_get_and_free(
+                [r.get_filters.remote(flush_after=True, deltas=True)
+                 for r in remotes])
         for rf in remote_filters:
             for k in local_filters:
                 local_filters[k].apply_changes(rf[k], with_buffer=False)
@@ -34,3 +46,32 @@ class FilterManager(object):
             copies = {k: v.as_serializable() for k, v in local_filters.items()}
             remote_copy = ray.put(copies)
             [r.sync_filters.remote(remote_copy) for r in remotes]
+
+
+def merge_filter_deltas(values):
+    """Reduces filter deltas from get_filters() for an AggregationTree.
+
+    Each value is either a dict of filter deltas, or a list of such dicts
+    from an earlier merge. Returns a list with a single dict if all the
+    deltas could be merged, and the list of all the dicts otherwise.
+    """
+
+    filter_dicts = []
+    for v in values:
+        if isinstance(v, dict):
+            filter_dicts.append(v)
+        else:
+            filter_dicts.extend(v)
+    merged = {}
+    for k in filter_dicts[0]:
+        deltas = [f[k] for f in filter_dicts]
+        if all(isinstance(d, MeanStdFilterDelta) for d in deltas):
+            buffer = deltas[0].buffer.copy()
+            for d in deltas[1:]:
+                buffer.update(d.buffer)
+            merged[k] = MeanStdFilterDelta(buffer)
+        elif all(isinstance(d, NoFilter) for d in deltas):
+            merged[k] = deltas[0]
+        else:
+            return filter_dicts
+    return [merged]
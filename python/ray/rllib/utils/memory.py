@@ -27,10 +27,25 @@ def ray_get_and_free(object_ids):
         The result of ray.get(object_ids).
     """
 
+    result = ray.get(object_ids)
+    ray_free(object_ids)
+    return result
+
+
+def ray_free(object_ids):
+    """Queue object ids for deletion.
+
+    Like ray_get_and_free, this batches calls to ray.internal.free. Use this
+    for objects fetched with a plain ray.get once nothing refers to their
+    values anymore, to free them without copying the values out first.
+
+    Args:
+        object_ids (ObjectID|List[ObjectID]): Object ids to free.
+    """
+
     global _last_free_time
     global _to_free
 
-    result = ray.get(object_ids)
     if type(object_ids) is not list:
         object_ids = [object_ids]
     _to_free.extend(object_ids)
@@ -43,8 +58,6 @@ def ray_get_and_free(object_ids):
         _to_free = []
         _last_free_time = now
 
-    return result
-
 
 def aligned_array(size, dtype, align=64):
     """Returns an array of a given size that is 64-byte aligned.
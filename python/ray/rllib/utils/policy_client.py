@@ -4,8 +4,11 @@ from __future__ import print_function
 
 import logging
 import pickle
+import socket
+import threading
 
-from ray.rllib.utils.annotations import PublicAPI
+from ray.rllib.utils import policy_wire
+from ray.rllib.utils.annotations import PublicAPI, override
 
 logger = logging.getLogger(__name__)
 
@@ -126,3 +129,62 @@ class PolicyClient(object):
         response.raise_for_status()
         parsed = pickle.loads(response.content)
         return parsed
+
+
+@PublicAPI
+class BinaryPolicyClient(PolicyClient):
+    """Client for AsyncPolicyServer.
+
+    Requests are sent in the binary format of policy_wire over a single
+    persistent TCP connection, which is opened on first use and re-opened
+    if it breaks. Calls are serialized, so use one client per thread to
+    issue requests concurrently.
+    """
+
+    @PublicAPI
+    def __init__(self, address):
+        """Initialize a BinaryPolicyClient.
+
+        Arguments:
+            address (str): Server address in the form "host:port".
+        """
+        PolicyClient.__init__(self, address)
+        host, port = address.rsplit(":", 1)
+        self._host = host
+        self._port = int(port)
+        self._sock = None
+        self._lock = threading.Lock()
+        self._next_request_id = 0
+
+    def close(self):
+        """Closes the connection to the server."""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    @override(PolicyClient)
+    def _send(self, data):
+        with self._lock:
+            request_id = self._next_request_id
+            self._next_request_id = (request_id + 1) % 2**32
+            frame = policy_wire.encode_request(request_id, data)
+            if self._sock is None:
+                self._sock = socket.create_connection((self._host,
+                                                       self._port))
+                self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY,
+                                      1)
+            try:
+                self._sock.sendall(frame)
+                response_id, value, error = policy_wire.decode_response(
+                    policy_wire.read_frame(self._sock))
+            except (socket.error, EOFError):
+                self._sock.close()
+                self._sock = None
+                raise
+        assert response_id == request_id, (response_id, request_id)
+        if error:
+            logger.error("Request failed {}: {}".format(value, data))
+            raise RuntimeError("Request failed: {}".format(value))
+        field = policy_wire.COMMAND_RESULTS.get(data["command"])
+        return {field: value} if field else {}
@@ -0,0 +1,213 @@
+"""Compact binary wire format used by BinaryPolicyClient/AsyncPolicyServer.
+
+Every message is a frame of a 4 byte big-endian body length followed by the
+body. Request bodies hold the request id (uint32), the command code (uint8)
+and the command's arguments in a fixed order. Response bodies hold the
+request id, a status byte and a single value. Request ids let a connection
+carry several requests at once, with responses returned as they complete.
+
+Values are tagged: numpy arrays and scalars are sent as dtype, shape and raw
+bytes, and basic python types have their own tags. Anything else (e.g. info
+dicts) falls back to pickle.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import pickle
+import struct
+
+import numpy as np
+import six
+
+START_EPISODE = "START_EPISODE"
+GET_ACTION = "GET_ACTION"
+LOG_ACTION = "LOG_ACTION"
+LOG_RETURNS = "LOG_RETURNS"
+END_EPISODE = "END_EPISODE"
+
+# Arguments of each command, in wire order
+COMMAND_ARGS = {
+    START_EPISODE: ("episode_id", "training_enabled"),
+    GET_ACTION: ("episode_id", "observation"),
+    LOG_ACTION: ("episode_id", "observation", "action"),
+    LOG_RETURNS: ("episode_id", "reward", "info"),
+    END_EPISODE: ("episode_id", "observation"),
+}
+
+# Name of the single response field of each command, if any
+COMMAND_RESULTS = {
+    START_EPISODE: "episode_id",
+    GET_ACTION: "action",
+}
+
+_COMMANDS = [START_EPISODE, GET_ACTION, LOG_ACTION, LOG_RETURNS, END_EPISODE]
+_COMMAND_CODES = {c: i for i, c in enumerate(_COMMANDS)}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+FRAME_HEADER = struct.Struct("!I")
+_REQUEST_HEADER = struct.Struct("!IB")
+_RESPONSE_HEADER = struct.Struct("!IB")
+_LEN = struct.Struct("!I")
+_BYTE = struct.Struct("!B")
+_INT = struct.Struct("!q")
+_FLOAT = struct.Struct("!d")
+
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT_TAG = b"i"
+_FLOAT_TAG = b"f"
+_STR = b"s"
+_ARRAY = b"a"
+_SCALAR = b"g"
+_PICKLE = b"p"
+
+
+def encode_request(request_id, data):
+    """Returns the frame for a request given as a PolicyClient command dict.
+
+    Arguments:
+        request_id (int): Id to match the response to the request.
+        data (dict): Command dict with the "command" key and the arguments
+            listed in COMMAND_ARGS.
+    """
+    command = data["command"]
+    if command not in _COMMAND_CODES:
+        raise ValueError("Unknown command: {}".format(command))
+    out = [_REQUEST_HEADER.pack(request_id, _COMMAND_CODES[command])]
+    for arg in COMMAND_ARGS[command]:
+        _encode_value(data.get(arg), out)
+    return _frame(out)
+
+
+def decode_request(body):
+    """Returns (request_id, command dict) given a request frame body."""
+    request_id, code = _REQUEST_HEADER.unpack_from(body, 0)
+    if code >= len(_COMMANDS):
+        raise ValueError("Unknown command code: {}".format(code))
+    command = _COMMANDS[code]
+    data = {"command": command}
+    offset = _REQUEST_HEADER.size
+    for arg in COMMAND_ARGS[command]:
+        data[arg], offset = _decode_value(body, offset)
+    return request_id, data
+
+
+def encode_response(request_id, value, error=False):
+    """Returns the frame for a response.
+
+    Arguments:
+        request_id (int): Id of the request this responds to.
+        value (obj): Result of the command, or the error message if `error`.
+        error (bool): Whether the command failed.
+    """
+    out = [
+        _RESPONSE_HEADER.pack(request_id,
+                              STATUS_ERROR if error else STATUS_OK)
+    ]
+    _encode_value(value, out)
+    return _frame(out)
+
+
+def decode_response(body):
+    """Returns (request_id, value, error) given a response frame body."""
+    request_id, status = _RESPONSE_HEADER.unpack_from(body, 0)
+    value, _ = _decode_value(body, _RESPONSE_HEADER.size)
+    return request_id, value, status == STATUS_ERROR
+
+
+def read_frame(sock):
+    """Reads the body of the next frame from a blocking socket."""
+    size, = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    return _recv_exactly(sock, size)
+
+
+def _frame(out):
+    body = b"".join(out)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def _recv_exactly(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        n = sock.recv_into(view[pos:], size - pos)
+        if n == 0:
+            raise EOFError("Connection closed by peer")
+        pos += n
+    return bytes(buf)
+
+
+def _encode_value(value, out):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, six.integer_types) and -2**63 <= value < 2**63:
+        out.append(_INT_TAG + _INT.pack(value))
+    elif isinstance(value, float):
+        out.append(_FLOAT_TAG + _FLOAT.pack(value))
+    elif isinstance(value, six.text_type):
+        data = value.encode("utf-8")
+        out.append(_STR + _LEN.pack(len(data)))
+        out.append(data)
+    elif isinstance(value, (np.ndarray, np.generic)) and \
+            value.dtype.kind in "biufc":
+        arr = np.asarray(value)
+        dtype = arr.dtype.str.encode("ascii")
+        tag = _ARRAY if isinstance(value, np.ndarray) else _SCALAR
+        out.append(tag + _BYTE.pack(len(dtype)) + dtype +
+                   _BYTE.pack(arr.ndim) +
+                   struct.pack("!{}I".format(arr.ndim), *arr.shape))
+        out.append(arr.tobytes())  # always in C order
+    else:
+        data = pickle.dumps(value, protocol=2)
+        out.append(_PICKLE + _LEN.pack(len(data)))
+        out.append(data)
+
+
+def _decode_value(body, offset):
+    tag = body[offset:offset + 1]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    elif tag == _TRUE:
+        return True, offset
+    elif tag == _FALSE:
+        return False, offset
+    elif tag == _INT_TAG:
+        return _INT.unpack_from(body, offset)[0], offset + _INT.size
+    elif tag == _FLOAT_TAG:
+        return _FLOAT.unpack_from(body, offset)[0], offset + _FLOAT.size
+    elif tag == _STR or tag == _PICKLE:
+        size, = _LEN.unpack_from(body, offset)
+        offset += _LEN.size
+        data = body[offset:offset + size]
+        if tag == _STR:
+            return data.decode("utf-8"), offset + size
+        return pickle.loads(data), offset + size
+    elif tag == _ARRAY or tag == _SCALAR:
+        dtype_len, = _BYTE.unpack_from(body, offset)
+        offset += 1
+        dtype = np.dtype(body[offset:offset + dtype_len].decode("ascii"))
+        offset += dtype_len
+        ndim, = _BYTE.unpack_from(body, offset)
+        offset += 1
+        shape = struct.unpack_from("!{}I".format(ndim), body, offset)
+        offset += 4 * ndim
+        count = int(np.prod(shape))
+        arr = np.frombuffer(
+            body, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * dtype.itemsize
+        if tag == _SCALAR:
+            return arr[()], offset
+        # Copy out so the result is writable and doesn't pin the frame
+        return arr.copy(), offset
+    raise ValueError("Unknown value tag: {}".format(tag))
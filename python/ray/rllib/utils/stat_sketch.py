@@ -0,0 +1,104 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+# Values closer to zero than this are counted as zero
+_MIN_MAGNITUDE = 1e-12
+
+
+class StatSketch(object):
+    """Mergeable summary of a stream of numbers.
+
+    The count, sum, min and max are tracked exactly. Quantiles are estimated
+    from log-spaced buckets as in DDSketch, so the estimate of any quantile
+    is within `relative_accuracy` of a value at that rank. Sketches with the
+    same accuracy can be merged without losing precision.
+
+    NaN values are counted and make the mean NaN, like np.mean, but are left
+    out of the min, max and quantiles.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.count = 0
+        self.total = 0.0
+        self.num_nan = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._num_zero = 0
+        self._positive = {}
+        self._negative = {}
+
+    def add(self, value):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        if math.isnan(value):
+            self.num_nan += 1
+            return
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value > _MIN_MAGNITUDE:
+            key = self._key(value)
+            self._positive[key] = self._positive.get(key, 0) + 1
+        elif value < -_MIN_MAGNITUDE:
+            key = self._key(-value)
+            self._negative[key] = self._negative.get(key, 0) + 1
+        else:
+            self._num_zero += 1
+
+    def merge(self, other):
+        assert other.relative_accuracy == self.relative_accuracy, \
+            (other.relative_accuracy, self.relative_accuracy)
+        self.count += other.count
+        self.total += other.total
+        self.num_nan += other.num_nan
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._num_zero += other._num_zero
+        for key, n in other._positive.items():
+            self._positive[key] = self._positive.get(key, 0) + n
+        for key, n in other._negative.items():
+            self._negative[key] = self._negative.get(key, 0) + n
+
+    def mean(self):
+        if not self.count:
+            return float("nan")
+        return self.total / self.count
+
+    def quantile(self, q):
+        """Returns the estimated q-quantile, for q in [0, 1]."""
+        num_values = self.count - self.num_nan
+        if not num_values:
+            return float("nan")
+        rank = q * (num_values - 1)
+        seen = 0
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return self._clip(-self._value(key))
+        seen += self._num_zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._clip(self._value(key))
+        return self.max
+
+    def _key(self, magnitude):
+        if math.isinf(magnitude):
+            return magnitude
+        return int(math.ceil(math.log(magnitude) / self._log_gamma))
+
+    def _value(self, key):
+        if math.isinf(key):
+            return key
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def _clip(self, value):
+        return min(max(value, self.min), self.max)
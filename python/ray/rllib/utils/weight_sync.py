@@ -0,0 +1,274 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import uuid
+
+import numpy as np
+
+import ray
+from ray.rllib.utils.annotations import DeveloperAPI
+
+# Supported encodings for weight broadcasts:
+#   "full": send all weights as is
+#   "fp16": send floating point arrays as float16 (lossy)
+#   "delta": send only the array elements that changed since the version the
+#       receiver already holds, falling back to full arrays if most changed
+ENCODINGS = ["full", "fp16", "delta"]
+
+
+@DeveloperAPI
+class VersionedWeights(object):
+    """Encoded weights tagged with a monotonically increasing version.
+
+    Attributes:
+        version (int): Version of the weights.
+        encoding (str): One of ENCODINGS.
+        base_version (int): For delta encoded weights, the version the delta
+            was computed against, or None if the weights are self-contained.
+        payload (object): Encoded weights.
+        source (str): Id of the WeightSyncer that produced the weights.
+            Versions are only comparable between weights of the same source.
+    """
+
+    def __init__(self,
+                 version,
+                 encoding,
+                 payload,
+                 base_version=None,
+                 source=None):
+        self.version = version
+        self.encoding = encoding
+        self.payload = payload
+        self.base_version = base_version
+        self.source = source
+
+    def decode(self, base_weights=None):
+        """Returns the decoded weights.
+
+        Arguments:
+            base_weights (object): Decoded weights of `base_version`. Only
+                required for delta encoded weights with a base version.
+        """
+        if self.base_version is not None and base_weights is None:
+            raise ValueError(
+                "Base weights of version {} are needed to decode weights of "
+                "version {}".format(self.base_version, self.version))
+        return _decode(self.payload, base_weights)
+
+
+class _EncodedArray(object):
+    """Encoded form of a single numpy array."""
+
+    def __init__(self, kind, data, dtype=None):
+        self.kind = kind
+        self.data = data
+        self.dtype = dtype
+
+
+@DeveloperAPI
+class WeightSyncer(object):
+    """Broadcasts versioned weights to a set of remote actors.
+
+    The syncer tracks the version each remote actor was last sent, so actors
+    that are already up to date are skipped, and each version is serialized
+    at most once per encoding base. Remote actors must accept
+    VersionedWeights in `set_weights()`, e.g. by using a WeightsReceiver.
+
+    Examples:
+        >>> syncer = WeightSyncer(encoding="delta")
+        >>> syncer.set_weights(local_worker.get_weights())
+        >>> for w in remote_workers:
+        ...     syncer.sync(w)
+    """
+
+    @DeveloperAPI
+    def __init__(self, encoding="full", num_base_versions=2):
+        """Initialize a WeightSyncer.
+
+        Arguments:
+            encoding (str): One of ENCODINGS.
+            num_base_versions (int): For delta encoding, how many previous
+                versions to keep around as bases for deltas. Actors holding
+                older versions are sent full weights.
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError("Unknown weight sync encoding {}, must be one "
+                             "of {}".format(encoding, ENCODINGS))
+        self.encoding = encoding
+        self.num_base_versions = num_base_versions
+        self.source = uuid.uuid4().hex
+        self.version = 0
+        self.num_syncs = 0
+        self.num_syncs_skipped = 0
+        self._weights = None
+        self._bases = collections.OrderedDict()
+        self._encoded = {}
+        self._remote_versions = {}
+
+    @DeveloperAPI
+    def set_weights(self, weights, version=None):
+        """Sets the weights to broadcast from now on.
+
+        The weights must not be modified in place after this call.
+
+        Arguments:
+            weights (object): New weights, e.g. from get_weights().
+            version (int): Optional explicit version for the weights, e.g.
+                when relaying weights received from elsewhere. Defaults to
+                the last version plus one.
+        """
+        if version is None:
+            version = self.version + 1
+        assert version > self.version, (version, self.version)
+        self.version = version
+        self._weights = weights
+        self._encoded = {}
+        if self.encoding == "delta":
+            self._bases[version] = weights
+            while len(self._bases) > self.num_base_versions:
+                self._bases.popitem(last=False)
+
+    @DeveloperAPI
+    def sync(self, remote):
+        """Sends the current weights to the remote actor if needed.
+
+        Returns:
+            bool: whether a weight update was sent.
+        """
+        assert self._weights is not None, "Must call set_weights() first."
+        remote_version = self._remote_versions.get(remote)
+        if remote_version == self.version:
+            self.num_syncs_skipped += 1
+            return False
+        if remote_version not in self._bases:
+            remote_version = None
+        if remote_version not in self._encoded:
+            self._encoded[remote_version] = ray.put(
+                self.encode(remote_version))
+        remote.set_weights.remote(self._encoded[remote_version])
+        self._remote_versions[remote] = self.version
+        self.num_syncs += 1
+        return True
+
+    @DeveloperAPI
+    def encode(self, base_version=None):
+        """Returns the current weights as VersionedWeights.
+
+        Arguments:
+            base_version (int): For delta encoding, the version to compute
+                the delta against. Must be one of the retained versions.
+        """
+        base = None
+        if base_version is not None:
+            assert self.encoding == "delta", self.encoding
+            base = self._bases[base_version]
+        return VersionedWeights(self.version, self.encoding,
+                                _encode(self._weights, base, self.encoding),
+                                base_version, self.source)
+
+    @DeveloperAPI
+    def reset(self):
+        """Forgets the versions held by remote actors."""
+        self._remote_versions = {}
+
+    @DeveloperAPI
+    def stats(self):
+        return {
+            "weights_version": self.version,
+            "num_weight_syncs": self.num_syncs,
+            "num_weight_syncs_skipped": self.num_syncs_skipped,
+        }
+
+
+@DeveloperAPI
+class WeightsReceiver(object):
+    """Tracks the weights version held by an actor and decodes updates."""
+
+    @DeveloperAPI
+    def __init__(self):
+        self.version = None
+        self.source = None
+        self._base = None
+
+    @DeveloperAPI
+    def receive(self, update):
+        """Decodes the given VersionedWeights.
+
+        Returns:
+            object: the decoded weights, or None if the update is stale or a
+                duplicate of the version already held.
+        """
+        same_source = update.source == self.source
+        if same_source and self.version is not None and \
+                update.version <= self.version:
+            return None
+        if update.base_version is not None and \
+                (not same_source or update.base_version != self.version):
+            raise ValueError(
+                "Got weights of version {} encoded against version {}, but "
+                "the weights held are version {}".format(
+                    update.version, update.base_version, self.version))
+        weights = update.decode(self._base)
+        self.version = update.version
+        self.source = update.source
+        # Only keep a copy around if deltas may be computed against it
+        self._base = weights if update.encoding == "delta" else None
+        return weights
+
+
+def _encode(weights, base, encoding):
+    if isinstance(weights, dict):
+        return {
+            k: _encode(v, base.get(k) if isinstance(base, dict) else None,
+                       encoding)
+            for k, v in weights.items()
+        }
+    if type(weights) in (list, tuple):
+        if type(base) not in (list, tuple) or len(base) != len(weights):
+            base = [None] * len(weights)
+        return type(weights)(
+            _encode(w, b, encoding) for w, b in zip(weights, base))
+    if not isinstance(weights, np.ndarray):
+        return weights
+    if encoding == "fp16":
+        if weights.dtype.kind == "f" and weights.dtype.itemsize > 2:
+            return _EncodedArray("fp16", weights.astype(np.float16),
+                                 weights.dtype)
+    elif encoding == "delta":
+        if isinstance(base, np.ndarray) and base.shape == weights.shape \
+                and base.dtype == weights.dtype:
+            changed = np.flatnonzero(weights != base)
+            if len(changed) == 0:
+                return _EncodedArray("same", None)
+            sparse_bytes = len(changed) * (
+                changed.itemsize + weights.itemsize)
+            if sparse_bytes < weights.nbytes:
+                return _EncodedArray("sparse",
+                                     (changed, weights.ravel()[changed]))
+    return weights
+
+
+def _decode(payload, base):
+    if isinstance(payload, dict):
+        return {
+            k: _decode(v, base.get(k) if isinstance(base, dict) else None)
+            for k, v in payload.items()
+        }
+    if type(payload) in (list, tuple):
+        if type(base) not in (list, tuple) or len(base) != len(payload):
+            base = [None] * len(payload)
+        return type(payload)(_decode(p, b) for p, b in zip(payload, base))
+    if not isinstance(payload, _EncodedArray):
+        return payload
+    if payload.kind == "fp16":
+        return payload.data.astype(payload.dtype)
+    elif payload.kind == "same":
+        return base
+    elif payload.kind == "sparse":
+        idx, values = payload.data
+        weights = base.copy()
+        weights.ravel()[idx] = values
+        return weights
+    raise ValueError("Unknown encoded array kind {}".format(payload.kind))
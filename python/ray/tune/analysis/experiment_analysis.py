@@ -4,17 +4,24 @@ from __future__ import print_function
 
 import copy
 import glob
-import json
+import io
 import logging
 import os
 import pandas as pd
+import pickle
+from multiprocessing.pool import ThreadPool
 
 from ray.tune.error import TuneError
+from ray.tune.trial_runner import load_experiment_state
 from ray.tune.util import flatten_dict
 
 logger = logging.getLogger(__name__)
 
 UNNEST_KEYS = ("config", "last_result")
+# File in the experiment dir that caches the progress of all trials
+PROGRESS_CACHE_FILE = ".progress_cache.pkl"
+PROGRESS_CACHE_VERSION = 1
+DEFAULT_NUM_WORKERS = 8
 
 
 def unnest_checkpoints(checkpoints):
@@ -34,6 +41,59 @@ def unnest_checkpoints(checkpoints):
     return checkpoint_dicts
 
 
+def _file_stamp(path):
+    """Returns what invalidates the cached contents of path, or None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def _last_line(f, start):
+    """Returns the last non-empty line of f at or after offset start."""
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    data = b""
+    while pos > start:
+        step = min(4096, pos - start)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+        if b"\n" in data.rstrip(b"\r\n"):
+            break
+    return data.rstrip(b"\r\n").split(b"\n")[-1]
+
+
+def _read_progress(path, columns=None, last_row_only=False):
+    """Reads a progress.csv file, or returns None if it has no data.
+
+    The file is empty until the trial reports its first result.
+
+    Args:
+        path (str): Path of the file.
+        columns (list|None): Columns to read. Defaults to all.
+        last_row_only (bool): Whether to read only the last row, which
+            seeks to the end of the file instead of parsing all of it.
+    """
+    usecols = None
+    if columns is not None:
+        usecols = lambda column: column in columns  # noqa: E731
+    try:
+        if not last_row_only:
+            return pd.read_csv(path, usecols=usecols)
+        with open(path, "rb") as f:
+            header = f.readline()
+            last = _last_line(f, f.tell())
+        if last:
+            last += b"\n"
+        return pd.read_csv(io.BytesIO(header + last), usecols=usecols)
+    except (IOError, ValueError):
+        # EmptyDataError and ParserError are ValueErrors
+        logger.debug("Skipping unreadable progress file {}".format(path))
+        return None
+
+
 class ExperimentAnalysis(object):
     """Analyze results from a Tune experiment.
 
@@ -41,19 +101,29 @@ class ExperimentAnalysis(object):
         experiment_path (str): Path to where experiment is located.
             Corresponds to Experiment.local_dir/Experiment.name
 
+    The progress.csv files of the trials are read in parallel and cached
+    together in one DataFrame in the experiment dir. The cache is updated
+    for the trials whose files changed since.
+
     Example:
         >>> tune.run(my_trainable, name="my_exp", local_dir="~/tune_results")
         >>> analysis = ExperimentAnalysis(
         >>>     experiment_path="~/tune_results/my_exp")
+        >>> analysis.progress_dataframe(
+        >>>     columns=["episode_reward_mean"], last_row_only=True)
     """
 
-    def __init__(self, experiment_path, trials=None):
+    def __init__(self,
+                 experiment_path,
+                 trials=None,
+                 num_workers=DEFAULT_NUM_WORKERS):
         """Initializer.
 
         Args:
             experiment_path (str): Path to where experiment is located.
             trials (list|None): List of trials that can be accessed via
                 `analysis.trials`.
+            num_workers (int): Number of threads reading progress files.
         """
         experiment_path = os.path.expanduser(experiment_path)
         if not os.path.isdir(experiment_path):
@@ -66,23 +136,142 @@ class ExperimentAnalysis(object):
                 "No experiment state found in {}!".format(experiment_path))
         experiment_filename = max(
             list(experiment_state_paths))  # if more than one, pick latest
-        with open(os.path.join(experiment_path, experiment_filename)) as f:
-            self._experiment_state = json.load(f)
+        self._experiment_state = load_experiment_state(
+            os.path.join(experiment_path, experiment_filename))
 
         if "checkpoints" not in self._experiment_state:
             raise TuneError("Experiment state invalid; no checkpoints found.")
         self._checkpoints = self._experiment_state["checkpoints"]
-        self._scrubbed_checkpoints = unnest_checkpoints(self._checkpoints)
+        self._scrubbed_checkpoints = None
         self.trials = trials
         self._dataframe = None
+        self._experiment_path = experiment_path
+        self._num_workers = num_workers
+        self._progress_cache = None
 
-    def get_all_trial_dataframes(self):
-        trial_dfs = {}
-        for checkpoint in self._checkpoints:
-            logdir = checkpoint["logdir"]
-            progress = max(glob.glob(os.path.join(logdir, "progress.csv")))
-            trial_dfs[checkpoint["trial_id"]] = pd.read_csv(progress)
-        return trial_dfs
+    def get_all_trial_dataframes(self, columns=None, last_row_only=False):
+        """Returns a mapping of trial id to the trial's progress DataFrame.
+
+        Args:
+            columns (list|None): Columns to return. Defaults to all.
+            last_row_only (bool): Whether to return only the last row of
+                each trial.
+        """
+        df = self.progress_dataframe(columns, last_row_only)
+        return {
+            trial_id: trial_df.reset_index(drop=True)
+            for trial_id, trial_df in df.groupby("trial_id", sort=False)
+        }
+
+    def progress_dataframe(self,
+                           columns=None,
+                           last_row_only=False,
+                           use_cache=True):
+        """Returns the progress of all trials as one pandas.DataFrame.
+
+        The rows of each trial are in order, and are identified by the
+        `trial_id` column.
+
+        Args:
+            columns (list|None): Columns to return besides `trial_id`.
+                Defaults to all.
+            last_row_only (bool): Whether to return only the last row of
+                each trial.
+            use_cache (bool): Whether to read from and update the cache in
+                the experiment dir. Otherwise, only the requested columns and
+                rows are read from the progress files.
+        """
+        if use_cache:
+            df = self._load_progress()
+            if last_row_only:
+                df = df.groupby("trial_id", sort=False).tail(1)
+            if columns is not None:
+                df = df[["trial_id"] + [
+                    c for c in columns if c in df.columns and c != "trial_id"
+                ]]
+            return df.reset_index(drop=True)
+        paths = self._progress_paths()
+        trial_ids = [t for t in paths if _file_stamp(paths[t]) is not None]
+        frames = self._read_all(
+            [paths[t] for t in trial_ids], columns, last_row_only)
+        return self._concat(trial_ids, frames)
+
+    def _progress_paths(self):
+        # Trials that were never started have no logdir
+        return {
+            checkpoint["trial_id"]: os.path.join(checkpoint["logdir"],
+                                                 "progress.csv")
+            for checkpoint in self._checkpoints if checkpoint.get("logdir")
+        }
+
+    def _read_all(self, paths, columns=None, last_row_only=False):
+        if len(paths) <= 1:
+            return [_read_progress(p, columns, last_row_only) for p in paths]
+        pool = ThreadPool(min(self._num_workers, len(paths)))
+        try:
+            return pool.map(
+                lambda p: _read_progress(p, columns, last_row_only), paths)
+        finally:
+            pool.close()
+
+    def _concat(self, trial_ids, frames):
+        # Unreadable progress files are skipped
+        read = [(t, f) for t, f in zip(trial_ids, frames) if f is not None]
+        for trial_id, frame in read:
+            if "trial_id" in frame.columns:
+                frame["trial_id"] = trial_id
+            else:
+                frame.insert(0, "trial_id", trial_id)
+        if not read:
+            return pd.DataFrame(columns=["trial_id"])
+        return pd.concat([f for _, f in read], ignore_index=True, sort=False)
+
+    def _load_progress(self):
+        """Returns all progress rows, updating the cache if needed."""
+        cache_path = os.path.join(self._experiment_path, PROGRESS_CACHE_FILE)
+        if self._progress_cache is None:
+            self._progress_cache = {"stamps": {}, "data": None}
+            try:
+                with open(cache_path, "rb") as f:
+                    cache = pickle.load(f)
+                if cache.get("version") == PROGRESS_CACHE_VERSION:
+                    self._progress_cache = cache
+            except Exception:
+                logger.debug("No usable progress cache in {}".format(
+                    self._experiment_path))
+        cache = self._progress_cache
+        paths = self._progress_paths()
+        stamps = {}
+        for trial_id, path in paths.items():
+            stamp = _file_stamp(path)
+            if stamp is not None:
+                stamps[trial_id] = (path, ) + stamp
+        if cache["data"] is not None and stamps == cache["stamps"]:
+            return cache["data"]
+
+        stale = [t for t in stamps if cache["stamps"].get(t) != stamps[t]]
+        kept = []
+        if cache["data"] is not None:
+            is_kept = cache["data"]["trial_id"].isin(
+                [t for t in stamps if t not in stale])
+            kept.append(cache["data"][is_kept])
+        frames = self._read_all([stamps[t][0] for t in stale])
+        data = self._concat(stale, frames)
+        if kept:
+            data = pd.concat(kept + [data], ignore_index=True, sort=False)
+        self._progress_cache = {
+            "version": PROGRESS_CACHE_VERSION,
+            "stamps": stamps,
+            "data": data,
+        }
+        tmp_path = cache_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self._progress_cache, f, protocol=2)
+            os.rename(tmp_path, cache_path)
+        except Exception:
+            logger.exception("Failed to write progress cache.")
+        return data
 
     def dataframe(self, refresh=False):
         """Returns a pandas.DataFrame object constructed from the trials.
@@ -92,9 +281,14 @@ class ExperimentAnalysis(object):
 
         """
         if self._dataframe is None or refresh:
-            self._dataframe = pd.DataFrame(self._scrubbed_checkpoints)
+            self._dataframe = pd.DataFrame(self._get_scrubbed_checkpoints())
         return self._dataframe
 
+    def _get_scrubbed_checkpoints(self):
+        if self._scrubbed_checkpoints is None:
+            self._scrubbed_checkpoints = unnest_checkpoints(self._checkpoints)
+        return self._scrubbed_checkpoints
+
     def stats(self):
         """Returns a dictionary of the statistics of the experiment."""
         return self._experiment_state.get("stats")
@@ -125,20 +319,60 @@ class ExperimentAnalysis(object):
     def get_best_config(self, metric, mode="max"):
         """Retrieve the best config from the best trial.
 
+        Trials are compared by the last row of their progress, if it has
+        the metric.
+
         Args:
             metric (str): Key for trial info to order on.
             mode (str): One of [min, max].
 
         """
+        checkpoint = self._best_checkpoint(metric, mode)
+        if checkpoint is not None:
+            return checkpoint["config"]
         return self.get_best_info(metric, flatten=False, mode=mode)["config"]
 
     def get_best_logdir(self, metric, mode="max"):
+        """Retrieve the logdir of the best trial.
+
+        Args:
+            metric (str): Key for trial info to order on.
+            mode (str): One of [min, max].
+
+        """
+        checkpoint = self._best_checkpoint(metric, mode)
+        if checkpoint is not None:
+            return checkpoint["logdir"]
         df = self.dataframe()
         if mode == "max":
             return df.iloc[df[metric].idxmax()].logdir
         elif mode == "min":
             return df.iloc[df[metric].idxmin()].logdir
 
+    def _best_checkpoint(self, metric, mode):
+        """Returns the checkpoint of the best trial, or None if no trial has
+        reported the metric.
+
+        Trials are compared by their last progress row, or by their
+        `last_result` if their progress file has no rows.
+        """
+        df = self.progress_dataframe(columns=[metric], last_row_only=True)
+        values = {}
+        if metric in df.columns:
+            values = dict(
+                zip(df["trial_id"], pd.to_numeric(
+                    df[metric], errors="coerce")))
+        checkpoints = {c["trial_id"]: c for c in self._checkpoints}
+        for trial_id, checkpoint in checkpoints.items():
+            if trial_id not in values:
+                values[trial_id] = (checkpoint.get("last_result")
+                                    or {}).get(metric)
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna()
+        if values.empty:
+            return None
+        best = values.idxmax() if mode == "max" else values.idxmin()
+        return checkpoints.get(best)
+
     def get_best_info(self, metric, mode="max", flatten=True):
         """Retrieve the best trial based on the experiment metric.
 
@@ -151,6 +385,7 @@ class ExperimentAnalysis(object):
         optimize_op = max if mode == "max" else min
         if flatten:
             return optimize_op(
-                self._scrubbed_checkpoints, key=lambda d: d.get(metric, 0))
+                self._get_scrubbed_checkpoints(),
+                key=lambda d: d.get(metric, 0))
         return optimize_op(
             self._checkpoints, key=lambda d: d["last_result"].get(metric, 0))
@@ -2,13 +2,16 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import distutils.spawn
 import logging
 import os
 import subprocess
 import tempfile
+import threading
 import time
 import types
+from multiprocessing.pool import ThreadPool
 
 try:  # py3
     from shlex import quote
@@ -27,6 +30,11 @@ _log_sync_warned = False
 # Map from (logdir, remote_dir) -> syncer
 _syncers = {}
 
+# Seconds between periodic syncs of each logdir
+SYNC_PERIOD_S = 300
+# Max number of sync commands running at once
+MAX_CONCURRENT_SYNCS = 8
+
 S3_PREFIX = "s3://"
 GCS_PREFIX = "gs://"
 ALLOWED_REMOTE_PREFIXES = (S3_PREFIX, GCS_PREFIX)
@@ -63,8 +71,15 @@ def get_syncer(local_dir, remote_dir=None, sync_function=None):
 
 
 def wait_for_log_sync():
-    for syncer in _syncers.values():
-        syncer.wait()
+    if _sync_manager is not None and _sync_manager.pid == os.getpid():
+        _sync_manager.wait()
+
+
+def sync_debug_string():
+    """Returns the progress of log syncing, or "" if nothing was synced."""
+    if _sync_manager is None or _sync_manager.pid != os.getpid():
+        return ""
+    return _sync_manager.debug_string()
 
 
 def validate_sync_function(sync_function):
@@ -81,11 +96,198 @@ def validate_sync_function(sync_function):
             sync_function))
 
 
+def _common_dir(paths):
+    prefix = os.path.commonprefix([os.path.join(p, "") for p in paths])
+    return os.path.dirname(prefix)
+
+
+def _dir_stamp(path, exclude=()):
+    """Returns what changes when the files under path change, or None."""
+    if not os.path.isdir(path):
+        return None
+    num_files, total_size, max_mtime = 0, 0, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name in exclude:
+                continue
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            num_files += 1
+            total_size += stat.st_size
+            max_mtime = max(max_mtime, stat.st_mtime)
+    return num_files, total_size, max_mtime
+
+
+class _SyncManager(threading.Thread):
+    """Runs the syncs requested by all _LogSyncers of the process.
+
+    Pending syncs from the same worker node are batched into one rsync with
+    a file list, and at most one batch per node runs at a time, so that
+    syncs requested while a batch runs are batched together next. Uploads
+    to the remote dir run separately, and are skipped if the local dir did
+    not change since its last upload. At most `max_concurrent` commands run
+    at once.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_SYNCS):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.pid = os.getpid()
+        self._cond = threading.Condition()
+        self._pending = collections.OrderedDict()  # syncer -> request time
+        self._running = set()
+        self._running_ips = set()
+        self._pool = ThreadPool(max_concurrent)
+        self._logfile = None
+        self._num_synced = 0
+        self._num_batches = 0
+        self._num_skipped = 0
+        self._last_lag = 0
+
+    def request(self, syncer):
+        """Queues a sync of syncer, unless one is already pending."""
+        with self._cond:
+            if syncer not in self._pending:
+                self._pending[syncer] = time.time()
+                self._cond.notify_all()
+
+    def wait(self, syncer=None):
+        """Waits until the syncs of syncer, or of all syncers, are done."""
+        with self._cond:
+            while self._is_busy(syncer):
+                self._cond.wait()
+
+    def _is_busy(self, syncer):
+        if syncer is None:
+            return bool(self._pending or self._running)
+        return syncer in self._pending or syncer in self._running
+
+    def debug_string(self):
+        with self._cond:
+            if not (self._num_synced or self._is_busy(None)):
+                return ""
+            lag = max([self._last_lag] + [
+                time.time() - requested
+                for requested in self._pending.values()
+            ])
+            return ("Log sync: {} pending, {} running, {} synced in {} "
+                    "batched rsyncs, {} unchanged uploads skipped, lag {:.1f}s"
+                    "".format(
+                        len(self._pending), len(self._running),
+                        self._num_synced, self._num_batches,
+                        self._num_skipped, lag))
+
+    def run(self):
+        while True:
+            with self._cond:
+                batches = self._take_batches()
+                while not batches:
+                    self._cond.wait()
+                    batches = self._take_batches()
+            for worker_ip, batch in batches.items():
+                self._pool.apply_async(self._sync_batch, (worker_ip, batch))
+
+    def _take_batches(self):
+        """Moves the pending syncers of idle nodes to running."""
+        batches = collections.OrderedDict()
+        for syncer, requested in list(self._pending.items()):
+            if (syncer in self._running
+                    or syncer.worker_ip in self._running_ips):
+                continue
+            del self._pending[syncer]
+            self._running.add(syncer)
+            batches.setdefault(syncer.worker_ip, []).append(
+                (syncer, requested))
+        self._running_ips.update(batches)
+        return batches
+
+    def _sync_batch(self, worker_ip, batch):
+        try:
+            syncers = [syncer for syncer, _ in batch]
+            if worker_ip != syncers[0].local_ip:
+                self._rsync_from_worker(worker_ip, syncers)
+        except Exception:
+            logger.exception("Log sync from {} failed.".format(worker_ip))
+        finally:
+            with self._cond:
+                self._running_ips.discard(worker_ip)
+                self._cond.notify_all()
+        for syncer, requested in batch:
+            if syncer.remote_dir:
+                self._pool.apply_async(self._upload, (syncer, requested))
+            else:
+                self._finish(syncer, requested)
+
+    def _rsync_from_worker(self, worker_ip, syncers):
+        ssh_opts = syncers[0].get_ssh_opts()
+        if ssh_opts is None:
+            return
+        local_dirs = [syncer.local_dir for syncer in syncers]
+        root = _common_dir(local_dirs)
+        with tempfile.NamedTemporaryFile(
+                "w", prefix="log_sync", suffix=".files") as files:
+            for local_dir in local_dirs:
+                files.write(os.path.relpath(local_dir, root) + "\n")
+            files.flush()
+            source = "{}@{}:{}/".format(get_ssh_user(), worker_ip, root)
+            target = "{}/".format(root)
+            final_cmd = "rsync -savzr --files-from={} {} {} {}".format(
+                quote(files.name), ssh_opts, quote(source), quote(target))
+            logger.debug("Running log sync: {}".format(final_cmd))
+            if self._logfile is None:
+                self._logfile = tempfile.NamedTemporaryFile(
+                    prefix="log_sync", suffix=".log", delete=False)
+            returncode = subprocess.Popen(
+                final_cmd, shell=True, stdout=self._logfile).wait()
+        with self._cond:
+            self._num_batches += 1
+        if returncode:
+            logger.warning("Log sync of {} logdirs from {} exited with {}, "
+                           "see {}".format(
+                               len(syncers), worker_ip, returncode,
+                               self._logfile.name))
+
+    def _upload(self, syncer, requested):
+        try:
+            if not syncer.upload_if_changed():
+                with self._cond:
+                    self._num_skipped += 1
+        except Exception:
+            logger.exception("Log sync to {} failed.".format(
+                syncer.remote_dir))
+        finally:
+            self._finish(syncer, requested)
+
+    def _finish(self, syncer, requested):
+        with self._cond:
+            self._running.discard(syncer)
+            self._num_synced += 1
+            self._last_lag = time.time() - requested
+            self._cond.notify_all()
+
+
+_sync_manager = None
+_sync_manager_lock = threading.Lock()
+
+
+def _get_sync_manager():
+    """Returns the sync manager of this process."""
+    global _sync_manager
+    with _sync_manager_lock:
+        if _sync_manager is None or _sync_manager.pid != os.getpid():
+            _sync_manager = _SyncManager()
+            _sync_manager.start()
+        return _sync_manager
+
+
 class _LogSyncer(object):
     """Log syncer for tune.
 
     This syncs files from workers to the local node, and optionally also from
-    the local node to a remote directory (e.g. S3).
+    the local node to a remote directory (e.g. S3). Syncs run in the
+    background, batched with the syncs of other logdirs by _SyncManager.
 
     Arguments:
         logdir (str): Directory to sync from.
@@ -111,13 +313,14 @@ class _LogSyncer(object):
         elif isinstance(sync_function, str):
             self.sync_cmd_tmpl = sync_function
         self.last_sync_time = 0
-        self.sync_process = None
+        self._upload_stamp = None
         self.local_ip = ray.services.get_node_ip_address()
         self.worker_ip = None
         logger.debug("Created LogSyncer for {} -> {}".format(
             local_dir, remote_dir))
 
     def close(self):
+        """Closes the log file. Pending syncs still log to it."""
         self.logfile.close()
 
     def set_worker_ip(self, worker_ip):
@@ -125,7 +328,7 @@ class _LogSyncer(object):
         self.worker_ip = worker_ip
 
     def sync_if_needed(self):
-        if time.time() - self.last_sync_time > 300:
+        if time.time() - self.last_sync_time > SYNC_PERIOD_S:
             self.sync_now()
 
     def sync_to_worker_if_possible(self):
@@ -136,6 +339,21 @@ class _LogSyncer(object):
         """
         if self.worker_ip == self.local_ip:
             return
+        ssh_opts = self.get_ssh_opts()
+        if ssh_opts is None:
+            return
+        source = "{}/".format(self.local_dir)
+        target = "{}@{}:{}/".format(get_ssh_user(), self.worker_ip,
+                                    self.local_dir)
+        final_cmd = "rsync -savz {} {} {}".format(ssh_opts, quote(source),
+                                                  quote(target))
+        logger.info("Syncing results to %s", str(self.worker_ip))
+        sync_process = subprocess.Popen(
+            final_cmd, shell=True, stdout=self.logfile)
+        sync_process.wait()
+
+    def get_ssh_opts(self):
+        """Returns the ssh options for rsync, or None if rsync is unusable."""
         ssh_key = get_ssh_key()
         ssh_user = get_ssh_user()
         global _log_sync_warned
@@ -144,86 +362,65 @@ class _LogSyncer(object):
                 logger.error("Log sync requires cluster to be setup with "
                              "`ray up`.")
                 _log_sync_warned = True
-            return
+            return None
         if not distutils.spawn.find_executable("rsync"):
             logger.error("Log sync requires rsync to be installed.")
-            return
-        source = "{}/".format(self.local_dir)
-        target = "{}@{}:{}/".format(ssh_user, self.worker_ip, self.local_dir)
-        final_cmd = (("""rsync -savz -e "ssh -i {} -o ConnectTimeout=120s """
-                      """-o StrictHostKeyChecking=no" {} {}""").format(
-                          quote(ssh_key), quote(source), quote(target)))
-        logger.info("Syncing results to %s", str(self.worker_ip))
-        sync_process = subprocess.Popen(
-            final_cmd, shell=True, stdout=self.logfile)
-        sync_process.wait()
+            return None
+        return ('-e "ssh -i {} -o ConnectTimeout=120s '
+                '-o StrictHostKeyChecking=no"').format(quote(ssh_key))
 
     def sync_now(self, force=False):
+        """Requests a sync from the worker and to the remote dir.
+
+        The sync runs in the background. If a sync of this logdir is
+        already running, another one is run after it.
+
+        Arguments:
+            force (bool): Unused, kept for compatibility.
+        """
         self.last_sync_time = time.time()
         if not self.worker_ip:
             logger.debug("Worker ip unknown, skipping log sync for {}".format(
                 self.local_dir))
             return
-
-        if self.worker_ip == self.local_ip:
-            worker_to_local_sync_cmd = None  # don't need to rsync
-        else:
-            ssh_key = get_ssh_key()
-            ssh_user = get_ssh_user()
-            global _log_sync_warned
-            if ssh_key is None or ssh_user is None:
-                if not _log_sync_warned:
-                    logger.error("Log sync requires cluster to be setup with "
-                                 "`ray up`.")
-                    _log_sync_warned = True
-                return
-            if not distutils.spawn.find_executable("rsync"):
-                logger.error("Log sync requires rsync to be installed.")
-                return
-            source = "{}@{}:{}/".format(ssh_user, self.worker_ip,
-                                        self.local_dir)
-            target = "{}/".format(self.local_dir)
-            worker_to_local_sync_cmd = ((
-                """rsync -savz -e "ssh -i {} -o ConnectTimeout=120s """
-                """-o StrictHostKeyChecking=no" {} {}""").format(
-                    quote(ssh_key), quote(source), quote(target)))
-
-        if self.remote_dir:
-            if self.sync_func:
-                local_to_remote_sync_cmd = None
-                try:
-                    self.sync_func(self.local_dir, self.remote_dir)
-                except Exception:
-                    logger.exception("Sync function failed.")
-            else:
-                local_to_remote_sync_cmd = self.get_remote_sync_cmd()
-        else:
-            local_to_remote_sync_cmd = None
-
-        if self.sync_process:
-            self.sync_process.poll()
-            if self.sync_process.returncode is None:
-                if force:
-                    self.sync_process.kill()
-                else:
-                    logger.warning("Last sync is still in progress, skipping.")
-                    return
-
-        if worker_to_local_sync_cmd or local_to_remote_sync_cmd:
-            final_cmd = ""
-            if worker_to_local_sync_cmd:
-                final_cmd += worker_to_local_sync_cmd
-            if local_to_remote_sync_cmd:
-                if final_cmd:
-                    final_cmd += " && "
-                final_cmd += local_to_remote_sync_cmd
-            logger.debug("Running log sync: {}".format(final_cmd))
-            self.sync_process = subprocess.Popen(
-                final_cmd, shell=True, stdout=self.logfile)
+        if self.worker_ip == self.local_ip and not self.remote_dir:
+            return  # nothing to sync
+        _get_sync_manager().request(self)
 
     def wait(self):
-        if self.sync_process:
-            self.sync_process.wait()
+        """Waits until the requested syncs of this logdir are done."""
+        if _sync_manager is not None and _sync_manager.pid == os.getpid():
+            _sync_manager.wait(self)
+
+    def upload_if_changed(self):
+        """Syncs the local dir to the remote dir if it changed since the
+        last upload. Returns whether it was synced."""
+        stamp = _dir_stamp(
+            self.local_dir, exclude=(os.path.basename(self.logfile.name), ))
+        if stamp is not None and stamp == self._upload_stamp:
+            return False
+        if self.sync_func:
+            try:
+                self.sync_func(self.local_dir, self.remote_dir)
+            except Exception:
+                logger.exception("Sync function failed.")
+                return True
+        else:
+            local_to_remote_sync_cmd = self.get_remote_sync_cmd()
+            if not local_to_remote_sync_cmd:
+                return True
+            logger.debug("Running log sync: {}".format(
+                local_to_remote_sync_cmd))
+            with open(self.logfile.name, "a") as logfile:
+                returncode = subprocess.Popen(
+                    local_to_remote_sync_cmd, shell=True,
+                    stdout=logfile).wait()
+            if returncode:
+                logger.warning("Log sync to {} exited with {}".format(
+                    self.remote_dir, returncode))
+                return True
+        self._upload_stamp = stamp
+        return True
 
     def get_remote_sync_cmd(self):
         if self.sync_cmd_tmpl:
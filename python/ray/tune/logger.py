@@ -2,15 +2,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import atexit
+import collections
 import csv
 import json
 import logging
 import os
+import threading
+import time
 import yaml
 import distutils.version
 import numbers
 
 import numpy as np
+from six.moves import queue
 
 import ray.cloudpickle as cloudpickle
 from ray.tune.log_sync import get_syncer
@@ -22,6 +27,16 @@ logger = logging.getLogger(__name__)
 tf = None
 use_tf150_api = True
 
+# Max number of logging calls queued for the background writer before
+# callers block
+LOG_QUEUE_SIZE = 1000
+# Results are flushed this many seconds after being logged, or once this
+# many results of a logger are waiting to be flushed
+LOG_FLUSH_PERIOD_S = 1.0
+LOG_FLUSH_RESULTS = 100
+# How long to wait at exit for queued logging calls to finish
+LOG_EXIT_TIMEOUT_S = 10.0
+
 
 class Logger(object):
     """Logging interface for ray.tune.
@@ -80,7 +95,6 @@ class JsonLogger(Logger):
     def on_result(self, result):
         json.dump(result, self, cls=_SafeFallbackEncoder)
         self.write("\n")
-        self.local_out.flush()
 
     def write(self, b):
         self.local_out.write(b)
@@ -156,7 +170,6 @@ class TFLogger(Logger):
         }, ["ray", "tune"])
         iteration_stats = tf.Summary(value=iteration_value)
         self._file_writer.add_summary(iteration_stats, t)
-        self._file_writer.flush()
 
     def flush(self):
         self._file_writer.flush()
@@ -193,11 +206,141 @@ class CSVLogger(Logger):
 DEFAULT_LOGGERS = (JsonLogger, CSVLogger, TFLogger)
 
 
+class _LogWriter(threading.Thread):
+    """Runs the logging calls of UnifiedLoggers on a background thread.
+
+    Calls run in the order they were queued. Each UnifiedLogger is flushed
+    LOG_FLUSH_PERIOD_S after its first unflushed result, or once it has
+    LOG_FLUSH_RESULTS unflushed results. The queue holds at most
+    LOG_QUEUE_SIZE calls, after which callers block until it drains.
+    """
+
+    def __init__(self):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.pid = os.getpid()
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        # Maps each logger with unflushed results to [first time, count]
+        self._unflushed = collections.OrderedDict()
+
+    def log_result(self, owner, result):
+        """Queues owner._write_result(result) without waiting for it."""
+        self._put((owner, owner._write_result, (result, ), None, True))
+
+    def submit(self, owner, fn, *args):
+        """Queues fn(*args) without waiting for it."""
+        self._put((owner, fn, args, None, False))
+
+    def call(self, owner, fn, *args, **kwargs):
+        """Runs fn(*args) after all queued calls and returns its result.
+
+        Errors raised by fn are raised here as well. Calls on behalf of
+        `owner` should flush it, as it is no longer tracked as unflushed.
+        """
+        timeout = kwargs.get("timeout")
+        done = threading.Event()
+        out = []
+        self._put((owner, fn, args, (done, out), False))
+        if not done.wait(timeout):
+            raise RuntimeError("Timed out waiting for the log writer.")
+        value, error = out
+        if error is not None:
+            raise error
+        return value
+
+    def flush_all(self):
+        """Flushes all loggers with unflushed results."""
+        while self._unflushed:
+            owner, _ = self._unflushed.popitem(last=False)
+            self._run(owner._flush_loggers, ())
+
+    def _put(self, item):
+        if threading.current_thread() is self:
+            self._process(item)
+        else:
+            self._queue.put(item)
+
+    def run(self):
+        while True:
+            timeout = None
+            if self._unflushed:
+                first_time, _ = next(iter(self._unflushed.values()))
+                timeout = max(0, first_time + LOG_FLUSH_PERIOD_S - time.time())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                self._process(item)
+            self._flush_due()
+
+    def _process(self, item):
+        owner, fn, args, reply, is_result = item
+        if reply is not None:
+            self._unflushed.pop(owner, None)
+            done, out = reply
+            out.extend(self._run(fn, args))
+            done.set()
+            return
+        self._run(fn, args)
+        if is_result:
+            unflushed = self._unflushed.setdefault(owner, [time.time(), 0])
+            unflushed[1] += 1
+            if unflushed[1] >= LOG_FLUSH_RESULTS:
+                del self._unflushed[owner]
+                self._run(owner._flush_loggers, ())
+
+    def _flush_due(self):
+        now = time.time()
+        while self._unflushed:
+            owner, (first_time, _) = next(iter(self._unflushed.items()))
+            if first_time + LOG_FLUSH_PERIOD_S > now:
+                break
+            del self._unflushed[owner]
+            self._run(owner._flush_loggers, ())
+
+    def _run(self, fn, args):
+        try:
+            return fn(*args), None
+        except Exception as e:
+            logger.exception("Error in background logging call.")
+            return None, e
+
+
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_log_writer():
+    """Returns the background log writer of this process."""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None or _log_writer.pid != os.getpid():
+            _log_writer = _LogWriter()
+            _log_writer.start()
+        return _log_writer
+
+
+@atexit.register
+def _flush_log_writer():
+    if _log_writer is not None and _log_writer.pid == os.getpid():
+        try:
+            _log_writer.call(
+                None, _log_writer.flush_all, timeout=LOG_EXIT_TIMEOUT_S)
+        except Exception:
+            logger.exception("Failed to flush logs at exit.")
+
+
 class UnifiedLogger(Logger):
     """Unified result logger for TensorBoard, rllab/viskit, plain json.
 
     This class also periodically syncs output to the given upload uri.
 
+    By default, results are written and flushed on a background thread
+    shared by all UnifiedLoggers of the process, so that slow filesystems
+    do not block the caller. flush() and close() wait until all results
+    logged before them are on disk.
+
     Arguments:
         config: Configuration passed to all logger creators.
         logdir: Directory for all logger creators to log to.
@@ -206,6 +349,9 @@ class UnifiedLogger(Logger):
             and JSON loggers.
         sync_function (func|str): Optional function for syncer to run.
             See ray/python/ray/tune/log_sync.py
+        async_writes (bool): Whether to log on the background thread. If
+            False, each result is written and flushed before on_result()
+            returns.
     """
 
     def __init__(self,
@@ -213,13 +359,15 @@ class UnifiedLogger(Logger):
                  logdir,
                  upload_uri=None,
                  loggers=None,
-                 sync_function=None):
+                 sync_function=None,
+                 async_writes=True):
         if loggers is None:
             self._logger_cls_list = DEFAULT_LOGGERS
         else:
             self._logger_cls_list = loggers
         self._sync_function = sync_function
         self._log_syncer = None
+        self._writer = _get_log_writer() if async_writes else None
 
         Logger.__init__(self, config, logdir, upload_uri)
 
@@ -235,32 +383,66 @@ class UnifiedLogger(Logger):
             self.logdir, self.uri, sync_function=self._sync_function)
 
     def on_result(self, result):
+        if self._writer:
+            # Copied since callers may update the result after logging it
+            self._writer.log_result(self, result.copy())
+        else:
+            self._write_result(result)
+            self._flush_loggers()
+
+    def update_config(self, config):
+        if self._writer:
+            self._writer.submit(self, self._update_config, config)
+        else:
+            self._update_config(config)
+
+    def close(self):
+        self._call(self._close)
+
+    def flush(self):
+        self._call(self._flush)
+
+    def sync_results_to_new_location(self, worker_ip):
+        """Sends the current log directory to the remote node.
+
+        Syncing will not occur if the cluster is not started
+        with the Ray autoscaler.
+        """
+        self._call(self._sync_results_to_new_location, worker_ip)
+
+    def _call(self, fn, *args):
+        if self._writer:
+            return self._writer.call(self, fn, *args)
+        return fn(*args)
+
+    def _write_result(self, result):
         for _logger in self._loggers:
             _logger.on_result(result)
         self._log_syncer.set_worker_ip(result.get(NODE_IP))
+
+    def _flush_loggers(self):
+        for _logger in self._loggers:
+            _logger.flush()
         self._log_syncer.sync_if_needed()
 
-    def update_config(self, config):
+    def _update_config(self, config):
         for _logger in self._loggers:
             _logger.update_config(config)
 
-    def close(self):
+    def _close(self):
         for _logger in self._loggers:
             _logger.close()
         self._log_syncer.sync_now(force=False)
         self._log_syncer.close()
 
-    def flush(self):
+    def _flush(self):
         for _logger in self._loggers:
             _logger.flush()
         self._log_syncer.sync_now(force=False)
 
-    def sync_results_to_new_location(self, worker_ip):
-        """Sends the current log directory to the remote node.
-
-        Syncing will not occur if the cluster is not started
-        with the Ray autoscaler.
-        """
+    def _sync_results_to_new_location(self, worker_ip):
+        for _logger in self._loggers:
+            _logger.flush()
         if worker_ip != self._log_syncer.worker_ip:
             self._log_syncer.set_worker_ip(worker_ip)
             self._log_syncer.sync_to_worker_if_possible()
@@ -0,0 +1,123 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from ray import gcs_utils
+from ray.experimental import set_resource
+
+# Prefix of the custom resources created to pin trial actors to nodes
+NODE_RESOURCE_PREFIX = "tune_node:"
+# Capacity of each node resource. Each trial actor requests one unit.
+NODE_RESOURCE_CAPACITY = 10000
+
+
+def _demand(resources):
+    """Returns the resources of a trial's actor, as a flat dict.
+
+    The extra resources are left out, since they are used by the workers
+    that the actor starts, which Ray may place on any node.
+    """
+    demand = {"CPU": resources.cpu, "GPU": resources.gpu}
+    for name in resources.custom_resources:
+        demand[name] = resources.get(name)
+    return demand
+
+
+class NodePlacementPlanner(object):
+    """Chooses the nodes that trial actors are started on.
+
+    Tracks the total resources of each live node and the trials placed on
+    it, so that a trial actor is only started where its resources fit.
+    Extra resources, such as `extra_cpu` and `extra_gpu`, are not placed,
+    since they are used by workers that Ray schedules anywhere. Among the nodes
+    that fit, the one with the least resources left over is chosen, which
+    packs small trials together and keeps room for large ones. Trials that
+    need no GPUs avoid nodes with free GPUs where possible.
+
+    Trial actors are pinned to the chosen node with a custom resource that
+    is created on the node when it is first used.
+    """
+
+    def __init__(self):
+        self._nodes = {}  # client id -> (ip, total resources)
+        self._placements = {}  # trial -> (client id, demand)
+        self._node_resources = set()
+
+    def update_nodes(self, nodes):
+        """Updates the node table from the output of ray.nodes()."""
+        self._nodes = {}
+        for node in nodes:
+            if node["EntryType"] == gcs_utils.ClientTableData.DELETION:
+                continue
+            total = {
+                name: value
+                for name, value in node["Resources"].items()
+                if not name.startswith(NODE_RESOURCE_PREFIX)
+            }
+            self._nodes[node["ClientID"]] = (node["NodeManagerAddress"],
+                                             total)
+
+    def has_nodes(self):
+        return bool(self._nodes)
+
+    def free_resources(self, node_id):
+        _, free = self._nodes[node_id]
+        free = dict(free)
+        for placed_id, demand in self._placements.values():
+            if placed_id == node_id:
+                for name, value in demand.items():
+                    free[name] = free.get(name, 0) - value
+        return free
+
+    def fits(self, node_id, resource_list):
+        """Returns whether all the resources fit on the node together."""
+        free = self.free_resources(node_id)
+        needed = {}
+        for resources in resource_list:
+            for name, value in _demand(resources).items():
+                needed[name] = needed.get(name, 0) + value
+        return all(
+            value <= free.get(name, 0) for name, value in needed.items())
+
+    def choose_node(self, resources):
+        """Returns the client id of the best node for resources or None."""
+        demand = _demand(resources)
+        best, best_score = None, None
+        for node_id in self._nodes:
+            if not self.fits(node_id, [resources]):
+                continue
+            free = self.free_resources(node_id)
+            idle_gpus = free.get("GPU", 0) if not demand["GPU"] else 0
+            score = (idle_gpus, free.get("CPU", 0) - demand["CPU"],
+                     free.get("GPU", 0) - demand["GPU"])
+            if best_score is None or score < best_score:
+                best, best_score = node_id, score
+        return best
+
+    def node_ip(self, node_id):
+        return self._nodes[node_id][0]
+
+    def node_for_ip(self, ip):
+        for node_id, (node_ip, _) in self._nodes.items():
+            if node_ip == ip:
+                return node_id
+        return None
+
+    def place(self, trial, node_id):
+        self._placements[trial] = (node_id, _demand(trial.resources))
+
+    def release(self, trial):
+        self._placements.pop(trial, None)
+
+    def node_resource(self, node_id):
+        """Returns the name of the custom resource pinning to the node."""
+        name = NODE_RESOURCE_PREFIX + node_id
+        if name not in self._node_resources:
+            set_resource(name, NODE_RESOURCE_CAPACITY, node_id)
+            self._node_resources.add(name)
+        return name
+
+    def debug_string(self):
+        used = {node_id for node_id, _ in self._placements.values()}
+        return "Trials placed on {} of {} nodes".format(
+            len(used.intersection(self._nodes)), len(self._nodes))
@@ -13,6 +13,8 @@ import traceback
 import ray
 from ray.tune.error import AbortTrialExecution
 from ray.tune.logger import NoopLogger
+from ray.tune.placement import NODE_RESOURCE_PREFIX, NodePlacementPlanner
+from ray.tune.result import TIME_THIS_ITER_S
 from ray.tune.trial import Trial, Resources, Checkpoint
 from ray.tune.trial_executor import TrialExecutor
 from ray.tune.util import warn_if_slow
@@ -33,22 +35,139 @@ class _LocalWrapper(object):
         return self._result
 
 
+def _pool_key(trial):
+    """Returns the key of the actors that can be reused for trial."""
+    return (trial.trainable_name, trial.resources.cpu, trial.resources.gpu,
+            tuple(sorted(trial.resources.custom_resources.items())))
+
+
+class _ActorPool(object):
+    """Idle trainable actors kept running for reuse by later trials.
+
+    Actors are keyed by trainable name and resources. They are kept in the
+    order they were released in, so that the least recently used ones are
+    evicted first.
+    """
+
+    def __init__(self, size_per_key):
+        self.size_per_key = size_per_key
+        self._entries = []  # (key, actor, node_ip, resources)
+        self._unresettable = set()
+        # Total seconds and count of actor startups per key
+        self._startup_times = {}
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_reset_failures = 0
+        self.saved_startup_s = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, actor, node_ip, resources):
+        """Returns whether the actor was added to the pool."""
+        if key in self._unresettable:
+            return False
+        if len([e for e in self._entries if e[0] == key]) >= \
+                self.size_per_key:
+            return False
+        self._entries.append((key, actor, node_ip, resources))
+        return True
+
+    def take(self, key, node_ip=None):
+        """Returns (actor, node ip) of an idle actor for key, preferably on
+        node_ip, or (None, None)."""
+        matches = [i for i, e in enumerate(self._entries) if e[0] == key]
+        if not matches:
+            self.num_misses += 1
+            return None, None
+        local = [i for i in matches if self._entries[i][2] == node_ip]
+        _, actor, actor_ip, _ = self._entries.pop((local or matches)[-1])
+        return actor, actor_ip
+
+    def record_hit(self, key):
+        """Records that a trial was started on an actor from take()."""
+        self.num_hits += 1
+        total, count = self._startup_times.get(key, (0.0, 0))
+        if count:
+            self.saved_startup_s += total / count
+
+    def pop_oldest(self, node_ip=None):
+        """Removes the least recently used actor, on node_ip if given, and
+        returns its entry."""
+        for i, entry in enumerate(self._entries):
+            if node_ip is None or entry[2] == node_ip:
+                return self._entries.pop(i)
+        return None
+
+    def resources(self, node_ip=None):
+        return [
+            e[3] for e in self._entries if node_ip is None or e[2] == node_ip
+        ]
+
+    def on_reset_failed(self, key):
+        """Stops pooling for key, returning the actors evicted for it."""
+        self.num_misses += 1
+        self.num_reset_failures += 1
+        self._unresettable.add(key)
+        evicted = [e for e in self._entries if e[0] == key]
+        self._entries = [e for e in self._entries if e[0] != key]
+        return evicted
+
+    def record_startup(self, key, seconds):
+        total, count = self._startup_times.get(key, (0.0, 0))
+        self._startup_times[key] = (total + seconds, count + 1)
+
+    def debug_string(self):
+        lookups = self.num_hits + self.num_misses
+        return ("Actor pool: {} idle actors, {}/{} trials started on a "
+                "pooled actor, {} failed resets, ~{:.1f}s of actor startup "
+                "saved".format(
+                    len(self), self.num_hits, lookups,
+                    self.num_reset_failures, self.saved_startup_s))
+
+
 class RayTrialExecutor(TrialExecutor):
-    """An implemention of TrialExecutor based on Ray."""
+    """An implemention of TrialExecutor based on Ray.
+
+    With `reuse_actors`, the actors of stopped trials are kept in a pool of
+    up to `actor_pool_size` idle actors per trainable and resource request,
+    and reused by trials of the same trainable that restore from a
+    checkpoint. Their state is reset with `Trainable.reset_config()`, and a
+    new actor is started instead if that returns False. Pooled actors on
+    the node a trial last ran on are preferred. If `reuse_for_new_trials` is
+    also set, trials that start from scratch take pooled actors too, which
+    requires `reset_config()` to reset all of the state of the trainable.
+
+    With `pack_trials`, trials are only started if their actor fits on a
+    single node, and their actors are pinned to the node chosen by a
+    NodePlacementPlanner. Extra resources only need to fit in the cluster.
+    """
 
     def __init__(self,
                  queue_trials=False,
                  reuse_actors=False,
                  ray_auto_init=False,
-                 refresh_period=RESOURCE_REFRESH_PERIOD):
+                 refresh_period=RESOURCE_REFRESH_PERIOD,
+                 actor_pool_size=1,
+                 reuse_for_new_trials=False,
+                 pack_trials=False):
         super(RayTrialExecutor, self).__init__(queue_trials)
         self._running = {}
+        # Reverse index of self._running from each trial to its futures
+        self._running_futures = {}
+        # Results of running futures that were fetched ahead of processing
+        self._fetched_results = {}
         # Since trial resume after paused should not run
         # trial.train.remote(), thus no more new remote object id generated.
         # We use self._paused to store paused trials here.
         self._paused = {}
         self._reuse_actors = reuse_actors
-        self._cached_actor = None
+        self._reuse_for_new_trials = reuse_for_new_trials
+        self._actor_pool = _ActorPool(actor_pool_size)
+        # Pool key and creation time of actors that have not returned a
+        # result yet, to estimate the startup time saved by reusing actors
+        self._starting_actors = {}
+        self._planner = NodePlacementPlanner() if pack_trials else None
 
         self._avail_resources = Resources(cpu=0, gpu=0)
         self._committed_resources = Resources(cpu=0, gpu=0)
@@ -66,52 +185,114 @@ class RayTrialExecutor(TrialExecutor):
             self._update_avail_resources()
 
     def _setup_runner(self, trial, reuse_allowed):
-        if (self._reuse_actors and reuse_allowed
-                and self._cached_actor is not None):
-            logger.debug("Reusing cached runner {} for {}".format(
-                self._cached_actor, trial.trial_id))
-            existing_runner = self._cached_actor
-            self._cached_actor = None
+        key = _pool_key(trial)
+        existing_runner, node_ip, node_id = None, None, None
+        if self._reuse_actors and (reuse_allowed
+                                   or self._reuse_for_new_trials):
+            existing_runner, node_ip = self._actor_pool.take(
+                key, trial.last_result.get("node_ip"))
+        if existing_runner:
+            logger.debug("Reusing pooled runner {} for {}".format(
+                existing_runner, trial.trial_id))
+            if self._planner:
+                node_id = self._planner.node_for_ip(node_ip)
         else:
-            if self._cached_actor:
-                logger.debug(
-                    "Cannot reuse cached runner {} for new trial".format(
-                        self._cached_actor))
-                self._cached_actor.stop.remote()
-                self._cached_actor.__ray_terminate__.remote()
-                self._cached_actor = None
-            existing_runner = None
-            cls = ray.remote(
-                num_cpus=trial.resources.cpu,
-                num_gpus=trial.resources.gpu,
-                resources=trial.resources.custom_resources)(
-                    trial._get_trainable_cls())
+            if self._planner:
+                node_id = self._planner.choose_node(trial.resources)
+            if node_id:
+                self._evict_pooled_actors_on_node(node_id, trial.resources)
+            self._evict_pooled_actors()
+        if node_id:
+            self._planner.place(trial, node_id)
 
         trial.init_logger()
         # We checkpoint metadata here to try mitigating logdir duplication
         self.try_checkpoint_metadata(trial)
         remote_logdir = trial.logdir
+        local_mode = ray.worker._mode() == ray.worker.LOCAL_MODE
 
         if existing_runner:
             trial.runner = existing_runner
-            if not self.reset_trial(trial, trial.config, trial.experiment_tag):
-                raise AbortTrialExecution(
-                    "Trial runner reuse requires reset_trial() to be "
-                    "implemented and return True.")
-            return existing_runner
+            if self.reset_trial(trial, trial.config, trial.experiment_tag):
+                existing_runner.reset_run.remote(
+                    remote_logdir, chdir=not local_mode)
+                self._actor_pool.record_hit(key)
+                return existing_runner
+            logger.warning(
+                "Trial runner reuse requires reset_config() to be implemented "
+                "and return True. Starting a new actor for {} and no longer "
+                "reusing actors of {}.".format(trial, trial.trainable_name))
+            evicted = self._actor_pool.on_reset_failed(key)
+            self._destroy_actor(existing_runner)
+            for _, actor, _, _ in evicted:
+                self._destroy_actor(actor)
+            trial.runner = None
+            if self._planner:
+                node_id = self._planner.choose_node(trial.resources)
+                if node_id:
+                    self._planner.place(trial, node_id)
+                else:
+                    self._planner.release(trial)
 
         def logger_creator(config):
             # Set the working dir in the remote process, for user file writes
             if not os.path.exists(remote_logdir):
                 os.makedirs(remote_logdir)
-            if not ray.worker._mode() == ray.worker.LOCAL_MODE:
+            if not local_mode:
                 os.chdir(remote_logdir)
             return NoopLogger(config, remote_logdir)
 
+        custom_resources = trial.resources.custom_resources
+        if node_id:
+            custom_resources = dict(custom_resources)
+            custom_resources[self._planner.node_resource(node_id)] = 1
+        cls = ray.remote(
+            num_cpus=trial.resources.cpu,
+            num_gpus=trial.resources.gpu,
+            resources=custom_resources)(trial._get_trainable_cls())
+        if self._reuse_actors:
+            self._starting_actors[trial] = (key, time.time())
         # Logging for trials is handled centrally by TrialRunner, so
         # configure the remote runner to use a noop-logger.
         return cls.remote(config=trial.config, logger_creator=logger_creator)
 
+    def _evict_pooled_actors(self):
+        """Destroys idle actors until the pool fits in the free resources.
+
+        Idle actors hold on to their resources in Ray, but the resources are
+        not counted as committed here, so they need to be freed before new
+        actors are started.
+        """
+        while len(self._actor_pool) and not self._fits(
+                [self._committed_resources] + self._actor_pool.resources()):
+            _, actor, _, _ = self._actor_pool.pop_oldest()
+            logger.debug("Evicting pooled runner {}".format(actor))
+            self._destroy_actor(actor)
+
+    def _evict_pooled_actors_on_node(self, node_id, resources):
+        """Destroys idle actors on the node until resources fit next to the
+        remaining ones."""
+        node_ip = self._planner.node_ip(node_id)
+        while not self._planner.fits(
+                node_id, [resources] + self._actor_pool.resources(node_ip)):
+            entry = self._actor_pool.pop_oldest(node_ip)
+            if entry is None:
+                break
+            logger.debug("Evicting pooled runner {}".format(entry[1]))
+            self._destroy_actor(entry[1])
+
+    def _fits(self, resource_list):
+        avail = self._avail_resources
+        return (sum(r.cpu_total() for r in resource_list) <= avail.cpu
+                and sum(r.gpu_total() for r in resource_list) <= avail.gpu
+                and all(
+                    sum(r.get_res_total(name) for r in resource_list) <=
+                    avail.get(name) for name in avail.custom_resources))
+
+    def _destroy_actor(self, actor):
+        actor.stop.remote()
+        actor.__ray_terminate__.remote()
+
     def _train(self, trial):
         """Start one iteration of training and save remote id."""
 
@@ -122,7 +303,18 @@ class RayTrialExecutor(TrialExecutor):
         if isinstance(remote, dict):
             remote = _LocalWrapper(remote)
 
-        self._running[remote] = trial
+        self._add_running(remote, trial)
+
+    def _add_running(self, future, trial):
+        self._running[future] = trial
+        self._running_futures.setdefault(trial, []).append(future)
+
+    def _remove_running(self, future):
+        trial = self._running.pop(future)
+        futures = self._running_futures[trial]
+        futures.remove(future)
+        if not futures:
+            del self._running_futures[trial]
 
     def _start_trial(self, trial, checkpoint=None):
         """Starts trial and restores last result if trial was paused.
@@ -146,7 +338,7 @@ class RayTrialExecutor(TrialExecutor):
         if (prior_status == Trial.PAUSED and previous_run):
             # If Trial was in flight when paused, self._paused stores result.
             self._paused.pop(previous_run[0])
-            self._running[previous_run[0]] = trial
+            self._add_running(previous_run[0], trial)
         else:
             self._train(trial)
 
@@ -174,19 +366,21 @@ class RayTrialExecutor(TrialExecutor):
 
         try:
             trial.write_error_log(error_msg)
+            self._starting_actors.pop(trial, None)
             if hasattr(trial, "runner") and trial.runner:
                 if (not error and self._reuse_actors
-                        and self._cached_actor is None):
-                    logger.debug("Reusing actor for {}".format(trial.runner))
-                    self._cached_actor = trial.runner
+                        and self._actor_pool.add(
+                            _pool_key(trial), trial.runner,
+                            trial.last_result.get("node_ip"),
+                            trial.resources)):
+                    logger.debug("Pooling actor {}".format(trial.runner))
                 else:
                     logger.info(
                         "Destroying actor for trial {}. If your trainable is "
                         "slow to initialize, consider setting "
                         "reuse_actors=True to reduce actor creation "
                         "overheads.".format(trial))
-                    trial.runner.stop.remote()
-                    trial.runner.__ray_terminate__.remote()
+                    self._destroy_actor(trial.runner)
         except Exception:
             logger.exception("Error stopping runner for Trial %s", str(trial))
             self.set_status(trial, Trial.ERROR)
@@ -242,9 +436,11 @@ class RayTrialExecutor(TrialExecutor):
         if prior_status == Trial.RUNNING:
             logger.debug("Returning resources for Trial %s.", str(trial))
             self._return_resources(trial.resources)
-            out = self._find_item(self._running, trial)
-            for result_id in out:
-                self._running.pop(result_id)
+            if self._planner:
+                self._planner.release(trial)
+            for result_id in self._running_futures.get(trial, [])[:]:
+                self._remove_running(result_id)
+                self._fetched_results.pop(result_id, None)
 
     def continue_training(self, trial):
         """Continues the training of this trial."""
@@ -258,9 +454,9 @@ class RayTrialExecutor(TrialExecutor):
         before pausing, which is restored when Trial is resumed.
         """
 
-        trial_future = self._find_item(self._running, trial)
-        if trial_future:
-            self._paused[trial_future[0]] = trial
+        trial_futures = self._running_futures.get(trial)
+        if trial_futures:
+            self._paused[trial_futures[0]] = trial
         super(RayTrialExecutor, self).pause_trial(trial)
 
     def reset_trial(self, trial, new_config, new_experiment_tag):
@@ -289,6 +485,47 @@ class RayTrialExecutor(TrialExecutor):
         return list(self._running.values())
 
     def get_next_available_trial(self):
+        [result_id], _ = self._wait_for_results()
+        return self._running[result_id]
+
+    def get_next_available_trials(self):
+        """Waits for at least one result and fetches all ready results.
+
+        The ready results are fetched with a single ray.get, and returned
+        by fetch_result() without further calls to Ray.
+
+        Returns:
+            List of distinct trials with a result ready, in random order.
+        """
+        ready, not_ready = self._wait_for_results()
+        if not_ready:
+            more_ready, _ = ray.wait(
+                not_ready, num_returns=len(not_ready), timeout=0)
+            ready += more_ready
+        try:
+            with warn_if_slow("fetch_result"):
+                results = ray.get(ready)
+        except Exception:
+            # Leave the error to be raised by fetch_result() for the trial
+            # that caused it, like without batching.
+            logger.debug("Error fetching results in batch.")
+        else:
+            self._fetched_results.update(zip(ready, results))
+        trials = []
+        seen = set()
+        for result_id in ready:
+            trial = self._running[result_id]
+            if trial not in seen:
+                seen.add(trial)
+                trials.append(trial)
+        return trials
+
+    def _wait_for_results(self):
+        """Blocks until one running future is ready.
+
+        Returns:
+            The ray.wait() output (ready, not_ready) for the running futures.
+        """
         shuffled_results = list(self._running.keys())
         random.shuffle(shuffled_results)
         # Note: We shuffle the results because `ray.wait` by default returns
@@ -296,7 +533,7 @@ class RayTrialExecutor(TrialExecutor):
         # trials (i.e. trials that run remotely) also get fairly reported.
         # See https://github.com/ray-project/ray/issues/4211 for details.
         start = time.time()
-        [result_id], _ = ray.wait(shuffled_results)
+        ready, not_ready = ray.wait(shuffled_results)
         wait_time = time.time() - start
         if wait_time > NONTRIVIAL_WAIT_TIME_THRESHOLD_S:
             self._last_nontrivial_wait = time.time()
@@ -308,23 +545,34 @@ class RayTrialExecutor(TrialExecutor):
                     BOTTLENECK_WARN_PERIOD_S))
 
             self._last_nontrivial_wait = time.time()
-        return self._running[result_id]
+        return ready, not_ready
 
     def fetch_result(self, trial):
         """Fetches one result of the running trials.
 
         Returns:
             Result of the most recent trial training run."""
-        trial_future = self._find_item(self._running, trial)
-        if not trial_future:
+        trial_futures = self._running_futures.get(trial)
+        if not trial_futures:
             raise ValueError("Trial was not running.")
-        self._running.pop(trial_future[0])
-        with warn_if_slow("fetch_result"):
-            result = ray.get(trial_future[0])
+        fetched = [f for f in trial_futures if f in self._fetched_results]
+        result_id = fetched[0] if fetched else trial_futures[0]
+        self._remove_running(result_id)
+        if result_id in self._fetched_results:
+            result = self._fetched_results.pop(result_id)
+        else:
+            with warn_if_slow("fetch_result"):
+                result = ray.get(result_id)
 
         # For local mode
         if isinstance(result, _LocalWrapper):
             result = result.unwrap()
+        if trial in self._starting_actors:
+            key, start_time = self._starting_actors.pop(trial)
+            startup_s = (time.time() - start_time -
+                         result.get(TIME_THIS_ITER_S, 0))
+            if startup_s > 0:
+                self._actor_pool.record_startup(key, startup_s)
         return result
 
     def _commit_resources(self, resources):
@@ -387,7 +635,16 @@ class RayTrialExecutor(TrialExecutor):
         resources = resources.copy()
         num_cpus = resources.pop("CPU", 0)
         num_gpus = resources.pop("GPU", 0)
-        custom_resources = resources
+        custom_resources = {
+            name: value
+            for name, value in resources.items()
+            if not name.startswith(NODE_RESOURCE_PREFIX)
+        }
+        if self._planner:
+            try:
+                self._planner.update_nodes(ray.nodes())
+            except Exception:
+                logger.debug("Node resources are not available.")
 
         self._avail_resources = Resources(
             int(num_cpus), int(num_gpus), custom_resources=custom_resources)
@@ -412,6 +669,8 @@ class RayTrialExecutor(TrialExecutor):
             and resources.gpu_total() <= currently_available.gpu and all(
                 resources.get_res_total(res) <= currently_available.get(res)
                 for res in resources.custom_resources))
+        if have_space and self._planner and self._planner.has_nodes():
+            have_space = self._planner.choose_node(resources) is not None
 
         if have_space:
             return True
@@ -452,6 +711,10 @@ class RayTrialExecutor(TrialExecutor):
             ])
             if customs:
                 status += " ({})".format(customs)
+            if self._reuse_actors:
+                status += "\n" + self._actor_pool.debug_string()
+            if self._planner:
+                status += "\n" + self._planner.debug_string()
             return status
         else:
             return "Resources requested: ?"
@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
+import distutils.version
 import logging
 import numpy as np
 
@@ -9,6 +11,10 @@ from ray.tune.schedulers.trial_scheduler import FIFOScheduler, TrialScheduler
 
 logger = logging.getLogger(__name__)
 
+# Whether np.percentile interpolates with the lerp added in numpy 1.20
+_NUMPY_LERP = (distutils.version.LooseVersion(np.__version__) >=
+               distutils.version.LooseVersion("1.20"))
+
 
 class AsyncHyperBandScheduler(FIFOScheduler):
     """Implements the Async Successive Halving.
@@ -135,12 +141,14 @@ class _Bracket():
     def __init__(self, min_t, max_t, reduction_factor, s):
         self.rf = reduction_factor
         MAX_RUNGS = int(np.log(max_t / min_t) / np.log(self.rf) - s + 1)
-        self._rungs = [(min_t * self.rf**(k + s), {})
+        self._rungs = [(min_t * self.rf**(k + s), _RungRewards())
                        for k in reversed(range(MAX_RUNGS))]
 
     def cutoff(self, recorded):
         if not recorded:
             return None
+        if isinstance(recorded, _RungRewards):
+            return recorded.percentile((1 - 1 / self.rf) * 100)
         return np.percentile(list(recorded.values()), (1 - 1 / self.rf) * 100)
 
     def on_result(self, trial, cur_iter, cur_rew):
@@ -168,6 +176,56 @@ class _Bracket():
         return "Bracket: " + iters
 
 
+class _RungRewards(dict):
+    """Maps trial ids to the rewards recorded at a rung.
+
+    The rewards are also kept sorted, so that percentiles take O(log n)
+    instead of a pass over all of them.
+    """
+
+    def __init__(self):
+        dict.__init__(self)
+        self._sorted = []
+        self._num_nan = 0
+
+    def __setitem__(self, trial_id, reward):
+        if trial_id in self:
+            self._remove(self[trial_id])
+        dict.__setitem__(self, trial_id, reward)
+        if np.isnan(reward):
+            self._num_nan += 1
+        else:
+            bisect.insort(self._sorted, reward)
+
+    def __delitem__(self, trial_id):
+        self._remove(self[trial_id])
+        dict.__delitem__(self, trial_id)
+
+    def _remove(self, reward):
+        if np.isnan(reward):
+            self._num_nan -= 1
+        else:
+            del self._sorted[bisect.bisect_left(self._sorted, reward)]
+
+    def percentile(self, q):
+        """Returns np.percentile(list(self.values()), q), bit for bit."""
+        if self._num_nan:
+            return np.float64(np.nan)
+        values = self._sorted
+        index = (len(values) - 1) * np.true_divide(q, 100)
+        below = int(np.floor(index))
+        above = min(below + 1, len(values) - 1)
+        gamma = index - below
+        a = np.float64(values[below])
+        b = np.float64(values[above])
+        if not _NUMPY_LERP:
+            return a * (1 - gamma) + b * gamma
+        diff = b - a
+        if gamma >= 0.5:
+            return b - diff * (1 - gamma)
+        return a + diff * gamma
+
+
 ASHAScheduler = AsyncHyperBandScheduler
 
 if __name__ == "__main__":
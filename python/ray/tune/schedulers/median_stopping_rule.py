@@ -2,7 +2,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import collections
+import bisect
 import logging
 import numpy as np
 
@@ -11,6 +11,53 @@ from ray.tune.schedulers.trial_scheduler import FIFOScheduler, TrialScheduler
 
 logger = logging.getLogger(__name__)
 
+# Medians this close to the compared result are recomputed exactly, since
+# running sums may round differently than np.mean
+_EXACT_CHECK_TOLERANCE = 1e-9
+
+
+class _ResultHistory(object):
+    """The metric values a trial reported, indexed by time.
+
+    Keeps running sums of the values in time order, so that the mean of the
+    values up to any time is found by bisection, and the best value so far.
+    """
+
+    def __init__(self):
+        self.times = []  # in arrival order
+        self.values = []  # in arrival order
+        self.sorted_times = []
+        self.sums = []  # sums[i] is the sum of the first i + 1 sorted values
+        self.best = None
+
+    def add(self, time, value, metric_op):
+        self.times.append(time)
+        self.values.append(value)
+        if self.best is None or metric_op * value > self.best:
+            self.best = metric_op * value
+        if not self.sorted_times or time >= self.sorted_times[-1]:
+            self.sorted_times.append(time)
+            self.sums.append(value + (self.sums[-1] if self.sums else 0.))
+            return
+        # Out of order, so rebuild the running sums from there on
+        i = bisect.bisect_right(self.sorted_times, time)
+        self.sorted_times.insert(i, time)
+        order = sorted(range(len(self.times)), key=lambda j: self.times[j])
+        self.sums[i:] = []
+        for j in order[i:]:
+            self.sums.append(self.values[j] +
+                             (self.sums[-1] if self.sums else 0.))
+
+    def mean(self, t_max):
+        count = bisect.bisect_right(self.sorted_times, t_max)
+        if not count:
+            return float("nan")
+        return self.sums[count - 1] / count
+
+    def exact_mean(self, t_max):
+        return np.mean(
+            [v for v, t in zip(self.values, self.times) if t <= t_max])
+
 
 class MedianStoppingRule(FIFOScheduler):
     """Implements the median stopping rule as described in the Vizier paper:
@@ -58,7 +105,12 @@ class MedianStoppingRule(FIFOScheduler):
         FIFOScheduler.__init__(self)
         self._stopped_trials = set()
         self._completed_trials = set()
-        self._results = collections.defaultdict(list)
+        self._results = {}
+        # Sorted times of all results of completed trials. The median only
+        # changes at these times, so it is cached by the bisection position
+        # of the time among them.
+        self._completed_times = []
+        self._median_cache = {}
         self._grace_period = grace_period
         self._min_samples_required = min_samples_required
         self._metric = metric
@@ -83,9 +135,11 @@ class MedianStoppingRule(FIFOScheduler):
             return TrialScheduler.CONTINUE  # fall back to FIFO
 
         time = result[self._time_attr]
-        self._results[trial].append(result)
+        self._add_result(trial, result)
         median_result = self._get_median_result(time)
         best_result = self._best_result(trial)
+        if self._near(best_result, median_result):
+            median_result = self._get_median_result(time, exact=True)
         if self._verbose:
             logger.info("Trial {} best res={} vs median res={} at t={}".format(
                 trial, best_result, median_result, time))
@@ -102,34 +156,63 @@ class MedianStoppingRule(FIFOScheduler):
             return TrialScheduler.CONTINUE
 
     def on_trial_complete(self, trial_runner, trial, result):
-        self._results[trial].append(result)
-        self._completed_trials.add(trial)
+        self._add_result(trial, result)
+        self._mark_completed(trial)
 
     def on_trial_remove(self, trial_runner, trial):
         """Marks trial as completed if it is paused and has previously ran."""
         if trial.status is Trial.PAUSED and trial in self._results:
-            self._completed_trials.add(trial)
+            self._mark_completed(trial)
 
     def debug_string(self):
         return "Using MedianStoppingRule: num_stopped={}.".format(
             len(self._stopped_trials))
 
-    def _get_median_result(self, time):
+    def _add_result(self, trial, result):
+        if trial not in self._results:
+            self._results[trial] = _ResultHistory()
+        self._results[trial].add(result[self._time_attr],
+                                 result[self._metric], self._metric_op)
+        if trial in self._completed_trials:
+            bisect.insort(self._completed_times, result[self._time_attr])
+            self._median_cache.clear()
+
+    def _mark_completed(self, trial):
+        if trial in self._completed_trials:
+            return
+        self._completed_trials.add(trial)
+        self._completed_times = sorted(self._completed_times +
+                                       self._results[trial].times)
+        self._median_cache.clear()
+
+    def _get_median_result(self, time, exact=False):
+        key = bisect.bisect_right(self._completed_times, time)
+        if not exact and key in self._median_cache:
+            return self._median_cache[key]
         scores = []
         for trial in self._completed_trials:
-            scores.append(self._running_result(trial, time))
+            scores.append(self._running_result(trial, time, exact))
         if len(scores) >= self._min_samples_required:
-            return np.median(scores)
+            median = np.median(scores)
         else:
-            return float("-inf")
+            median = float("-inf")
+        if not exact:
+            self._median_cache[key] = median
+        return median
 
-    def _running_result(self, trial, t_max=float("inf")):
-        results = self._results[trial]
+    def _running_result(self, trial, t_max=float("inf"), exact=True):
+        history = self._results[trial]
         # TODO(ekl) we could do interpolation to be more precise, but for now
         # assume len(results) is large and the time diffs are roughly equal
-        return self._metric_op * np.mean(
-            [r[self._metric] for r in results if r[self._time_attr] <= t_max])
+        if exact:
+            return self._metric_op * history.exact_mean(t_max)
+        return self._metric_op * history.mean(t_max)
 
     def _best_result(self, trial):
-        results = self._results[trial]
-        return max(self._metric_op * r[self._metric] for r in results)
+        return self._results[trial].best
+
+    def _near(self, best_result, median_result):
+        if not (np.isfinite(best_result) and np.isfinite(median_result)):
+            return median_result != float("-inf")
+        return abs(best_result - median_result) <= _EXACT_CHECK_TOLERANCE * \
+            max(1., abs(median_result))
@@ -136,6 +136,21 @@ class SkOptSearch(SuggestionAlgorithm):
         self._live_trial_mapping[trial_id] = suggested_config
         return dict(zip(self._parameters, suggested_config))
 
+    def _suggest_batch(self, trial_ids):
+        """Asks skopt for all the points at once, so that they are chosen
+        together instead of refitting the optimizer for each point."""
+        num_points = min(
+            len(trial_ids), self._max_concurrent - self._num_live_trials())
+        if num_points <= 0:
+            return []
+        points = self._initial_points[:num_points]
+        del self._initial_points[:num_points]
+        if len(points) < num_points:
+            points += self._skopt_opt.ask(n_points=num_points - len(points))
+        for trial_id, point in zip(trial_ids, points):
+            self._live_trial_mapping[trial_id] = point
+        return [dict(zip(self._parameters, point)) for point in points]
+
     def on_trial_result(self, trial_id, result):
         pass
 
@@ -2,8 +2,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import itertools
 import copy
+import threading
 
 from ray.tune.error import TuneError
 from ray.tune.trial import Trial
@@ -19,11 +21,19 @@ class SuggestionAlgorithm(SearchAlgorithm):
 
     Custom search algorithms can extend this class easily by overriding the
     `_suggest` method provide generated parameters for the trials.
+    Algorithms that can suggest many configurations at once more cheaply
+    than one at a time can also override `_suggest_batch`.
 
     To track suggestions and their corresponding evaluations, the method
     `_suggest` will be passed a trial_id, which will be used in
     subsequent notifications.
 
+    With `suggest_in_background`, suggestions are computed in a background
+    thread, so `next_trials` returns the trials suggested so far instead of
+    waiting for the algorithm. Calls to `_suggest_batch`,
+    `on_trial_result` and `on_trial_complete` are then serialized with a
+    lock, so algorithms do not need to be thread-safe.
+
     Example:
         >>> suggester = SuggestionAlgorithm()
         >>> suggester.add_configurations({ ... })
@@ -32,13 +42,26 @@ class SuggestionAlgorithm(SearchAlgorithm):
         >>> better_parameters = suggester._suggest()
     """
 
-    def __init__(self):
+    def __init__(self, suggest_in_background=False):
         """Constructs a generator given experiment specifications.
+
+        Arguments:
+            suggest_in_background (bool): Whether to compute suggestions in
+                a background thread.
         """
         self._parser = make_parser()
         self._trial_generator = []
         self._counter = 0
         self._finished = False
+        self._lock = None
+        if suggest_in_background:
+            self._lock = threading.Lock()
+            self._ready_trials = collections.deque()
+            self._worker = None
+            self._worker_error = None
+            self._generator_exhausted = False
+            for name in ["on_trial_result", "on_trial_complete"]:
+                setattr(self, name, _locked(self._lock, getattr(self, name)))
 
     def add_configurations(self, experiments):
         """Chains generator given experiment specifications.
@@ -47,6 +70,11 @@ class SuggestionAlgorithm(SearchAlgorithm):
             experiments (Experiment | list | dict): Experiments to run.
         """
         experiment_list = convert_to_experiment_list(experiments)
+        if self._lock is not None:
+            # The generator must not be chained while it is running
+            if self._worker is not None:
+                self._worker.join()
+            self._generator_exhausted = False
         for experiment in experiment_list:
             self._trial_generator = itertools.chain(
                 self._trial_generator,
@@ -60,6 +88,9 @@ class SuggestionAlgorithm(SearchAlgorithm):
         Returns:
             trials (list): Returns a list of trials.
         """
+        if self._lock is not None:
+            return self._next_ready_trials()
+
         trials = []
 
         for trial in self._trial_generator:
@@ -70,36 +101,77 @@ class SuggestionAlgorithm(SearchAlgorithm):
         self._finished = True
         return trials
 
+    def _next_ready_trials(self):
+        """Returns the trials suggested in the background so far, and starts
+        suggesting the next batch if the background thread is idle."""
+        trials = []
+        while self._ready_trials:
+            trials.append(self._ready_trials.popleft())
+        if self._worker is not None and self._worker.is_alive():
+            return trials
+        if self._worker_error is not None:
+            error, self._worker_error = self._worker_error, None
+            raise error
+        if self._generator_exhausted:
+            self._finished = not self._ready_trials
+            return trials
+        self._worker = threading.Thread(target=self._suggest_ahead)
+        self._worker.daemon = True
+        self._worker.start()
+        return trials
+
+    def _suggest_ahead(self):
+        try:
+            for trial in self._trial_generator:
+                if trial is None:
+                    return
+                self._ready_trials.append(trial)
+            self._generator_exhausted = True
+        except Exception as e:
+            self._worker_error = e
+
     def _generate_trials(self, experiment_spec, output_path=""):
-        """Generates trials with configurations from `_suggest`.
+        """Generates trials with configurations from `_suggest_batch`.
 
-        Creates a trial_id that is passed into `_suggest`.
+        Creates the trial_ids that are passed into `_suggest_batch`, asking
+        for all the remaining samples of the experiment at once.
 
         Yields:
             Trial objects constructed according to `spec`
         """
         if "run" not in experiment_spec:
             raise TuneError("Must specify `run` in {}".format(experiment_spec))
-        for _ in range(experiment_spec.get("num_samples", 1)):
-            trial_id = Trial.generate_id()
-            while True:
-                suggested_config = self._suggest(trial_id)
-                if suggested_config is None:
-                    yield None
-                else:
-                    break
-            spec = copy.deepcopy(experiment_spec)
-            spec["config"] = merge_dicts(spec["config"], suggested_config)
-            flattened_config = resolve_nested_dict(spec["config"])
-            self._counter += 1
-            tag = "{0}_{1}".format(
-                str(self._counter), format_vars(flattened_config))
-            yield create_trial_from_spec(
-                spec,
-                output_path,
-                self._parser,
-                experiment_tag=tag,
-                trial_id=trial_id)
+        num_remaining = experiment_spec.get("num_samples", 1)
+        trial_ids = []
+        while num_remaining > 0:
+            trial_ids += [
+                Trial.generate_id()
+                for _ in range(num_remaining - len(trial_ids))
+            ]
+            if self._lock is not None:
+                with self._lock:
+                    suggested_configs = self._suggest_batch(trial_ids)
+            else:
+                suggested_configs = self._suggest_batch(trial_ids)
+            if not suggested_configs:
+                yield None
+                continue
+            for trial_id, suggested_config in zip(trial_ids,
+                                                  suggested_configs):
+                num_remaining -= 1
+                spec = copy.deepcopy(experiment_spec)
+                spec["config"] = merge_dicts(spec["config"], suggested_config)
+                flattened_config = resolve_nested_dict(spec["config"])
+                self._counter += 1
+                tag = "{0}_{1}".format(
+                    str(self._counter), format_vars(flattened_config))
+                yield create_trial_from_spec(
+                    spec,
+                    output_path,
+                    self._parser,
+                    experiment_tag=tag,
+                    trial_id=trial_id)
+            trial_ids = trial_ids[len(suggested_configs):]
 
     def is_finished(self):
         return self._finished
@@ -127,6 +199,37 @@ class SuggestionAlgorithm(SearchAlgorithm):
         """
         raise NotImplementedError
 
+    def _suggest_batch(self, trial_ids):
+        """Queries the algorithm to retrieve parameters for many trials.
+
+        By default, calls `_suggest` for each trial in order until it
+        returns None.
+
+        Arguments:
+            trial_ids (list): Trial IDs used for subsequent notifications.
+
+        Returns:
+            list: Configurations for the first trials of `trial_ids`, as
+                many as possible. Returns an empty list, which will
+                temporarily stop the TrialRunner from querying, if no trial
+                can be suggested.
+        """
+        suggested_configs = []
+        for trial_id in trial_ids:
+            suggested_config = self._suggest(trial_id)
+            if suggested_config is None:
+                break
+            suggested_configs.append(suggested_config)
+        return suggested_configs
+
+
+def _locked(lock, fn):
+    def wrapper(*args, **kwargs):
+        with lock:
+            return fn(*args, **kwargs)
+
+    return wrapper
+
 
 class _MockSuggestionAlgorithm(SuggestionAlgorithm):
     def __init__(self, max_concurrent=2, **kwargs):
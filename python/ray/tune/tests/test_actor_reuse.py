@@ -6,7 +6,7 @@ import unittest
 
 import ray
 from ray.tune import Trainable, run_experiments
-from ray.tune.error import TuneError
+from ray.tune.ray_trial_executor import RayTrialExecutor
 from ray.tune.schedulers.trial_scheduler import FIFOScheduler, TrialScheduler
 
 
@@ -77,22 +77,42 @@ class ActorReuseTest(unittest.TestCase):
                          [1, 2, 3, 4])
 
     def testTrialReuseEnabledError(self):
-        def run():
-            run_experiments(
-                {
-                    "foo": {
-                        "run": create_resettable_class(),
-                        "max_failures": 1,
-                        "num_samples": 4,
-                        "config": {
-                            "fake_reset_not_supported": True
-                        },
-                    }
-                },
-                reuse_actors=True,
-                scheduler=FrequentPausesScheduler())
-
-        self.assertRaises(TuneError, lambda: run())
+        trials = run_experiments(
+            {
+                "foo": {
+                    "run": create_resettable_class(),
+                    "max_failures": 1,
+                    "num_samples": 4,
+                    "config": {
+                        "fake_reset_not_supported": True
+                    },
+                }
+            },
+            reuse_actors=True,
+            scheduler=FrequentPausesScheduler())
+        # Falls back to new actors when the reset fails
+        self.assertEqual([t.last_result["num_resets"] for t in trials],
+                         [0, 0, 0, 0])
+
+    def testTrialReuseForNewTrials(self):
+        executor = RayTrialExecutor(
+            reuse_actors=True, reuse_for_new_trials=True)
+        trials = run_experiments(
+            {
+                "foo": {
+                    "run": create_resettable_class(),
+                    "num_samples": 4,
+                    "config": {},
+                }
+            },
+            trial_executor=executor)
+        self.assertEqual([t.last_result["num_resets"] for t in trials],
+                         [0, 1, 2, 3])
+        self.assertEqual(
+            [t.last_result["training_iteration"] for t in trials],
+            [2, 1, 1, 1])
+        self.assertIn("3/4 trials started on a pooled actor",
+                      executor.debug_string())
 
 
 if __name__ == "__main__":
@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import glob
+import json
 import unittest
 import shutil
 import tempfile
@@ -11,6 +13,8 @@ import pandas as pd
 
 import ray
 from ray.tune import run, sample_from
+from ray.tune.analysis import ExperimentAnalysis
+from ray.tune.analysis.experiment_analysis import PROGRESS_CACHE_FILE
 from ray.tune.examples.async_hyperband_example import MyTrainableClass
 
 
@@ -133,6 +137,61 @@ class ExperimentAnalysisSuite(unittest.TestCase):
         for df in dataframes.values():
             self.assertEqual(df.training_iteration.max(), 1)
 
+    def testProgressDataframe(self):
+        df = self.ea.progress_dataframe(
+            columns=[self.metric], last_row_only=True)
+        self.assertEqual(list(df.columns), ["trial_id", self.metric])
+        self.assertEqual(df.shape[0], self.num_samples)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.test_path, PROGRESS_CACHE_FILE)))
+
+        uncached = self.ea.progress_dataframe(
+            columns=[self.metric], last_row_only=True, use_cache=False)
+        self.assertEqual(
+            dict(zip(df.trial_id, df[self.metric])),
+            dict(zip(uncached.trial_id, uncached[self.metric])))
+
+    def testProgressCacheInvalidation(self):
+        self.ea.progress_dataframe()
+        checkpoint = self.ea._checkpoints[0]
+        progress = os.path.join(checkpoint["logdir"], "progress.csv")
+        row = self.ea.trial_dataframe(checkpoint["trial_id"]).tail(1)
+        row[self.metric] = 1e9
+        row.to_csv(progress, mode="a", header=False, index=False)
+
+        ea = ExperimentAnalysis(self.test_path)
+        self.assertEqual(ea.progress_dataframe().shape[0],
+                         self.num_samples + 1)
+        self.assertEqual(
+            ea.get_best_logdir(self.metric), checkpoint["logdir"])
+        self.assertEqual(
+            ea.get_best_config(self.metric), checkpoint["config"])
+
+    def testPartialProgress(self):
+        """Trials without progress fall back to their last result."""
+        checkpoints = self.ea._checkpoints
+        open(os.path.join(checkpoints[0]["logdir"], "progress.csv"),
+             "w").close()
+        state_path = max(
+            glob.glob(os.path.join(self.test_path, "experiment_state*.json")))
+        with open(state_path) as f:
+            state = json.load(f)
+        state["checkpoints"].append(
+            dict(
+                state["checkpoints"][0],
+                trial_id="pending",
+                logdir=None,
+                last_result={}))
+        with open(state_path, "w") as f:
+            json.dump(state, f)
+
+        ea = ExperimentAnalysis(self.test_path)
+        self.assertEqual(
+            len(ea.get_all_trial_dataframes()), self.num_samples - 1)
+        best = max(checkpoints, key=lambda c: c["last_result"][self.metric])
+        self.assertEqual(ea.get_best_logdir(self.metric), best["logdir"])
+        self.assertEqual(ea.get_best_config(self.metric), best["config"])
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
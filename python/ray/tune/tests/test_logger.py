@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ray.tune.logger import (Logger, JsonLogger, CSVLogger, UnifiedLogger,
+                             LOG_FLUSH_RESULTS)
+
+
+class _RecordingLogger(Logger):
+    """Records the logging calls it receives and the threads they run on."""
+
+    calls = []
+
+    def on_result(self, result):
+        self.calls.append(("result", result["i"], threading.current_thread()))
+
+    def update_config(self, config):
+        self.calls.append(("config", config, threading.current_thread()))
+
+    def close(self):
+        self.calls.append(("close", None, threading.current_thread()))
+
+
+def _count_lines(path):
+    with open(path) as f:
+        return len(f.readlines())
+
+
+class UnifiedLoggerTest(unittest.TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp()
+        _RecordingLogger.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.logdir)
+
+    def testAsyncWritesFlushedOnClose(self):
+        unified = UnifiedLogger({}, self.logdir,
+                                loggers=[JsonLogger, CSVLogger])
+        for i in range(10):
+            unified.on_result({"i": i})
+        unified.close()
+        self.assertEqual(
+            _count_lines(os.path.join(self.logdir, "result.json")), 10)
+        self.assertEqual(
+            _count_lines(os.path.join(self.logdir, "progress.csv")), 11)
+
+    def testFlushWaitsForQueuedResults(self):
+        unified = UnifiedLogger({}, self.logdir, loggers=[JsonLogger])
+        for i in range(LOG_FLUSH_RESULTS // 2):
+            unified.on_result({"i": i})
+        unified.flush()
+        self.assertEqual(
+            _count_lines(os.path.join(self.logdir, "result.json")),
+            LOG_FLUSH_RESULTS // 2)
+        unified.close()
+
+    def testCallsRunInOrderOnWriterThread(self):
+        unified = UnifiedLogger({}, self.logdir, loggers=[_RecordingLogger])
+        result = {"i": 0}
+        unified.on_result(result)
+        result["i"] = 1  # the logged result is a copy
+        unified.update_config({"a": 1})
+        unified.on_result({"i": 2})
+        unified.close()
+        self.assertEqual([c[:2] for c in _RecordingLogger.calls],
+                         [("result", 0), ("config", {
+                             "a": 1
+                         }), ("result", 2), ("close", None)])
+        threads = {c[2] for c in _RecordingLogger.calls}
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def testSyncWrites(self):
+        unified = UnifiedLogger(
+            {}, self.logdir, loggers=[JsonLogger], async_writes=False)
+        unified.on_result({"i": 0})
+        self.assertEqual(
+            _count_lines(os.path.join(self.logdir, "result.json")), 1)
+        unified.close()
+
+    def testErrorsRaisedOnClose(self):
+        class BadLogger(Logger):
+            def on_result(self, result):
+                pass
+
+            def close(self):
+                raise ValueError("intentional error")
+
+        unified = UnifiedLogger({}, self.logdir, loggers=[BadLogger])
+        unified.on_result({"i": 0})
+        self.assertRaises(ValueError, unified.close)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -6,8 +6,10 @@ from __future__ import print_function
 import unittest
 
 import ray
+from ray import gcs_utils
 from ray.rllib import _register_all
 from ray.tune import Trainable
+from ray.tune.placement import NodePlacementPlanner
 from ray.tune.ray_trial_executor import RayTrialExecutor
 from ray.tune.registry import _global_registry, TRAINABLE_CLASS
 from ray.tune.suggest import BasicVariantGenerator
@@ -71,6 +73,30 @@ class RayTrialExecutorTest(unittest.TestCase):
         self.trial_executor.stop_trial(trial)
         self.assertEqual(Trial.TERMINATED, trial.status)
 
+    def testFetchReadyResults(self):
+        """Tests that all ready results are fetched together."""
+        trials = [Trial("__fake") for _ in range(3)]
+        for trial in trials:
+            self.trial_executor.start_trial(trial)
+        ready = []
+        while len(ready) < 3:
+            batch = self.trial_executor.get_next_available_trials()
+            self.assertEqual(len(batch), len(set(batch)))
+            for trial in batch:
+                self.trial_executor.fetch_result(trial)
+            ready += batch
+        self.assertEqual(set(ready), set(trials))
+        self.assertEqual(self.trial_executor.get_running_trials(), [])
+        for trial in trials:
+            self.assertRaises(ValueError, self.trial_executor.fetch_result,
+                              trial)
+            self.trial_executor.continue_training(trial)
+        self.trial_executor.stop_trial(trials[0])
+        self.assertEqual(
+            set(self.trial_executor.get_running_trials()), set(trials[1:]))
+        for trial in trials[1:]:
+            self.trial_executor.stop_trial(trial)
+
     def testNoResetTrial(self):
         """Tests that reset handles NotImplemented properly."""
         trial = Trial("__fake")
@@ -111,6 +137,87 @@ class RayTrialExecutorTest(unittest.TestCase):
         return suggester.next_trials()
 
 
+class PackedPlacementTest(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=4)
+        _register_all()  # Needed for flaky tests
+
+    def tearDown(self):
+        ray.shutdown()
+        _register_all()  # re-register the evicted objects
+
+    def testPackTrials(self):
+        trial_executor = RayTrialExecutor(pack_trials=True)
+        trial = Trial("__fake", resources=Resources(cpu=1, gpu=0))
+        self.assertTrue(trial_executor.has_resources(trial.resources))
+        trial_executor.start_trial(trial)
+        self.assertEqual(Trial.RUNNING, trial.status)
+        self.assertIn("Trials placed on 1 of 1 nodes",
+                      trial_executor.debug_string())
+        # Does not fit next to the running trial on the only node
+        self.assertFalse(
+            trial_executor.has_resources(Resources(cpu=2, gpu=0, extra_cpu=2)))
+        trial_executor.stop_trial(trial)
+        self.assertTrue(
+            trial_executor.has_resources(Resources(cpu=2, gpu=0, extra_cpu=2)))
+
+    def testExtraResourcesSpanNodes(self):
+        trial_executor = RayTrialExecutor(
+            pack_trials=True, refresh_period=float("inf"))
+        trial_executor._planner.update_nodes(
+            [_node("node_1", {"CPU": 4}),
+             _node("node_2", {"CPU": 4})])
+        trial_executor._avail_resources = Resources(cpu=8, gpu=0)
+        # Only the actor has to fit on one node
+        self.assertTrue(
+            trial_executor.has_resources(Resources(cpu=1, gpu=0, extra_cpu=6)))
+        self.assertFalse(trial_executor.has_resources(Resources(cpu=5, gpu=0)))
+        self.assertFalse(
+            trial_executor.has_resources(Resources(cpu=1, gpu=0, extra_cpu=8)))
+
+
+class NodePlacementPlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.planner = NodePlacementPlanner()
+        self.planner.update_nodes([
+            _node("cpu_node", {"CPU": 4}),
+            _node("gpu_node", {"CPU": 8, "GPU": 2}),
+            _node("dead_node", {"CPU": 64}, deleted=True),
+        ])
+
+    def testChoosesBestFit(self):
+        choose = self.planner.choose_node
+        self.assertEqual(choose(Resources(cpu=1, gpu=0)), "cpu_node")
+        self.assertEqual(choose(Resources(cpu=1, gpu=1)), "gpu_node")
+        self.assertEqual(choose(Resources(cpu=3, gpu=0)), "cpu_node")
+        self.assertEqual(choose(Resources(cpu=5, gpu=0)), "gpu_node")
+        self.assertEqual(choose(Resources(cpu=9, gpu=0)), None)
+        # Extra resources are not placed
+        self.assertEqual(choose(Resources(cpu=2, gpu=0, extra_cpu=20)),
+                         "cpu_node")
+
+    def testTracksPlacements(self):
+        trial = Trial("__fake", resources=Resources(cpu=4, gpu=0, extra_cpu=4))
+        self.planner.place(trial, self.planner.choose_node(trial.resources))
+        self.assertEqual(
+            self.planner.free_resources("cpu_node")["CPU"], 0)
+        self.assertEqual(
+            self.planner.choose_node(Resources(cpu=0.5, gpu=0)), "gpu_node")
+        self.planner.release(trial)
+        self.assertEqual(
+            self.planner.choose_node(Resources(cpu=0.5, gpu=0)), "cpu_node")
+
+
+def _node(client_id, resources, deleted=False):
+    return {
+        "ClientID": client_id,
+        "EntryType": (gcs_utils.ClientTableData.DELETION
+                      if deleted else gcs_utils.ClientTableData.INSERTION),
+        "NodeManagerAddress": client_id,
+        "Resources": resources
+    }
+
+
 class LocalModeExecutorTest(RayTrialExecutorTest):
     def setUp(self):
         self.trial_executor = RayTrialExecutor(queue_trials=False)
@@ -3,6 +3,7 @@ from __future__ import division
 from __future__ import print_function
 
 import copy
+import json
 import os
 import shutil
 import sys
@@ -23,12 +24,15 @@ from ray.tune.result import (DEFAULT_RESULTS_DIR, TIMESTEPS_TOTAL, DONE,
                              HOSTNAME, NODE_IP, PID, EPISODES_TOTAL,
                              TRAINING_ITERATION, TIMESTEPS_THIS_ITER,
                              TIME_THIS_ITER_S, TIME_TOTAL_S)
+from ray.tune.log_sync import (_common_dir, get_syncer, sync_debug_string,
+                               wait_for_log_sync)
 from ray.tune.logger import Logger
 from ray.tune.util import pin_in_object_store, get_pinned_object
 from ray.tune.experiment import Experiment
 from ray.tune.trial import (Trial, ExportFormat, Resources, resources_to_json,
                             json_to_resources)
 from ray.tune.trial_runner import TrialRunner
+from ray.tune.analysis import ExperimentAnalysis
 from ray.tune.suggest import grid_search, BasicVariantGenerator
 from ray.tune.suggest.suggestion import (_MockSuggestionAlgorithm,
                                          SuggestionAlgorithm)
@@ -651,6 +655,39 @@ class TrainableFunctionApiTest(unittest.TestCase):
             self.assertEqual(trial.status, Trial.TERMINATED)
             self.assertTrue(trial.has_checkpoint())
 
+    def testCheckpointToObject(self):
+        class TestTrain(Trainable):
+            def _setup(self, config):
+                self.state = {"hi": 1}
+                self.write_file = config.get("write_file", False)
+
+            def _train(self):
+                return {"timesteps_this_iter": 1, "done": True}
+
+            def _save(self, path):
+                if self.write_file:
+                    with open(os.path.join(path, "extra"), "w") as f:
+                        f.write("data")
+                return dict(self.state)
+
+            def _restore(self, state):
+                self.state = state
+
+        for write_file in [False, True]:
+            test_trainable = TestTrain({"write_file": write_file})
+            test_trainable.train()
+            obj = test_trainable.save_to_object()
+            # Only checkpoints that wrote files go through the disk
+            self.assertEqual("data" in obj, write_file)
+            self.assertFalse([
+                d for d in os.listdir(test_trainable.logdir)
+                if "save_to_object" in d
+            ])
+            restored = TestTrain()
+            restored.restore_from_object(obj)
+            self.assertEqual(restored.state, {"hi": 1})
+            self.assertEqual(restored._iteration, 1)
+
     def testMultipleCheckpoints(self):
         class TestTrain(Trainable):
             def _setup(self, config):
@@ -976,6 +1013,53 @@ class RunExperimentTest(unittest.TestCase):
         self.assertTrue(os.path.exists(os.path.join(trial.logdir, "test.log")))
 
 
+class LogSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testUploadOnlyChangedDirs(self):
+        uploads = []
+
+        def sync_func(local, remote):
+            uploads.append(local)
+
+        syncers = []
+        for name in ["a", "b"]:
+            local_dir = os.path.join(self.tmpdir, name)
+            os.makedirs(local_dir)
+            syncer = get_syncer(
+                local_dir,
+                "test_remote",
+                sync_function=tune.function(sync_func))
+            syncer.set_worker_ip(syncer.local_ip)
+            syncers.append(syncer)
+
+        for syncer in syncers:
+            syncer.sync_now()
+        wait_for_log_sync()
+        self.assertEqual(sorted(uploads), [s.local_dir for s in syncers])
+
+        result_file = os.path.join(syncers[0].local_dir, "result.json")
+        with open(result_file, "w") as f:
+            f.write("{}")
+        for syncer in syncers:
+            syncer.sync_now()
+        wait_for_log_sync()
+        self.assertEqual(len(uploads), 3)
+        self.assertEqual(uploads[-1], syncers[0].local_dir)
+        self.assertIn("unchanged uploads skipped", sync_debug_string())
+        for syncer in syncers:
+            syncer.close()
+
+    def testCommonDir(self):
+        self.assertEqual(_common_dir(["/a/exp/t1", "/a/exp/t2"]), "/a/exp")
+        self.assertEqual(_common_dir(["/a/exp/t1"]), "/a/exp/t1")
+        self.assertEqual(_common_dir(["/a/exp1/t", "/a/exp2/t"]), "/a")
+
+
 class VariantGeneratorTest(unittest.TestCase):
     def setUp(self):
         ray.init()
@@ -1945,10 +2029,9 @@ class TrialRunnerTest(unittest.TestCase):
         runner.step()  # This launches a 2nd run
         self.assertFalse(searcher.is_finished())
         self.assertFalse(runner.is_finished())
-        runner.step()  # This kills the first run
-        self.assertFalse(searcher.is_finished())
-        self.assertFalse(runner.is_finished())
-        runner.step()  # This kills the 2nd run
+        # This kills both runs, in one step if both results are ready
+        while not all(t.is_finished() for t in runner.get_trials()):
+            runner.step()
         self.assertFalse(searcher.is_finished())
         self.assertFalse(runner.is_finished())
         runner.step()  # this converts self._finished to True
@@ -2112,6 +2195,75 @@ class TrialRunnerTest(unittest.TestCase):
         self.assertEquals(count_checkpoints(tmpdir), 2)
         shutil.rmtree(tmpdir)
 
+    def testCheckpointJournal(self):
+        ray.init(num_cpus=3)
+        tmpdir = tempfile.mkdtemp()
+        runner = TrialRunner(metadata_checkpoint_dir=tmpdir)
+        for i in range(3):
+            runner.add_trial(
+                Trial(
+                    "__fake",
+                    trial_id="trial_{}".format(i),
+                    stopping_criterion={"training_iteration": 2},
+                    checkpoint_freq=1))
+        runner.step()
+        ckpt_path = os.path.join(
+            tmpdir, TrialRunner.CKPT_FILE_TMPL.format(runner._session_str))
+        journal_path = os.path.splitext(ckpt_path)[0] + ".journal"
+        self.assertTrue(os.path.exists(ckpt_path))
+        self.assertFalse(os.path.exists(journal_path))
+
+        while not runner.is_finished():
+            runner.step()
+        self.assertTrue(os.path.exists(journal_path))
+        with open(ckpt_path) as f:
+            snapshot = json.load(f)
+        self.assertFalse(
+            any(cp["status"] == Trial.TERMINATED
+                for cp in snapshot["checkpoints"]))
+
+        analysis = ExperimentAnalysis(tmpdir)
+        self.assertEqual(
+            sorted(analysis.dataframe()["status"]), [Trial.TERMINATED] * 3)
+        runner2 = TrialRunner.restore(tmpdir)
+        self.assertEqual([t.status for t in runner2.get_trials()],
+                         [Trial.TERMINATED] * 3)
+
+        runner.checkpoint()
+        self.assertFalse(os.path.exists(journal_path))
+        runner3 = TrialRunner.restore(tmpdir)
+        self.assertEqual([t.status for t in runner3.get_trials()],
+                         [Trial.TERMINATED] * 3)
+        shutil.rmtree(tmpdir)
+
+    def testCheckpointPeriod(self):
+        ray.init(num_cpus=1)
+        tmpdir = tempfile.mkdtemp()
+        runner = TrialRunner(
+            metadata_checkpoint_dir=tmpdir,
+            checkpoint_period=1000,
+            checkpoint_max_changes=2)
+        runner.add_trial(Trial("__fake", trial_id="trial_0"))
+        runner.step()
+        self.assertEqual(
+            len(TrialRunner.restore(tmpdir).get_trials()), 1)
+
+        runner.add_trial(Trial("__fake", trial_id="trial_1"))
+        runner.step()
+        self.assertEqual(
+            len(TrialRunner.restore(tmpdir).get_trials()), 1)
+
+        runner.add_trial(Trial("__fake", trial_id="trial_2"))
+        runner.step()
+        self.assertEqual(
+            len(TrialRunner.restore(tmpdir).get_trials()), 3)
+
+        # The period of the resumed run applies, not the checkpointed one
+        runner2 = TrialRunner.restore(tmpdir, checkpoint_period=5)
+        self.assertEqual(runner2._checkpoint_period, 5)
+        self.assertEqual(runner2._checkpoint_max_changes, None)
+        shutil.rmtree(tmpdir)
+
 
 class SearchAlgorithmTest(unittest.TestCase):
     def testNestedSuggestion(self):
@@ -2125,6 +2277,61 @@ class SearchAlgorithmTest(unittest.TestCase):
         self.assertTrue("e=5" in trial.experiment_tag)
         self.assertTrue("d=4" in trial.experiment_tag)
 
+    def testSuggestBatch(self):
+        class BatchSuggestion(SuggestionAlgorithm):
+            def __init__(self):
+                self.batch_sizes = []
+                self.live_trials = set()
+                super(BatchSuggestion, self).__init__()
+
+            def _suggest_batch(self, trial_ids):
+                self.batch_sizes.append(len(trial_ids))
+                trial_ids = trial_ids[:3 - len(self.live_trials)]
+                self.live_trials.update(trial_ids)
+                return [{"i": len(self.batch_sizes)} for _ in trial_ids]
+
+            def on_trial_complete(self, trial_id, **kwargs):
+                self.live_trials.remove(trial_id)
+
+        alg = BatchSuggestion()
+        alg.add_configurations({"test": {"run": "__fake", "num_samples": 5}})
+        trials = alg.next_trials()
+        self.assertEqual(len(trials), 3)
+        self.assertEqual(alg.batch_sizes, [5, 2])
+        self.assertEqual(alg.next_trials(), [])
+        self.assertFalse(alg.is_finished())
+
+        for trial in trials:
+            alg.on_trial_complete(trial.trial_id)
+        trials = alg.next_trials()
+        self.assertEqual(len(trials), 2)
+        self.assertEqual(alg.batch_sizes, [5, 2, 2, 2])
+        self.assertTrue(alg.is_finished())
+
+    def testSuggestInBackground(self):
+        alg = _MockSuggestionAlgorithm(
+            max_concurrent=2, suggest_in_background=True)
+        alg.add_configurations({"test": {"run": "__fake", "num_samples": 3}})
+
+        def wait_for_trials(num_trials, timeout=10):
+            trials = []
+            start = time.time()
+            while len(trials) < num_trials and time.time() - start < timeout:
+                trials += alg.next_trials()
+                time.sleep(0.01)
+            return trials
+
+        trials = wait_for_trials(2)
+        self.assertEqual(len(trials), 2)
+        self.assertEqual(wait_for_trials(1, timeout=0.5), [])
+        alg.on_trial_complete(trials[0].trial_id)
+        self.assertEqual(len(wait_for_trials(1)), 1)
+        start = time.time()
+        while not alg.is_finished() and time.time() - start < 10:
+            self.assertEqual(alg.next_trials(), [])
+            time.sleep(0.01)
+        self.assertTrue(alg.is_finished())
+
 
 class ResourcesTest(unittest.TestCase):
     def testSubtraction(self):
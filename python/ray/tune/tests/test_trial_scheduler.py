@@ -17,6 +17,8 @@ from ray.tune.schedulers import (HyperBandScheduler, AsyncHyperBandScheduler,
                                  PopulationBasedTraining, MedianStoppingRule,
                                  TrialScheduler)
 
+from ray.tune.schedulers.async_hyperband import _RungRewards
+from ray.tune.schedulers.median_stopping_rule import _ResultHistory
 from ray.tune.schedulers.pbt import explore
 from ray.tune.trial import Trial, Resources, Checkpoint
 from ray.tune.trial_executor import TrialExecutor
@@ -135,6 +137,76 @@ class EarlyStoppingSuite(unittest.TestCase):
             rule.on_trial_result(None, t3, result(2, 260)),
             TrialScheduler.PAUSE)
 
+    def testMedianStoppingOutOfOrderTimes(self):
+        history = _ResultHistory()
+        for t, value in [(1, 1.), (3, 3.), (2, 2.), (0, 10.), (3, 5.)]:
+            history.add(t, value, 1.)
+        self.assertEqual(history.best, 10.)
+        for t in [0, 1, 1.5, 2, 3, 4]:
+            self.assertAlmostEqual(history.mean(t), history.exact_mean(t))
+        self.assertTrue(np.isnan(history.mean(-1)))
+
+    def testMedianStoppingCachesMedian(self):
+        rule = MedianStoppingRule(grace_period=0, min_samples_required=1)
+        t1, t2 = self.basicSetup(rule)
+        rule.on_trial_complete(None, t1, result(10, 1000))
+        t3 = Trial("PPO")
+        self.assertEqual(
+            rule.on_trial_result(None, t3, result(5, 300)),
+            TrialScheduler.CONTINUE)
+        self.assertEqual(len(rule._median_cache), 1)
+        # The median changes when another trial completes
+        rule.on_trial_complete(None, t2, result(10, 0))
+        self.assertEqual(rule._median_cache, {})
+        self.assertEqual(
+            rule.on_trial_result(None, t3, result(5, 300)),
+            TrialScheduler.STOP)
+
+    def testMedianStoppingCachesFloatTimes(self):
+        rule = MedianStoppingRule(grace_period=0, min_samples_required=1)
+        for i in range(3):
+            t = Trial("PPO")
+            for j in range(10):
+                rule.on_trial_result(None, t, result(j * 1.37 + i * 0.01, 100))
+            rule.on_trial_complete(None, t, result(10 * 1.37 + i * 0.01, 100))
+
+        calls = []
+        running_result = rule._running_result
+
+        def counting_running_result(*args, **kwargs):
+            calls.append(args)
+            return running_result(*args, **kwargs)
+
+        rule._running_result = counting_running_result
+        t = Trial("PPO")
+        for j in range(20):
+            self.assertEqual(
+                rule.on_trial_result(None, t, result(20 + j * 0.731, 200)),
+                TrialScheduler.CONTINUE)
+        # Times past all completed results share one cached median
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(rule._median_cache), 1)
+
+        # Times between the same two completed results do too
+        for time in [5.6, 6.0, 6.5]:
+            rule.on_trial_result(None, t, result(time, 200))
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(len(rule._median_cache), 2)
+
+    def testMedianStoppingTieUsesExactMean(self):
+        rule = MedianStoppingRule(grace_period=0, min_samples_required=1)
+        t1 = Trial("PPO")
+        rewards = [0.0, 2.1, 0.9, 3.0, 1.8, 0.6, 2.7, 1.5]
+        for i, rew in enumerate(rewards[:-1]):
+            rule.on_trial_result(None, t1, result(i, rew))
+        rule.on_trial_complete(None, t1, result(7, rewards[-1]))
+        # A running sum of the rewards rounds up past np.mean(rewards)
+        self.assertGreater(rule._results[t1].mean(7), np.mean(rewards))
+        t2 = Trial("PPO")
+        self.assertEqual(
+            rule.on_trial_result(None, t2, result(7, np.mean(rewards))),
+            TrialScheduler.CONTINUE)
+
     def _test_metrics(self, result_func, metric, mode):
         rule = MedianStoppingRule(
             grace_period=0,
@@ -1076,6 +1148,26 @@ class AsyncHyperBandSuite(unittest.TestCase):
 
         self._test_metrics(result2, "mean_loss", "min")
 
+    def testRungPercentileMatchesNumpy(self):
+        np.random.seed(0)
+        for _ in range(100):
+            recorded = _RungRewards()
+            values = np.random.randint(-5, 5, np.random.randint(1, 30))
+            values = values * np.random.choice([1., 0.1, 1e3])
+            for i, value in enumerate(values):
+                recorded[i] = value
+            # Overwrite and remove some rewards
+            recorded[0] = 0.7
+            values[0] = 0.7
+            if len(values) > 1:
+                del recorded[1]
+                values = np.delete(values, 1)
+            for q in [50, 66.66666666666667, 75, 80]:
+                self.assertEqual(
+                    recorded.percentile(q), np.percentile(values, q))
+        recorded[-1] = float("nan")
+        self.assertTrue(np.isnan(recorded.percentile(75)))
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
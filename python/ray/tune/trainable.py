@@ -5,7 +5,6 @@ from __future__ import print_function
 from datetime import datetime
 
 import copy
-import io
 import logging
 import os
 import pickle
@@ -238,6 +237,11 @@ class Trainable(object):
         if not os.path.exists(checkpoint_dir):
             os.makedirs(checkpoint_dir)
         checkpoint = self._save(checkpoint_dir)
+        return self._write_checkpoint(checkpoint_dir, checkpoint)
+
+    def _write_checkpoint(self, checkpoint_dir, checkpoint):
+        """Writes the return value of `_save` and the metadata to disk."""
+
         saved_as_dict = False
         if isinstance(checkpoint, string_types):
             if (not checkpoint.startswith(checkpoint_dir)
@@ -261,26 +265,48 @@ class Trainable(object):
                 "`_save` must return a dict or string type: {}".format(
                     str(type(checkpoint))))
         with open(checkpoint_path + ".tune_metadata", "wb") as f:
-            pickle.dump({
-                "experiment_id": self._experiment_id,
-                "iteration": self._iteration,
-                "timesteps_total": self._timesteps_total,
-                "time_total": self._time_total,
-                "episodes_total": self._episodes_total,
-                "saved_as_dict": saved_as_dict
-            }, f)
+            pickle.dump(self._checkpoint_metadata(saved_as_dict), f)
         return checkpoint_path
 
+    def _checkpoint_metadata(self, saved_as_dict):
+        return {
+            "experiment_id": self._experiment_id,
+            "iteration": self._iteration,
+            "timesteps_total": self._timesteps_total,
+            "time_total": self._time_total,
+            "episodes_total": self._episodes_total,
+            "saved_as_dict": saved_as_dict
+        }
+
     def save_to_object(self):
-        """Saves the current model state to a Python object. It also
-        saves to disk but does not return the checkpoint path.
+        """Saves the current model state to a Python object.
+
+        If ``_save()`` returns a dict and writes no files, the dict is
+        returned as is and nothing is written to disk. Otherwise the
+        checkpoint is saved to a temporary dir and the returned object holds
+        the contents of its files.
+
+        Since the object is not pickled here, Ray stores numpy arrays in it
+        without copying, and ``restore_from_object()`` called through Ray
+        reads them straight from the object store. When called directly, the
+        object may share data with the trainable.
 
         Returns:
             Object holding checkpoint data.
         """
 
         tmpdir = tempfile.mkdtemp("save_to_object", dir=self.logdir)
-        checkpoint_prefix = self.save(tmpdir)
+        checkpoint_dir = os.path.join(tmpdir,
+                                      "checkpoint_{}".format(self._iteration))
+        os.makedirs(checkpoint_dir)
+        checkpoint = self._save(checkpoint_dir)
+        if isinstance(checkpoint, dict) and not os.listdir(checkpoint_dir):
+            shutil.rmtree(tmpdir)
+            return {
+                "metadata": self._checkpoint_metadata(saved_as_dict=True),
+                "state": checkpoint,
+            }
+        checkpoint_prefix = self._write_checkpoint(checkpoint_dir, checkpoint)
 
         data = {}
         base_dir = os.path.dirname(checkpoint_prefix)
@@ -289,18 +315,15 @@ class Trainable(object):
             if path.startswith(checkpoint_prefix):
                 with open(path, "rb") as f:
                     data[os.path.basename(path)] = f.read()
+        size = sum(len(contents) for contents in data.values())
+        if size > 10e6:  # getting pretty large
+            logger.info("Checkpoint size is {} bytes".format(size))
 
-        out = io.BytesIO()
-        data_dict = pickle.dumps({
+        shutil.rmtree(tmpdir)
+        return {
             "checkpoint_name": os.path.basename(checkpoint_prefix),
             "data": data,
-        })
-        if len(data_dict) > 10e6:  # getting pretty large
-            logger.info("Checkpoint size is {} bytes".format(len(data_dict)))
-        out.write(data_dict)
-
-        shutil.rmtree(tmpdir)
-        return out.getvalue()
+        }
 
     def restore(self, checkpoint_path):
         """Restores training state from a given model checkpoint.
@@ -313,18 +336,20 @@ class Trainable(object):
 
         with open(checkpoint_path + ".tune_metadata", "rb") as f:
             metadata = pickle.load(f)
+        if metadata["saved_as_dict"]:
+            with open(checkpoint_path, "rb") as loaded_state:
+                checkpoint = pickle.load(loaded_state)
+        else:
+            checkpoint = checkpoint_path
+        self._restore_checkpoint(metadata, checkpoint)
+
+    def _restore_checkpoint(self, metadata, checkpoint):
         self._experiment_id = metadata["experiment_id"]
         self._iteration = metadata["iteration"]
         self._timesteps_total = metadata["timesteps_total"]
         self._time_total = metadata["time_total"]
         self._episodes_total = metadata["episodes_total"]
-        saved_as_dict = metadata["saved_as_dict"]
-        if saved_as_dict:
-            with open(checkpoint_path, "rb") as loaded_state:
-                checkpoint_dict = pickle.load(loaded_state)
-            self._restore(checkpoint_dict)
-        else:
-            self._restore(checkpoint_path)
+        self._restore(checkpoint)
         self._time_since_restore = 0.0
         self._timesteps_since_restore = 0
         self._iterations_since_restore = 0
@@ -336,12 +361,16 @@ class Trainable(object):
         These checkpoints are returned from calls to save_to_object().
         """
 
-        info = pickle.loads(obj)
-        data = info["data"]
+        if isinstance(obj, bytes):
+            obj = pickle.loads(obj)  # from older versions of save_to_object
+        if "state" in obj:
+            self._restore_checkpoint(obj["metadata"], obj["state"])
+            return
+
         tmpdir = tempfile.mkdtemp("restore_from_object", dir=self.logdir)
-        checkpoint_path = os.path.join(tmpdir, info["checkpoint_name"])
+        checkpoint_path = os.path.join(tmpdir, obj["checkpoint_name"])
 
-        for file_name, file_contents in data.items():
+        for file_name, file_contents in obj["data"].items():
             with open(os.path.join(tmpdir, file_name), "wb") as f:
                 f.write(file_contents)
 
@@ -381,6 +410,31 @@ class Trainable(object):
         """
         return False
 
+    def reset_run(self, logdir, chdir=True):
+        """Resets the run counters and logdir for a new trial.
+
+        This is called by Tune after a successful ``reset_config()`` when
+        the actor of this trainable is reused for another trial.
+
+        Args:
+            logdir (str): Directory of the new trial.
+            chdir (bool): Whether to change the working dir to `logdir`.
+        """
+        self._experiment_id = uuid.uuid4().hex
+        self._iteration = 0
+        self._time_total = 0.0
+        self._timesteps_total = None
+        self._episodes_total = None
+        self._time_since_restore = 0.0
+        self._timesteps_since_restore = 0
+        self._iterations_since_restore = 0
+        self._restored = False
+        self.logdir = logdir
+        if not os.path.exists(logdir):
+            os.makedirs(logdir)
+        if chdir:
+            os.chdir(logdir)
+
     def stop(self):
         """Releases all resources used by this trainable."""
 
@@ -406,7 +460,10 @@ class Trainable(object):
             checkpoint (str | dict): If string, the return value is
                 expected to be the checkpoint path that will be passed to
                 `_restore()`. If dict, the return value will be automatically
-                serialized by Tune and passed to `_restore()`.
+                serialized by Tune and passed to `_restore()`. Returning a
+                dict and writing no files lets in-memory checkpoints, such
+                as the ones PBT uses, skip the disk. Numpy arrays in such a
+                dict may be passed to `_restore()` as read-only arrays.
 
         Examples:
             >>> print(trainable1._save("/tmp/checkpoint_1"))
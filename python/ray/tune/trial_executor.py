@@ -26,6 +26,7 @@ class TrialExecutor(object):
         """
         self._queue_trials = queue_trials
         self._cached_trial_state = {}
+        self._updated_trial_ids = set()
 
     def set_status(self, trial, status):
         """Sets status and checkpoints metadata if needed.
@@ -54,6 +55,7 @@ class TrialExecutor(object):
         try:
             logger.debug("Saving trial metadata.")
             self._cached_trial_state[trial.trial_id] = trial.__getstate__()
+            self._updated_trial_ids.add(trial.trial_id)
         except Exception:
             logger.exception("Error checkpointing trial metadata.")
 
@@ -61,6 +63,20 @@ class TrialExecutor(object):
         """Returns a copy of mapping of the trial ID to pickled metadata."""
         return self._cached_trial_state.copy()
 
+    def pop_updated_checkpoints(self):
+        """Returns the metadata of trials checkpointed since the last call.
+
+        Returns:
+            A mapping of the trial ID to pickled metadata, like
+            get_checkpoints(), for only the updated trials.
+        """
+        updated = {
+            trial_id: self._cached_trial_state[trial_id]
+            for trial_id in self._updated_trial_ids
+        }
+        self._updated_trial_ids.clear()
+        return updated
+
     def has_resources(self, resources):
         """Returns whether this runner has at least the specified resources."""
         raise NotImplementedError("Subclasses of TrialExecutor must provide "
@@ -158,6 +174,17 @@ class TrialExecutor(object):
         """
         raise NotImplementedError
 
+    def get_next_available_trials(self):
+        """Blocking call that waits until at least one result is ready.
+
+        Executors that can fetch results in bulk return every trial with a
+        result ready, so that the results are processed in one step.
+
+        Returns:
+            List of Trial objects that are ready for intermediate processing.
+        """
+        return [self.get_next_available_trial()]
+
     def fetch_result(self, trial):
         """Fetches one result for the trial.
 
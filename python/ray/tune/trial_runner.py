@@ -13,6 +13,7 @@ import traceback
 
 import ray.cloudpickle as cloudpickle
 from ray.tune import TuneError
+from ray.tune.log_sync import sync_debug_string
 from ray.tune.ray_trial_executor import RayTrialExecutor
 from ray.tune.result import TIME_THIS_ITER_S, RESULT_DUPLICATE
 from ray.tune.trial import Trial, Checkpoint
@@ -25,6 +26,10 @@ from ray.tune.web_server import TuneServer
 
 MAX_DEBUG_TRIALS = 20
 
+# The journal is compacted into a new snapshot once it holds more trial
+# states than this, or than the number of trials if that is larger
+JOURNAL_COMPACTION_MIN_ENTRIES = 100
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +48,53 @@ def _find_newest_ckpt(ckpt_dir):
     return max(full_paths)
 
 
+def _journal_path(ckpt_path):
+    """Returns the path of the journal that belongs to a checkpoint."""
+    return os.path.splitext(ckpt_path)[0] + ".journal"
+
+
+def load_experiment_state(ckpt_path, cls=None):
+    """Loads an experiment checkpoint and replays its journal on top.
+
+    Args:
+        ckpt_path (str): Path to an experiment_state-*.json snapshot.
+        cls (JSONDecoder): Decoder to use for the snapshot and journal.
+
+    Returns:
+        The experiment state with the latest metadata of each trial, in
+        the format written by TrialRunner.checkpoint().
+    """
+    with open(ckpt_path, "r") as f:
+        runner_state = json.load(f, cls=cls)
+    journal_path = _journal_path(ckpt_path)
+    if not os.path.exists(journal_path):
+        return runner_state
+
+    checkpoints = collections.OrderedDict(
+        (cp["trial_id"], cp) for cp in runner_state["checkpoints"])
+    # Entries up to journal_seq were compacted into the snapshot already,
+    # and are only left over if compaction was interrupted.
+    seq = runner_state.get("journal_seq", 0)
+    with open(journal_path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line, cls=cls)
+            except ValueError:
+                logger.warning("Ignoring incomplete entry at the end of "
+                               "{}.".format(journal_path))
+                break
+            if entry["seq"] <= seq:
+                continue
+            for cp in entry["checkpoints"]:
+                checkpoints[cp["trial_id"]] = cp
+            runner_state["runner_data"] = entry["runner_data"]
+            runner_state["stats"]["timestamp"] = entry["timestamp"]
+            seq = entry["seq"]
+    runner_state["checkpoints"] = list(checkpoints.values())
+    runner_state["journal_seq"] = seq
+    return runner_state
+
+
 class _TuneFunctionEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, function):
@@ -105,7 +157,9 @@ class TrialRunner(object):
                  metadata_checkpoint_dir=None,
                  server_port=TuneServer.DEFAULT_PORT,
                  verbose=True,
-                 trial_executor=None):
+                 trial_executor=None,
+                 checkpoint_period=0,
+                 checkpoint_max_changes=None):
         """Initializes a new TrialRunner.
 
         Args:
@@ -123,6 +177,12 @@ class TrialRunner(object):
                 that start and stop actors often (e.g., PBT in
                 time-multiplexing mode).
             trial_executor (TrialExecutor): Defaults to RayTrialExecutor.
+            checkpoint_period (float): Minimum number of seconds between
+                writes of the experiment state in step(). Trials that change
+                in between are written together.
+            checkpoint_max_changes (int): Write the experiment state before
+                `checkpoint_period` has passed once this many trials have
+                changed. Defaults to no limit.
         """
         self._search_alg = search_alg or BasicVariantGenerator()
         self._scheduler_alg = scheduler or FIFOScheduler()
@@ -144,6 +204,13 @@ class TrialRunner(object):
         self._trials = []
         self._stop_queue = []
         self._metadata_checkpoint_dir = metadata_checkpoint_dir
+        self._checkpoint_period = checkpoint_period
+        self._checkpoint_max_changes = checkpoint_max_changes
+        self._pending_checkpoints = {}
+        self._last_checkpoint_time = 0
+        self._has_snapshot = False
+        self._journal_seq = 0
+        self._journal_entries = 0
 
         self._start_time = time.time()
         self._session_str = datetime.fromtimestamp(
@@ -161,13 +228,15 @@ class TrialRunner(object):
         """Saves execution state to `self._metadata_checkpoint_dir`.
 
         Overwrites the current session checkpoint, which starts when self
-        is instantiated.
+        is instantiated, and clears its journal.
         """
         if not self._metadata_checkpoint_dir:
             return
         metadata_checkpoint_dir = self._metadata_checkpoint_dir
         if not os.path.exists(metadata_checkpoint_dir):
             os.makedirs(metadata_checkpoint_dir)
+        self.trial_executor.pop_updated_checkpoints()
+        self._pending_checkpoints.clear()
         runner_state = {
             "checkpoints": list(
                 self.trial_executor.get_checkpoints().values()),
@@ -175,25 +244,74 @@ class TrialRunner(object):
             "stats": {
                 "start_time": self._start_time,
                 "timestamp": time.time()
-            }
+            },
+            "journal_seq": self._journal_seq
         }
         tmp_file_name = os.path.join(metadata_checkpoint_dir,
                                      ".tmp_checkpoint")
         with open(tmp_file_name, "w") as f:
             json.dump(runner_state, f, indent=2, cls=_TuneFunctionEncoder)
 
-        os.rename(
-            tmp_file_name,
-            os.path.join(metadata_checkpoint_dir,
-                         TrialRunner.CKPT_FILE_TMPL.format(self._session_str)))
+        ckpt_path = os.path.join(
+            metadata_checkpoint_dir,
+            TrialRunner.CKPT_FILE_TMPL.format(self._session_str))
+        os.rename(tmp_file_name, ckpt_path)
+        if os.path.exists(_journal_path(ckpt_path)):
+            os.remove(_journal_path(ckpt_path))
+        self._has_snapshot = True
+        self._journal_entries = 0
+        self._last_checkpoint_time = time.time()
         return metadata_checkpoint_dir
 
+    def _checkpoint_if_needed(self):
+        """Appends the trials that changed to the checkpoint journal.
+
+        Writes happen at most every `checkpoint_period` seconds, unless
+        `checkpoint_max_changes` trials are waiting to be written. Falls
+        back to a full checkpoint() if there is none for this session yet,
+        or to compact the journal once it outgrows the snapshot.
+        """
+        if not self._metadata_checkpoint_dir:
+            return
+        self._pending_checkpoints.update(
+            self.trial_executor.pop_updated_checkpoints())
+        if not self._pending_checkpoints:
+            return
+        max_changes = self._checkpoint_max_changes or float("inf")
+        if (time.time() - self._last_checkpoint_time <
+                self._checkpoint_period
+                and len(self._pending_checkpoints) < max_changes):
+            return
+        num_entries = self._journal_entries + len(self._pending_checkpoints)
+        if not self._has_snapshot or num_entries > max(
+                JOURNAL_COMPACTION_MIN_ENTRIES, len(self._trials)):
+            self.checkpoint()
+            return
+
+        self._journal_seq += 1
+        entry = {
+            "seq": self._journal_seq,
+            "checkpoints": list(self._pending_checkpoints.values()),
+            "runner_data": self.__getstate__(),
+            "timestamp": time.time()
+        }
+        ckpt_path = os.path.join(
+            self._metadata_checkpoint_dir,
+            TrialRunner.CKPT_FILE_TMPL.format(self._session_str))
+        with open(_journal_path(ckpt_path), "a") as f:
+            f.write(json.dumps(entry, cls=_TuneFunctionEncoder) + "\n")
+        self._pending_checkpoints.clear()
+        self._journal_entries = num_entries
+        self._last_checkpoint_time = time.time()
+
     @classmethod
     def restore(cls,
                 metadata_checkpoint_dir,
                 search_alg=None,
                 scheduler=None,
-                trial_executor=None):
+                trial_executor=None,
+                checkpoint_period=0,
+                checkpoint_max_changes=None):
         """Restores all checkpointed trials from previous run.
 
         Requires user to manually re-register their objects. Also stops
@@ -206,14 +324,16 @@ class TrialRunner(object):
             scheduler (TrialScheduler): Scheduler for executing
                 the experiment.
             trial_executor (TrialExecutor): Manage the execution of trials.
+            checkpoint_period (float): See TrialRunner.
+            checkpoint_max_changes (int): See TrialRunner.
 
         Returns:
             runner (TrialRunner): A TrialRunner to resume experiments from.
         """
 
         newest_ckpt_path = _find_newest_ckpt(metadata_checkpoint_dir)
-        with open(newest_ckpt_path, "r") as f:
-            runner_state = json.load(f, cls=_TuneFunctionDecoder)
+        runner_state = load_experiment_state(
+            newest_ckpt_path, cls=_TuneFunctionDecoder)
 
         logger.warning("".join([
             "Attempting to resume experiment from {}. ".format(
@@ -223,7 +343,11 @@ class TrialRunner(object):
         ]))
 
         runner = TrialRunner(
-            search_alg, scheduler=scheduler, trial_executor=trial_executor)
+            search_alg,
+            scheduler=scheduler,
+            trial_executor=trial_executor,
+            checkpoint_period=checkpoint_period,
+            checkpoint_max_changes=checkpoint_max_changes)
 
         runner.__setstate__(runner_state["runner_data"])
 
@@ -286,7 +410,7 @@ class TrialRunner(object):
 
         try:
             with warn_if_slow("experiment_checkpoint"):
-                self.checkpoint()
+                self._checkpoint_if_needed()
         except Exception:
             logger.exception("Trial Runner checkpointing failed.")
         self._iteration += 1
@@ -387,6 +511,9 @@ class TrialRunner(object):
         messages.append(self._scheduler_alg.debug_string())
         messages.append(self.trial_executor.debug_string())
         messages.append(self._memory_debug_string())
+        sync_message = sync_debug_string()
+        if sync_message:
+            messages.append(sync_message)
         return messages
 
     def _memory_debug_string(self):
@@ -427,9 +554,14 @@ class TrialRunner(object):
         return trial
 
     def _process_events(self):
-        trial = self.trial_executor.get_next_available_trial()  # blocking
-        with warn_if_slow("process_trial"):
-            self._process_trial(trial)
+        trials = self.trial_executor.get_next_available_trials()  # blocking
+        for trial in trials:
+            # Processing an earlier result may have stopped or paused this
+            # trial, which discards its pending result.
+            if trial.status != Trial.RUNNING:
+                continue
+            with warn_if_slow("process_trial"):
+                self._process_trial(trial)
 
     def _process_trial(self, trial):
         try:
@@ -626,6 +758,13 @@ class TrialRunner(object):
                 "_search_alg",
                 "_scheduler_alg",
                 "trial_executor",
+                "_checkpoint_period",
+                "_checkpoint_max_changes",
+                "_pending_checkpoints",
+                "_last_checkpoint_time",
+                "_has_snapshot",
+                "_journal_seq",
+                "_journal_entries",
         ]:
             del state[k]
         state["launch_web_server"] = bool(self._server)
@@ -93,7 +93,9 @@ def run(run_or_experiment,
         trial_executor=None,
         raise_on_failed_trial=True,
         return_trials=True,
-        ray_auto_init=True):
+        ray_auto_init=True,
+        checkpoint_period=0,
+        checkpoint_max_changes=None):
     """Executes training.
 
     Args:
@@ -172,6 +174,11 @@ def run(run_or_experiment,
         ray_auto_init (bool): Automatically starts a local Ray cluster
             if using a RayTrialExecutor (which is the default) and
             if Ray is not initialized. Defaults to True.
+        checkpoint_period (float): Minimum number of seconds between writes
+            of the experiment state. Defaults to writing after every change.
+        checkpoint_max_changes (int): Write the experiment state before
+            `checkpoint_period` has passed once this many trials have
+            changed. Defaults to no limit.
 
     Returns:
         List of Trial objects.
@@ -225,8 +232,13 @@ def run(run_or_experiment,
     runner = None
     if should_restore:
         try:
-            runner = TrialRunner.restore(checkpoint_dir, search_alg, scheduler,
-                                         trial_executor)
+            runner = TrialRunner.restore(
+                checkpoint_dir,
+                search_alg,
+                scheduler,
+                trial_executor,
+                checkpoint_period=checkpoint_period,
+                checkpoint_max_changes=checkpoint_max_changes)
         except Exception:
             logger.exception("Runner restore failed. Restarting experiment.")
     else:
@@ -245,7 +257,9 @@ def run(run_or_experiment,
             launch_web_server=with_server,
             server_port=server_port,
             verbose=bool(verbose > 1),
-            trial_executor=trial_executor)
+            trial_executor=trial_executor,
+            checkpoint_period=checkpoint_period,
+            checkpoint_max_changes=checkpoint_max_changes)
 
     if verbose:
         print(runner.debug_string(max_debug=99999))
@@ -258,6 +272,11 @@ def run(run_or_experiment,
                 print(runner.debug_string())
             last_debug = time.time()
 
+    try:
+        runner.checkpoint()
+    except Exception:
+        logger.exception("Trial Runner checkpointing failed.")
+
     if verbose:
         print(runner.debug_string(max_debug=99999))
 